@@ -0,0 +1,115 @@
+"""Estrategia *artist-first*: resolver el artista una vez y emparejar en local.
+
+Para cada artista distinto se busca su MBID una sola vez y se recorren, en
+páginas de 100, sus release groups (con ``first-release-date``) y sus
+releases con la lista de pistas. Con eso se arma en memoria un catálogo
+``título -> año más temprano`` contra el que se emparejan todas las
+canciones pendientes de ese artista sin más peticiones.
+"""
+from artist_profile import ArtistResolver
+from bounded_cache import KeyLocks, LRUCache
+from fuzzy_match import FuzzyMatcher
+from text_keys import index_key, parse_year
+
+PAGE_SIZE = 100
+
+
+class ArtistCatalog:
+    """Catálogo en memoria de títulos y años por artista."""
+
+    def __init__(self, client, min_songs=3, max_pages=20, artist_threshold=0.85, title_threshold=0.7,
+                 resolver=None, max_catalogs=1000):
+        self.client = client
+        self.resolver = resolver or ArtistResolver(client, threshold=artist_threshold)
+        self.min_songs = min_songs
+        self.max_pages = max_pages
+        self.artist_threshold = artist_threshold
+        self.title_threshold = title_threshold
+        self.pending = None
+        # Por MBID: (catálogo, FuzzyMatcher de sus títulos)
+        self._catalogs = LRUCache(max_catalogs)
+        self._lock_for = KeyLocks()
+
+    def plan(self, artists):
+        """Cuenta las canciones pendientes por artista para decidir a quién recorrer."""
+        self.pending = {}
+        for artist in artists:
+            key = index_key(artist)
+            self.pending[key] = self.pending.get(key, 0) + 1
+
+    def should_browse(self, artist):
+        """Solo compensa recorrer el catálogo si el artista tiene varias canciones."""
+        if self.pending is None:
+            return True
+        return self.pending.get(index_key(artist), 0) >= self.min_songs
+
+    def resolve_artist(self, artist, artist_variants):
+        """Devuelve ``(mbid, nombre)`` del artista o None si no hay coincidencia clara."""
+        entity = self.resolver.resolve(artist, artist_variants)
+        return (entity["id"], entity.get("name", "")) if entity else None
+
+    def _browse_all(self, browse, list_key, count_key, artist_id):
+        offset = 0
+        for _ in range(self.max_pages):
+            result = browse(artist=artist_id, limit=PAGE_SIZE, offset=offset)
+            items = result.get(list_key, [])
+            yield from items
+            offset += len(items)
+            if not items or offset >= int(result.get(count_key, 0) or 0):
+                break
+
+    def catalog_for(self, artist_id):
+        """Títulos normalizados del artista con su año más temprano."""
+        return self._load(artist_id)[0]
+
+    def _load(self, artist_id):
+        with self._lock_for(artist_id):
+            loaded = self._catalogs.get(artist_id)
+            if loaded is not None:
+                return loaded
+
+            catalog = {}
+
+            def add(title, year):
+                key = index_key(title)
+                if key and year and (key not in catalog or year < catalog[key][1]):
+                    catalog[key] = (title, year)
+
+            for group in self._browse_all(self.client.browse_release_groups, "release-group-list",
+                                          "release-group-count", artist_id):
+                add(group.get("title"), parse_year(group.get("first-release-date")))
+
+            for release in self._browse_all(self.client.browse_releases, "release-list",
+                                            "release-count", artist_id):
+                year = parse_year(release.get("date"))
+                for medium in release.get("medium-list", []):
+                    for track in medium.get("track-list", []):
+                        add(track.get("recording", {}).get("title") or track.get("title"), year)
+
+            loaded = (catalog, FuzzyMatcher(list(catalog)))
+            self._catalogs.put(artist_id, loaded)
+            return loaded
+
+    def candidates(self, artist, artist_variants):
+        """Títulos del catálogo ya cargado del artista (0 si no se resolvió)."""
+        resolved = self.resolve_artist(artist, artist_variants)
+        loaded = self._catalogs.get(resolved[0]) if resolved else None
+        return len(loaded[0]) if loaded else 0
+
+    def lookup(self, title, artist, artist_variants):
+        """Año más temprano del título en el catálogo del artista, o None."""
+        resolved = self.resolve_artist(artist, artist_variants)
+        if not resolved:
+            return None
+
+        catalog, matcher = self._load(resolved[0])
+        title_key = index_key(title)
+        if title_key in catalog:
+            return catalog[title_key][1]
+
+        best = None
+        scores = matcher.scores(title_key, self.title_threshold)
+        for (_found_title, year), score in zip(catalog.values(), scores):
+            if score and score >= self.title_threshold and (best is None or (score, -year) > best):
+                best = (float(score), -year)
+        return -best[1] if best else None
@@ -0,0 +1,95 @@
+"""Entidad de artista de MusicBrainz: resolución compartida y datos del perfil.
+
+``ArtistResolver`` busca cada artista distinto una sola vez con
+``search_artists`` y guarda la entidad completa. La usan la estrategia
+*artist-first* (para el MBID) y el relleno de las columnas
+``HOMBRE / MUJER / DUO / GRUPO`` y de género, que salen del tipo, el género
+y las etiquetas de esa misma respuesta sin más peticiones.
+"""
+from bounded_cache import MISSING, KeyLocks, LRUCache
+from fuzzy_match import ratio
+from text_keys import index_key
+
+MALE = "HOMBRE"
+FEMALE = "MUJER"
+DUO = "DUO"
+GROUP = "GRUPO"
+
+GROUP_TYPES = ("group", "orchestra", "choir")
+
+# Consulta de ``ArtistResolver``: hasta MAX_VARIANTS variantes, ARTIST_LIMIT candidatos cada una
+ARTIST_QUERY = 'artist:"{artist}"'
+ARTIST_LIMIT = 5
+MAX_VARIANTS = 3
+
+
+def artist_category(entity):
+    """``HOMBRE``, ``MUJER``, ``DUO`` o ``GRUPO`` según el tipo y género, o None."""
+    if not entity:
+        return None
+    artist_type = (entity.get("type") or "").casefold()
+    if artist_type == "person":
+        gender = (entity.get("gender") or "").casefold()
+        return {"male": MALE, "female": FEMALE}.get(gender)
+    if artist_type in GROUP_TYPES:
+        # MusicBrainz no tiene tipo "dúo"; se reconoce por desambiguación o etiquetas
+        hints = [entity.get("disambiguation") or ""] + [tag.get("name", "") for tag in entity.get("tag-list", [])]
+        if any("duo" in index_key(hint).split() or "duet" in index_key(hint).split() for hint in hints):
+            return DUO
+        return GROUP
+    return None
+
+
+def artist_genre(entity):
+    """Etiqueta más votada del artista (en mayúsculas), o None."""
+    tags = (entity or {}).get("tag-list", [])
+    if not tags:
+        return None
+    best = max(tags, key=lambda tag: (int(tag.get("count") or 0), tag.get("name", "")))
+    return best.get("name", "").upper() or None
+
+
+class ArtistResolver:
+    """Resuelve cada artista a su entidad de MusicBrainz una sola vez."""
+
+    def __init__(self, client, threshold=0.85, table=None, max_entities=100000):
+        self.client = client
+        self.threshold = threshold
+        # ArtistTable opcional: su MBID decide entre candidatos y aprende de los aciertos
+        self.table = table
+        self._entities = LRUCache(max_entities)
+        self._lock_for = KeyLocks()
+
+    def resolve(self, artist, artist_variants):
+        """Entidad del artista (diccionario de ``search_artists``) o None si no hay coincidencia clara."""
+        key = index_key(artist)
+        with self._lock_for(key):
+            cached = self._entities.get(key, MISSING)
+            if cached is not MISSING:
+                return cached
+
+            known = self.table.get(artist) if self.table is not None else None
+            resolved = None
+            for variant in artist_variants[:MAX_VARIANTS]:
+                result = self.client.search_artists(query=ARTIST_QUERY.format(artist=variant), limit=ARTIST_LIMIT)
+                if known and known["mbid"]:
+                    match = [candidate for candidate in result.get("artist-list", []) if candidate.get("id") == known["mbid"]]
+                    if match:
+                        resolved, best_score = match[0], 1.0
+                        break
+                best_score = 0.0
+                for candidate in result.get("artist-list", []):
+                    names = [candidate.get("name", ""), candidate.get("sort-name", "")]
+                    names += [alias.get("alias", "") for alias in candidate.get("alias-list", [])]
+                    score = max(ratio(index_key(variant), index_key(name)) for name in names)
+                    if score > best_score:
+                        best_score = score
+                        best = candidate
+                if best_score >= self.threshold:
+                    resolved = best
+                    break
+
+            if resolved is not None and self.table is not None:
+                self.table.learn(artist, resolved.get("name"), resolved.get("id"), best_score)
+            self._entities.put(key, resolved)
+            return resolved
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Tabla persistente de artistas ya resueltos: texto del catálogo -> MusicBrainz.
+
+Cada texto de artista del catálogo (``"CHARLY GARCIA "``, ``"Charly García y
+Pedro Aznar"``...) se guarda por su clave normalizada junto con el nombre
+canónico, el MBID y la confianza del emparejamiento. Se aprende de los
+aciertos de cada ejecución y, si existe una entrada, las consultas usan
+directamente el nombre canónico en lugar de todas las variantes.
+
+Las entradas manuales (``set`` o ``import``) tienen confianza 1.0 y nunca las
+sobrescribe el aprendizaje, así que sirven para corregir emparejamientos::
+
+    python3 artist_table.py set "Charly García y Pedro Aznar" "Charly García"
+    python3 artist_table.py export artistas.csv   # editar y luego...
+    python3 artist_table.py import artistas.csv
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from sqlite_store import SQLiteStore
+from text_keys import index_key
+
+DEFAULT_ARTIST_TABLE_PATH = ".musicbrainz_artists.sqlite"
+DEFAULT_MIN_CONFIDENCE = 0.85
+
+COLUMNS = ("raw", "name", "mbid", "confidence", "source")
+
+
+class ArtistTable(SQLiteStore):
+    """Artistas resueltos en SQLite, con una copia en memoria para las consultas."""
+
+    TABLE = "artists"
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS artists (
+               key TEXT PRIMARY KEY,
+               raw TEXT NOT NULL,
+               name TEXT NOT NULL,
+               mbid TEXT,
+               confidence REAL NOT NULL,
+               source TEXT NOT NULL,
+               updated_at REAL NOT NULL
+           )""",
+    )
+
+    def __init__(self, path=DEFAULT_ARTIST_TABLE_PATH, min_confidence=DEFAULT_MIN_CONFIDENCE, read_only=False):
+        super().__init__(path, read_only=read_only)
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self._entries = {
+            row[0]: dict(zip(COLUMNS, row[1:]))
+            for row in self._conn.execute("SELECT key, raw, name, mbid, confidence, source FROM artists")
+        }
+
+    def get(self, artist):
+        """Entrada del artista (``raw``, ``name``, ``mbid``, ``confidence``, ``source``) o None."""
+        entry = self.peek(artist)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def peek(self, artist):
+        """Como ``get`` pero sin contar un acierto (p. ej. para ``--dry-run``)."""
+        with self._lock:
+            entry = self._entries.get(index_key(artist))
+        if entry is None or entry["confidence"] < self.min_confidence:
+            return None
+        return dict(entry)
+
+    def _store(self, artist, name, mbid, confidence, source):
+        key = index_key(artist)
+        raw = ' '.join(str(artist).split())
+        self._conn.execute(
+            "INSERT OR REPLACE INTO artists (key, raw, name, mbid, confidence, source, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, raw, name, mbid, confidence, source, time.time()),
+        )
+        self._conn.commit()
+        self._entries[key] = dict(zip(COLUMNS, (raw, name, mbid, confidence, source)))
+
+    def learn(self, artist, name, mbid=None, confidence=1.0):
+        """Guarda un emparejamiento encontrado; devuelve True si cambió la tabla.
+
+        Se ignora si no llega a ``min_confidence``, si la entrada es manual o
+        si la guardada tiene más confianza.
+        """
+        if not name or confidence < self.min_confidence or not index_key(artist):
+            return False
+        with self._lock:
+            current = self._entries.get(index_key(artist))
+            if current is not None:
+                if current["source"] == "manual" or current["confidence"] > confidence:
+                    return False
+                if (current["name"], current["mbid"]) == (name, mbid or current["mbid"]):
+                    return False
+            self._store(artist, name, mbid or (current or {}).get("mbid"), confidence, "match")
+        return True
+
+    def set(self, artist, name, mbid=None):
+        """Corrección manual: siempre gana y no se sobrescribe."""
+        with self._lock:
+            self._store(artist, name, mbid, 1.0, "manual")
+
+    def delete(self, artist):
+        with self._lock:
+            self._conn.execute("DELETE FROM artists WHERE key = ?", (index_key(artist),))
+            self._conn.commit()
+            self._entries.pop(index_key(artist), None)
+
+    def to_frame(self):
+        with self._lock:
+            return pd.DataFrame([entry for _key, entry in sorted(self._entries.items())], columns=list(COLUMNS))
+
+    def export_csv(self, path):
+        """Escribe la tabla en un CSV editable; devuelve cuántas filas tiene."""
+        df = self.to_frame()
+        df.to_csv(path, index=False)
+        return len(df)
+
+    def import_csv(self, path):
+        """Carga como manuales las filas de un CSV con ``raw`` y ``name`` (``mbid`` opcional)."""
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        imported = 0
+        for row in df.to_dict("records"):
+            if row.get("raw", "").strip() and row.get("name", "").strip():
+                self.set(row["raw"], row["name"].strip(), row.get("mbid", "").strip() or None)
+                imported += 1
+        return imported
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta y corrige la tabla de artistas resueltos.")
+    parser.add_argument("--table", default=DEFAULT_ARTIST_TABLE_PATH, help="Ruta de la tabla SQLite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="Muestra todas las entradas")
+    set_parser = subparsers.add_parser("set", help="Fija a mano el nombre canónico de un artista")
+    set_parser.add_argument("artist", help="Texto del artista tal como aparece en el catálogo")
+    set_parser.add_argument("name", help="Nombre canónico en MusicBrainz")
+    set_parser.add_argument("--mbid", help="MBID del artista")
+    delete_parser = subparsers.add_parser("delete", help="Borra la entrada de un artista")
+    delete_parser.add_argument("artist")
+    export_parser = subparsers.add_parser("export", help="Exporta la tabla a CSV")
+    export_parser.add_argument("csv")
+    import_parser = subparsers.add_parser("import", help="Importa un CSV (raw, name, mbid) como entradas manuales")
+    import_parser.add_argument("csv")
+    args = parser.parse_args()
+
+    table = ArtistTable(args.table, min_confidence=0.0)
+    if args.command == "list":
+        print(table.to_frame().to_string(index=False))
+    elif args.command == "set":
+        table.set(args.artist, args.name, args.mbid)
+        print(f"✅ {args.artist} -> {args.name}")
+    elif args.command == "delete":
+        table.delete(args.artist)
+        print(f"🗑️  {args.artist} borrado")
+    elif args.command == "export":
+        print(f"✅ {table.export_csv(args.csv)} artistas en {args.csv}")
+    else:
+        print(f"✅ {table.import_csv(args.csv)} artistas importados como manuales")
+    table.close()
@@ -0,0 +1,133 @@
+"""Consultas por lotes: varios títulos del mismo artista en una sola búsqueda.
+
+En lugar de una búsqueda por canción, las canciones pendientes de un mismo
+artista se agrupan en consultas del tipo::
+
+    artist:"Zoé" AND (recording:"Labios rotos" OR recording:"Soñé" OR ...)
+
+con ``limit=100``, y los resultados se reparten en local entre los títulos.
+Cada consulta respeta un límite de longitud y de títulos; los títulos sin
+coincidencia siguen con las estrategias por fila.
+"""
+from bounded_cache import KeyLocks, LRUCache
+from fuzzy_match import FuzzyMatcher, ratio
+from text_keys import index_key, recording_year
+
+# Longitud máxima de la consulta Lucene (va en la URL) y títulos por consulta
+MAX_QUERY_LENGTH = 1000
+MAX_TITLES = 25
+RESULT_LIMIT = 100
+
+
+def lucene_phrase(text):
+    """Frase entre comillas con ``\\`` y ``"`` escapados para Lucene."""
+    return '"' + str(text).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def build_queries(artist, titles, max_length=MAX_QUERY_LENGTH, max_titles=MAX_TITLES):
+    """Reparte ``titles`` en consultas OR; devuelve ``[(query, titles)]``.
+
+    Un título que por sí solo supere ``max_length`` va en una consulta propia.
+    """
+    prefix = f'artist:{lucene_phrase(artist)} AND ('
+    queries = []
+    clauses = []
+    chunk = []
+
+    def flush():
+        if chunk:
+            queries.append((prefix + " OR ".join(clauses) + ")", list(chunk)))
+            clauses.clear()
+            chunk.clear()
+
+    for title in titles:
+        clause = f'recording:{lucene_phrase(title)}'
+        length = len(prefix) + len(" OR ".join(clauses + [clause])) + 1
+        if chunk and (length > max_length or len(chunk) >= max_titles):
+            flush()
+        clauses.append(clause)
+        chunk.append(title)
+    flush()
+    return queries
+
+
+class BatchedRecordingSearch:
+    """Resuelve por lotes los títulos pendientes de cada artista."""
+
+    def __init__(self, client, min_titles=2, max_length=MAX_QUERY_LENGTH, max_titles=MAX_TITLES,
+                 title_threshold=0.6, artist_threshold=0.5, max_artists=10000):
+        self.client = client
+        self.min_titles = min_titles
+        self.max_length = max_length
+        self.max_titles = max_titles
+        self.title_threshold = title_threshold
+        self.artist_threshold = artist_threshold
+        self.pending = {}
+        # Por artista: ({título: año}, {título ya consultado: resultados de su consulta})
+        self._artists = LRUCache(max_artists)
+        self._lock_for = KeyLocks()
+
+    def plan(self, songs):
+        """Registra los títulos pendientes por artista a partir de ``(title, artist)``."""
+        self.pending = {}
+        for title, artist in songs:
+            titles = self.pending.setdefault(index_key(artist), {})
+            titles.setdefault(index_key(title), title)
+
+    def should_batch(self, artist):
+        """Solo compensa si el artista tiene varios títulos pendientes."""
+        return len(self.pending.get(index_key(artist), ())) >= self.min_titles
+
+    def _match(self, titles, recordings, artist):
+        """Mejor ``(año, artista, MBID)`` por título: mayor similitud y, a igualdad, el más temprano."""
+        artist_key = index_key(artist)
+        found = []
+        for recording in recordings:
+            year = recording_year(recording)
+            if not year:
+                continue
+            credits = recording.get("artist-credit", [])
+            found_artist = credits[0].get("artist", {}) if credits else {}
+            if ratio(artist_key, index_key(found_artist.get("name", ""))) >= self.artist_threshold:
+                found.append((recording.get("title", ""), year, found_artist.get("name", ""), found_artist.get("id")))
+
+        matcher = FuzzyMatcher([found_title for found_title, *_rest in found], normalize=index_key)
+        best = {}
+        for title in titles:
+            title_key = index_key(title)
+            for (_found_title, year, name, artist_id), score in zip(found, matcher.scores(title_key, self.title_threshold)):
+                if score and score >= self.title_threshold and (title_key not in best or (score, -year) > best[title_key][:2]):
+                    best[title_key] = (float(score), -year, name, artist_id)
+        return {title_key: (-neg_year, name, artist_id) for title_key, (_score, neg_year, name, artist_id) in best.items()}
+
+    def lookup(self, title, artist):
+        """Año del título según la consulta por lotes de su artista, o None."""
+        found = self.match(title, artist)
+        return found[0] if found else None
+
+    def match(self, title, artist):
+        """``(año, artista, MBID)`` del título según la consulta por lotes, o None.
+
+        La primera vez que se pide un título se consultan juntos todos los
+        títulos pendientes del artista que aún no se habían consultado.
+        """
+        key = index_key(artist)
+        title_key = index_key(title)
+        with self._lock_for(key):
+            years, queried = self._artists.get(key) or ({}, {})
+            self._artists.put(key, (years, queried))
+            if title_key not in queried:
+                titles = {found_key: found_title for found_key, found_title in self.pending.get(key, {}).items()
+                          if found_key not in queried}
+                titles.setdefault(title_key, title)
+                for query, chunk in build_queries(artist, list(titles.values()), self.max_length, self.max_titles):
+                    result = self.client.search_recordings(query=query, limit=RESULT_LIMIT)
+                    recordings = result.get("recording-list", [])
+                    years.update(self._match(chunk, recordings, artist))
+                    queried.update((index_key(chunk_title), len(recordings)) for chunk_title in chunk)
+            return years.get(title_key)
+
+    def candidates(self, title, artist):
+        """Resultados que devolvió la consulta por lotes del título (0 si no se consultó)."""
+        _years, queried = self._artists.get(index_key(artist)) or ({}, {})
+        return queried.get(index_key(title), 0)
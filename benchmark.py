@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Benchmark de ``process_file_fixed`` contra el stub local de MusicBrainz.
+
+Arranca ``mb_stub_server`` en un hilo, apunta ``musicbrainzngs`` a él y
+procesa el CSV indicado. Informa del tiempo total, peticiones por fila,
+tasa de acierto y memoria máxima, para detectar regresiones antes de
+ejecutar contra la API real.
+
+Ejemplo::
+
+    python3 benchmark.py prueba_15_canciones.csv
+    python3 benchmark.py base_total_musical_notion.csv --limit 300 --latency 0.05 --error-rate 0.02
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+
+import musicbrainzngs
+
+import fill_release_year
+from metrics import metrics
+from mb_stub_server import StubState, load_catalog, start_stub
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures", "stub_catalog.jsonl")
+
+
+def run_benchmark(input_path, catalog_path=DEFAULT_CATALOG, limit=None, workers=1, rate=1000.0, burst=10,
+                  latency=0.0, jitter=0.0, error_rate=0.0, artist_first=False, batch_queries=False,
+                  candidate_pool=False, use_cache=False, trace_memory=False, seed=0):
+    """Ejecuta una pasada completa contra el stub y devuelve las métricas."""
+    state = StubState(load_catalog(catalog_path), latency=latency, jitter=jitter,
+                      error_rate=error_rate, seed=seed)
+    server = start_stub(state)
+    host, port = server.server_address[:2]
+    musicbrainzngs.set_hostname(f"{host}:{port}", use_https=False)
+
+    fill_release_year.configure_rate_limit(rate, burst)
+    if artist_first:
+        fill_release_year.configure_artist_first()
+    if batch_queries:
+        fill_release_year.configure_batch_queries()
+    previous_planner = fill_release_year.planner
+    if candidate_pool:
+        fill_release_year.configure_candidate_pool()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            if use_cache:
+                fill_release_year.configure_cache(os.path.join(tmpdir, "cache.sqlite"))
+            output_path = os.path.join(tmpdir, "output.csv")
+
+            if trace_memory:
+                tracemalloc.start()
+            metrics.reset()
+            previous_levels = (fill_release_year.log.level, fill_release_year.summary_log.level)
+            fill_release_year.log.setLevel(logging.WARNING)
+            fill_release_year.summary_log.setLevel(logging.WARNING)
+            started = time.perf_counter()
+            try:
+                summary = fill_release_year.process_file_fixed(
+                    input_path, output_path, limit=limit, workers=workers,
+                )
+            finally:
+                fill_release_year.log.setLevel(previous_levels[0])
+                fill_release_year.summary_log.setLevel(previous_levels[1])
+            wall_time = time.perf_counter() - started
+            if trace_memory:
+                _current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                peak_memory_mb = peak / 1024 / 1024
+            else:
+                peak_memory_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+            if fill_release_year.client.cache is not None:
+                fill_release_year.client.close()
+                fill_release_year.client.cache = None
+    finally:
+        server.shutdown()
+        server.server_close()
+        musicbrainzngs.set_hostname("musicbrainz.org", use_https=True)
+        fill_release_year.artist_catalog = None
+        fill_release_year.batch_search = None
+        fill_release_year.planner = previous_planner
+
+    rows = summary["processed"] if summary else 0
+    return {
+        "input": input_path,
+        "rows": rows,
+        "songs": summary["songs"] if summary else 0,
+        "found": summary["found"] if summary else 0,
+        "hit_rate": (summary["found"] / rows) if rows else 0.0,
+        "requests": state.requests,
+        "errors_503": state.errors,
+        "requests_per_row": (state.requests / rows) if rows else 0.0,
+        "requests_by_endpoint": dict(state.by_endpoint),
+        "wall_time_s": wall_time,
+        "rows_per_minute": (rows / wall_time * 60) if wall_time else 0.0,
+        "peak_memory_mb": peak_memory_mb,
+        "metrics": metrics.to_dict(),
+    }
+
+
+def print_report(results):
+    print(f"📂 Entrada: {results['input']}")
+    print(f"   📊 Filas procesadas: {results['rows']} ({results['songs']} canciones distintas)")
+    print(f"   ✅ Tasa de acierto: {results['hit_rate'] * 100:.1f}% ({results['found']} filas)")
+    print(f"   🌐 Peticiones: {results['requests']} ({results['requests_per_row']:.2f} por fila, {results['errors_503']} con 503)")
+    for endpoint, count in sorted(results["requests_by_endpoint"].items()):
+        print(f"      {endpoint}: {count}")
+    print(f"   ⏱️  Tiempo: {results['wall_time_s']:.2f} s ({results['rows_per_minute']:.0f} filas/min)")
+    print(f"   🧠 Memoria máxima: {results['peak_memory_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de fill_release_year.py contra el stub local.")
+    parser.add_argument("input", nargs="?", default="prueba_15_canciones.csv", help="CSV a procesar")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG, help="Catálogo JSONL del stub")
+    parser.add_argument("--limit", type=int, help="Número de canciones a procesar")
+    parser.add_argument("--workers", type=int, default=1, help="Canciones procesadas en paralelo")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Peticiones por segundo permitidas")
+    parser.add_argument("--burst", type=int, default=10, help="Ráfaga del token bucket")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia fija del stub (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latencia aleatoria adicional del stub (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proporción de respuestas 503 del stub")
+    parser.add_argument("--artist-first", action="store_true", help="Activa la estrategia por artista")
+    parser.add_argument("--batch-queries", action="store_true", help="Activa las consultas OR por artista")
+    parser.add_argument("--candidate-pool", action="store_true", help="Activa la bolsa de candidatos por canción")
+    parser.add_argument("--cache", action="store_true", help="Usa una caché de respuestas temporal")
+    parser.add_argument("--trace-memory", action="store_true", help="Mide la memoria con tracemalloc (más lento)")
+    parser.add_argument("--json", help="Guarda las métricas en este archivo JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.input, args.catalog, limit=args.limit, workers=args.workers, rate=args.rate,
+        burst=args.burst, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        artist_first=args.artist_first, batch_queries=args.batch_queries,
+        candidate_pool=args.candidate_pool, use_cache=args.cache, trace_memory=args.trace_memory,
+    )
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, ensure_ascii=False, indent=2)
+        print(f"💾 Métricas guardadas en {args.json}")
@@ -0,0 +1,61 @@
+"""Cachés en memoria de tamaño acotado para los procesos largos.
+
+Con catálogos de millones de filas (o el servicio HTTP en marcha durante
+días) los diccionarios de "ya lo consulté" crecen sin límite. ``LRUCache``
+descarta lo menos usado al pasar de ``max_size`` y ``KeyLocks`` reparte las
+claves entre un número fijo de candados en lugar de crear uno por clave.
+"""
+import threading
+from collections import OrderedDict
+
+# Valor por defecto de ``get`` para distinguir "no está" de un None guardado
+MISSING = object()
+
+
+class LRUCache:
+    """Diccionario seguro entre hilos que conserva los ``max_size`` valores más recientes."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class KeyLocks:
+    """Candado por clave con memoria constante: cada clave usa uno de ``stripes`` candados.
+
+    Dos claves pueden compartir candado, así que no hay que tomar el de una
+    clave mientras se tiene el de otra.
+    """
+
+    def __init__(self, stripes=64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def __call__(self, key):
+        return self._locks[hash(key) % len(self._locks)]
@@ -0,0 +1,157 @@
+"""Diario de progreso *append-only* en formato JSONL.
+
+Cada fila procesada añade una línea con su índice, el título y artista
+normalizados y el resultado (año encontrado o no). Al reanudar se lee el
+diario para saltar las filas ya resueltas sin reescribir el CSV completo
+tras cada acierto.
+"""
+import json
+import os
+import re
+import time
+from array import array
+
+import numpy as np
+
+
+def default_journal_path(output_path):
+    """Ruta del diario asociada a un archivo de salida."""
+    return f"{output_path}.journal.jsonl"
+
+
+def load_journal(path):
+    """Lee el diario y devuelve ``{row: entrada}`` con la última entrada de cada fila."""
+    entries = {}
+    if not path or not os.path.exists(path):
+        return entries
+
+    with open(path, encoding="utf-8") as journal_file:
+        for line in journal_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Última línea a medio escribir tras un corte
+                continue
+            entries[entry["row"]] = entry
+    return entries
+
+
+# CheckpointJournal escribe siempre la fila primero: no hace falta decodificar toda la línea
+ROW_PREFIX = re.compile(rb'\{"row": (\d+),')
+
+
+def _line_row(line):
+    """Fila de una línea del diario, o None si está vacía o a medio escribir tras un corte."""
+    match = ROW_PREFIX.match(line)
+    # Una línea cortada y cerrada después con "\n" al reanudar no acaba en "}"
+    if match and line.endswith(b"}\n"):
+        return int(match.group(1))
+    try:
+        return json.loads(line)["row"]
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+class JournalIndex:
+    """Posición en el diario de la última línea de cada fila, leída en una sola pasada.
+
+    Para reanudar por bloques (``--chunksize``) sin cargar el diario entero
+    ni releerlo en cada bloque: el índice ocupa 16 bytes por fila y
+    ``entries`` solo lee las líneas de las filas pedidas.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        rows = array("q")
+        offsets = array("q")
+        if path and os.path.exists(path):
+            with open(path, "rb") as journal_file:
+                offset = 0
+                for line in journal_file:
+                    row = _line_row(line)
+                    if row is not None:
+                        rows.append(row)
+                        offsets.append(offset)
+                    offset += len(line)
+
+        rows = np.frombuffer(rows, dtype=np.int64) if rows else np.empty(0, dtype=np.int64)
+        offsets = np.frombuffer(offsets, dtype=np.int64) if offsets else np.empty(0, dtype=np.int64)
+        # Ordenado por fila y, dentro de cada fila, en orden de escritura: gana la última
+        order = np.argsort(rows, kind="stable")
+        rows, offsets = rows[order], offsets[order]
+        last = np.append(rows[1:] != rows[:-1], True) if len(rows) else np.empty(0, dtype=bool)
+        self._rows = rows[last]
+        self._offsets = offsets[last]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def entries(self, rows):
+        """``{row: entrada}`` de las filas del ``range`` ``rows`` (p. ej. las de un bloque)."""
+        start = np.searchsorted(self._rows, rows.start)
+        stop = np.searchsorted(self._rows, rows.stop)
+        entries = {}
+        if start == stop:
+            return entries
+        with open(self.path, "rb") as journal_file:
+            # En orden de posición: si las líneas son contiguas se leen sin saltar
+            position = None
+            for offset in np.sort(self._offsets[start:stop]).tolist():
+                if offset != position:
+                    journal_file.seek(offset)
+                line = journal_file.readline()
+                position = offset + len(line)
+                entry = json.loads(line)
+                entries[entry["row"]] = entry
+        return entries
+
+
+def merge_journals(paths, output_path):
+    """Junta varios diarios (p. ej. de shards) en uno ordenado por fila; devuelve cuántas filas tiene."""
+    entries = {}
+    for path in paths:
+        entries.update(load_journal(path))
+    with open(output_path, "w", encoding="utf-8") as journal_file:
+        for row in sorted(entries):
+            journal_file.write(json.dumps(entries[row], ensure_ascii=False) + "\n")
+    return len(entries)
+
+
+class CheckpointJournal:
+    """Escribe una línea por fila procesada y la vuelca a disco al momento."""
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        if resume and self._file.tell() > 0:
+            # Cierra una posible línea a medio escribir antes de añadir más
+            with open(path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def record(self, row, title, artist, year):
+        entry = {
+            "row": int(row),
+            "title": title,
+            "artist": artist,
+            "year": int(year) if year else None,
+            "status": "found" if year else "not_found",
+            "ts": time.time(),
+        }
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -4,22 +4,224 @@
 El problema era que los recordings no siempre tienen first-release-date,
 pero sí tienen releases asociados con fechas específicas.
 """
+import numpy as np
 import pandas as pd
-import musicbrainzngs
 import unidecode
 import time
 import argparse
+import itertools
+import logging
 import tempfile
 import os
-import re
-from difflib import SequenceMatcher
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 
-# Identifícate para cumplir las políticas de MusicBrainz
-musicbrainzngs.set_useragent("VibraMusicYearFiller", "3.0", "contacto@tusitio.com")
+from mb_cache import ResponseCache, DEFAULT_CACHE_PATH, DEFAULT_TTL, DEFAULT_MAX_ENTRIES
+from mb_client import MusicBrainzClient
+from retry_policy import RetriesExhausted, RetryPolicy
+from rate_limiter import TokenBucket
+from checkpoint import CheckpointJournal, JournalIndex, default_journal_path, load_journal, merge_journals
+from offline_index import OfflineIndex
+from text_keys import MAX_YEAR, MIN_YEAR, SPACES, earliest_year, index_key, parse_year, recording_year
+from artist_catalog import ArtistCatalog
+from artist_profile import ARTIST_LIMIT, ARTIST_QUERY, MAX_VARIANTS, ArtistResolver, artist_category, artist_genre
+from bounded_cache import MISSING, LRUCache
+from artist_table import ArtistTable, DEFAULT_ARTIST_TABLE_PATH, DEFAULT_MIN_CONFIDENCE
+from batch_query import BatchedRecordingSearch
+from table_io import ChunkWriter, file_format, iter_chunks, read_column_names, read_table, write_table
+from fuzzy_match import FuzzyMatcher, ratio
+from incremental import PreviousResults, row_hashes
+from song_clusters import SongClusterer
+from sharding import merge_tables, parse_shard, shard_mask, shard_output_path
+from negative_cache import NegativeCache, DEFAULT_NEGATIVE_CACHE_PATH, DEFAULT_MISS_BACKOFF, DEFAULT_ERROR_BACKOFF
+from progress import ProgressTracker, format_duration
+from query_planner import QueryPlanner, plan_artist_variants
+from metrics import metrics
+
+log = logging.getLogger("fill_release_year")
+# El resumen final se muestra también en modo --quiet
+summary_log = logging.getLogger("fill_release_year.summary")
+
+# Cliente compartido por todas las búsquedas (sin caché hasta que se configure)
+client = MusicBrainzClient()
+
+# Índice local; si está configurado sustituye por completo al cliente HTTP
+offline_index = None
+
+# Entidades de artista resueltas, compartidas por artist-first y el perfil
+artist_resolver = ArtistResolver(client)
+
+# Tabla persistente de artistas ya resueltos (desactivada por defecto)
+artist_table = None
+
+# Catálogo por artista para la estrategia artist-first (desactivado por defecto)
+artist_catalog = None
+
+# Relleno de HOMBRE / MUJER / DUO / GRUPO y género (desactivado por defecto)
+fill_profiles = False
+genre_column = None
+
+# Consultas OR por artista (desactivadas por defecto)
+batch_search = None
+
+# Caché negativa de canciones no encontradas (desactivada por defecto)
+negative_cache = None
+
+# Valores de una salida anterior para el modo incremental (desactivado por defecto)
+# y si se vuelven a buscar sus filas sin año
+previous_results = None
+retry_misses = False
+
+# Agrupación de canciones casi iguales (desactivada por defecto) y su informe CSV
+clusterer = None
+cluster_report = None
+
+# Parte del catálogo que procesa este proceso, ``(i, N)`` (por defecto todo)
+shard = None
+
+# Lo que ve la búsqueda en curso de cada hilo, para saber por qué falló
+_outcome = threading.local()
+
+# Ritmo de la tanda de búsquedas en curso (para la línea de PROGRESO)
+progress = None
+PROGRESS_LOG_SECONDS = 30
+
+# Orden adaptativo de estrategias y variantes según sus aciertos
+planner = QueryPlanner()
+
+def setup_logging(quiet=False, verbose=False):
+    """Configura la salida: detalle por consulta con ``verbose``, solo resumen con ``quiet``."""
+    logging.basicConfig(format="%(message)s")
+    if verbose:
+        log.setLevel(logging.DEBUG)
+    elif quiet:
+        log.setLevel(logging.WARNING)
+    else:
+        log.setLevel(logging.INFO)
+    summary_log.setLevel(logging.INFO)
+
+def configure_cache(path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, read_only=False):
+    """Activa la caché persistente de respuestas en el cliente compartido."""
+    client.cache = ResponseCache(path, ttl=ttl, max_entries=max_entries, read_only=read_only)
+    return client.cache
+
+def configure_rate_limit(rate=1.0, burst=1):
+    """Fija el presupuesto de peticiones por segundo del cliente compartido."""
+    client.rate_limiter = TokenBucket(rate=rate, burst=burst)
+    return client.rate_limiter
+
+def configure_retries(max_retries=5, base_delay=1.0, max_delay=60.0):
+    """Fija cuántas veces y con qué espera se reintentan los 503 y errores de red."""
+    client.retry_policy = RetryPolicy(max_retries=max_retries, base_delay=base_delay, max_delay=max_delay)
+    return client.retry_policy
+
+def configure_offline_index(path):
+    """Usa un índice local construido con ``offline_index.py`` en lugar de la API."""
+    global offline_index
+    offline_index = OfflineIndex(path)
+    return offline_index
+
+def configure_artist_table(path=DEFAULT_ARTIST_TABLE_PATH, min_confidence=DEFAULT_MIN_CONFIDENCE, read_only=False):
+    """Usa y aprende la tabla de artistas resueltos en lugar de expandir variantes."""
+    global artist_table
+    artist_table = ArtistTable(path, min_confidence=min_confidence, read_only=read_only)
+    artist_resolver.table = artist_table
+    return artist_table
+
+def configure_artist_first(min_songs=3, max_pages=20):
+    """Activa la estrategia que recorre el catálogo completo de cada artista."""
+    global artist_catalog
+    artist_catalog = ArtistCatalog(client, min_songs=min_songs, max_pages=max_pages, resolver=artist_resolver)
+    return artist_catalog
+
+def configure_artist_profiles(genre=None):
+    """Rellena la categoría del artista y, si se indica, la columna de género ``genre``."""
+    global fill_profiles, genre_column
+    fill_profiles = True
+    genre_column = genre
+
+def configure_negative_cache(path=DEFAULT_NEGATIVE_CACHE_PATH, miss_backoff=DEFAULT_MISS_BACKOFF,
+                             error_backoff=DEFAULT_ERROR_BACKOFF, read_only=False):
+    """Salta las canciones que ya fallaron hasta que venza su plazo de reintento."""
+    global negative_cache
+    negative_cache = NegativeCache(path, miss_backoff=miss_backoff, error_backoff=error_backoff, read_only=read_only)
+    return negative_cache
+
+def note_candidates(count):
+    """Anota cuántos resultados devolvió una consulta de la búsqueda en curso."""
+    _outcome.candidates = getattr(_outcome, "candidates", 0) + count
+
+def note_artist_match(name, artist_id):
+    """Anota el artista del candidato aceptado en la búsqueda en curso."""
+    _outcome.artist_match = (name, artist_id)
+
+def credited_artist(item):
+    """``(nombre, MBID)`` del primer artista acreditado de un resultado de búsqueda."""
+    credits = item.get("artist-credit", [])
+    artist = credits[0].get("artist", {}) if credits else {}
+    return artist.get("name", ""), artist.get("id")
+
+def note_error():
+    """Anota que una consulta de la búsqueda en curso falló."""
+    _outcome.errors = getattr(_outcome, "errors", 0) + 1
+
+def configure_batch_queries(min_titles=2):
+    """Agrupa los títulos de cada artista en consultas OR compartidas."""
+    global batch_search
+    batch_search = BatchedRecordingSearch(client, min_titles=min_titles)
+    return batch_search
+
+def configure_incremental(path, retry=False):
+    """Reutiliza los años y perfiles de la salida enriquecida ``path``.
+    
+    Las filas sin cambios que allí quedaron sin año no se buscan, salvo con
+    ``retry=True``.
+    """
+    global previous_results, retry_misses
+    retry_misses = retry
+    columns = read_column_names(path)
+    title_column, artist_column, year_column = detect_columns(columns)
+    if not title_column or not artist_column or not year_column:
+        raise ValueError(f"{path} no tiene columnas de título, artista y año")
+    fields = {"year": year_column, "category": find_column(columns, CATEGORY_KEYWORDS), "genre": genre_column}
+    fields = {field: column for field, column in fields.items() if column in columns}
+    df = read_table(path, columns=[title_column, artist_column] + list(fields.values()), year_column=year_column)
+    df[year_column] = df[year_column].astype("string").mask(years_missing(df[year_column]))
+    previous_results = PreviousResults(df, title_column, artist_column, fields)
+    return previous_results
+
+def configure_clustering(title_threshold=0.9, artist_threshold=0.85, report_path=None):
+    """Busca una sola vez las canciones casi iguales; ``report_path`` guarda los grupos en CSV."""
+    global clusterer, cluster_report
+    clusterer = SongClusterer(title_threshold=title_threshold, artist_threshold=artist_threshold)
+    cluster_report = report_path
+    if report_path:
+        pd.DataFrame(columns=["grupo", "fila", "titulo", "artista"]).to_csv(report_path, index=False)
+    return clusterer
+
+def configure_shard(index, count):
+    """Procesa solo las filas de los artistas del shard ``index`` de ``count``."""
+    global shard
+    shard = (index, count)
+    return shard
+
+def configure_candidate_pool():
+    """Sustituye las tres estrategias secuenciales por la bolsa de candidatos."""
+    global planner
+    planner = QueryPlanner(strategies=("pool",))
+    return planner
+
+def plan_lookups(work_units):
+    """Prepara las estrategias por artista con las canciones pendientes."""
+    if artist_catalog is not None:
+        artist_catalog.plan(artist for _indices, _title, artist in work_units)
+    if batch_search is not None:
+        batch_search.plan((title, artist) for _indices, title, artist in work_units)
 
 def similarity(a, b):
     """Calcula la similitud entre dos strings."""
-    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+    return ratio(a.lower(), b.lower())
 
 def normalize_text(text):
     """Normalización mejorada de texto."""
@@ -34,8 +236,43 @@ def normalize_text(text):
     text = ' '.join(text.split())
     return text
 
+def variants_for_artist(artist, peek=False):
+    """Variantes ``[(tipo, variante)]`` de un artista.
+    
+    Si el artista está en la tabla de artistas solo se usa su nombre
+    canónico; si no, las de ``plan_artist_variants``. Con ``peek`` la
+    consulta a la tabla no cuenta como acierto.
+    """
+    if artist_table is not None:
+        entry = artist_table.peek(artist) if peek else artist_table.get(artist)
+        if entry:
+            if not peek:
+                metrics.inc("artist_table_hits_total")
+            return [("tabla", entry["name"])]
+    return plan_artist_variants(artist)
+
+def learn_artist(artist):
+    """Guarda en la tabla de artistas el artista del candidato aceptado, si lo hay.
+    
+    La confianza es la mejor similitud entre ese artista y las variantes del
+    original (p. ej. el artista principal de una colaboración), comparadas
+    con ``index_key`` como en ``ArtistResolver``: ``ZOE`` y ``Zoé`` valen 1.0.
+    """
+    match = getattr(_outcome, "artist_match", None)
+    if artist_table is None or not match or not match[0]:
+        return
+    name, artist_id = match
+    confidence = max(ratio(index_key(variant), index_key(name)) for _kind, variant in plan_artist_variants(artist))
+    if artist_table.learn(artist, name, artist_id, confidence):
+        metrics.inc("artist_table_learned_total")
+        log.debug(f"   📇 Artista aprendido: '{artist}' -> '{name}' ({confidence:.2f})")
+
 def clean_artist_name(artist):
-    """Limpia nombres de artistas con múltiples variantes."""
+    """Variantes de un artista para las consultas, sin duplicados bajo Lucene.
+    
+    Devuelve el original, sin acentos y, si hay colaboraciones, el artista
+    principal con y sin acentos; siempre en ese orden.
+    """
     if pd.isna(artist):
         return []
     
@@ -43,92 +280,60 @@ def clean_artist_name(artist):
     if not artist or artist.lower() == 'nan':
         return []
     
-    variants = []
-    
-    # Variante original
-    variants.append(artist)
-    
-    # Sin acentos
-    no_accents = unidecode.unidecode(artist)
-    variants.append(no_accents)
-    
-    # Variantes de capitalización
-    variants.append(artist.title())  # "Charly Garcia" 
-    variants.append(artist.lower())   # "charly garcia"
-    variants.append(no_accents.title())  # "Charly Garcia"
-    variants.append(no_accents.lower())  # "charly garcia"
-    
-    # Solo el primer artista si hay colaboraciones
-    parts = re.split(r'\s*(?:&|/|,|\band\b|\by\b|\bfeat\.?\b|\bft\.?\b)\s*', artist, maxsplit=1, flags=re.IGNORECASE)
-    if len(parts) > 1:
-        main_artist = parts[0].strip()
-        variants.append(main_artist)
-        variants.append(unidecode.unidecode(main_artist))
-        variants.append(main_artist.title())
-        variants.append(main_artist.lower())
-    
-    return list(set(filter(None, variants)))
+    return [variant for _kind, variant in plan_artist_variants(artist)]
+
+# Años ya consultados por recording ID (None = consultado sin fecha)
+_recording_years = LRUCache(100000)
 
 def get_year_from_releases(recording_id):
-    """Obtiene el año más temprano de los releases asociados a una grabación."""
+    """Obtiene el año más temprano de los releases asociados a una grabación.
+    
+    Solo se usa cuando el resultado de búsqueda no trae fechas; hace una
+    única consulta ``get_recording_by_id`` por grabación y la recuerda.
+    """
+    year = _recording_years.get(recording_id, MISSING)
+    if year is not MISSING:
+        return year
+    
     try:
-        print(f"      🔍 Buscando releases para recording ID: {recording_id}")
-        
-        # Busca releases que contengan esta grabación
-        result = musicbrainzngs.search_releases(query=f'rid:{recording_id}', limit=10)
-        releases = result.get("release-list", [])
+        log.debug(f"      🔍 Buscando releases para recording ID: {recording_id}")
         
-        print(f"      📊 Releases encontrados: {len(releases)}")
-        
-        years = []
-        for release in releases:
-            date = release.get("date", "")
-            title = release.get("title", "")
-            print(f"         📅 '{title}' - Fecha: '{date}'")
-            
-            if date and len(date) >= 4:
-                try:
-                    year = int(date[:4])
-                    if 1900 <= year <= 2025:
-                        years.append(year)
-                        print(f"         ✅ Año válido: {year}")
-                except (ValueError, TypeError):
-                    continue
+        result = client.get_recording_by_id(recording_id, includes=["releases"])
+        releases = result.get("recording", {}).get("release-list", [])
         
-        if years:
-            earliest_year = min(years)
-            print(f"      🎯 Año más temprano: {earliest_year}")
-            return earliest_year
+        log.debug(f"      📊 Releases encontrados: {len(releases)}")
         
-        return None
+        year = earliest_year(release.get("date", "") for release in releases)
+        if year:
+            log.debug(f"      🎯 Año más temprano: {year}")
+        _recording_years.put(recording_id, year)
+        return year
         
+    except RetriesExhausted:
+        raise
     except Exception as e:
-        print(f"      ❌ Error buscando releases: {e}")
+        log.warning(f"      ❌ Error buscando releases: {e}")
         return None
 
-def search_release_year_fixed(title, artist):
-    """Versión CORREGIDA que busca en recordings Y sus releases asociados."""
+def strategy_release(title_clean, variants):
+    """Estrategia 1: búsqueda directa de releases (más rápida).
     
-    if not title or not artist:
-        return None
-    
-    title_clean = normalize_text(title)
-    artist_variants = clean_artist_name(artist)
-    
-    print(f"   🎵 '{title_clean}' por '{artist_variants[0] if artist_variants else 'N/A'}'")
-    print(f"   🔍 Variantes de artista ({len(artist_variants)}): {artist_variants[:3]}...")  # Muestra solo las primeras 3
-    
-    # Estrategia 1: Búsqueda directa de releases (más rápida)
-    print(f"   📀 ESTRATEGIA 1: Búsqueda directa de releases")
-    for artist_var in artist_variants[:3]:  # Solo las 3 primeras variantes
+    Devuelve ``(year, peticiones)``; ``year`` es None si no hay coincidencia.
+    """
+    calls = 0
+    log.debug(f"   📀 ESTRATEGIA 1: Búsqueda directa de releases")
+    _entity, template, limit, max_variants = STRATEGY_QUERIES["release"]
+    for kind, artist_var in variants[:max_variants]:
         try:
-            query = f'release:"{title_clean}" AND artist:"{artist_var}"'
-            print(f"      🔍 RELEASE: {query}")
+            query = template.format(title=title_clean, artist=artist_var)
+            log.debug(f"      🔍 RELEASE: {query}")
             
-            result = musicbrainzngs.search_releases(query=query, limit=5)
+            calls += 1
+            result = client.search_releases(query=query, limit=limit)
             releases = result.get("release-list", [])
+            note_candidates(len(releases))
             
-            print(f"      📊 Releases encontrados: {len(releases)}")
+            log.debug(f"      📊 Releases encontrados: {len(releases)}")
             
             for release in releases:
                 date = release.get("date", "")
@@ -136,45 +341,58 @@ def search_release_year_fixed(title, artist):
                 
                 # Obtener artista
                 found_artist = ""
+                found_artist_id = None
                 artist_info = release.get("artist-credit", [])
                 if artist_info:
                     found_artist = artist_info[0].get("artist", {}).get("name", "")
+                    found_artist_id = artist_info[0].get("artist", {}).get("id")
                 
-                print(f"         📅 '{found_title}' por '{found_artist}' - Fecha: '{date}'")
+                log.debug(f"         📅 '{found_title}' por '{found_artist}' - Fecha: '{date}'")
                 
-                if date and len(date) >= 4:
-                    try:
-                        year = int(date[:4])
-                        if 1900 <= year <= 2025:
-                            # Validación permisiva
-                            title_sim = similarity(title_clean, found_title)
-                            artist_sim = similarity(artist_var, found_artist)
-                            
-                            print(f"         📈 Similitud título: {title_sim:.2f}, artista: {artist_sim:.2f}")
-                            
-                            if title_sim >= 0.6 and artist_sim >= 0.5:
-                                print(f"         ✅ ENCONTRADO VÍA RELEASE: {year}")
-                                return year
-                    except (ValueError, TypeError):
-                        continue
+                year = parse_year(date)
+                if year:
+                    # Validación permisiva
+                    title_sim = similarity(title_clean, found_title)
+                    artist_sim = similarity(artist_var, found_artist)
+                    
+                    log.debug(f"         📈 Similitud título: {title_sim:.2f}, artista: {artist_sim:.2f}")
+                    
+                    if title_sim >= 0.6 and artist_sim >= 0.5:
+                        log.debug(f"         ✅ ENCONTRADO VÍA RELEASE: {year}")
+                        note_artist_match(found_artist, found_artist_id)
+                        planner.record_variant(kind, True)
+                        return year, calls
             
-            time.sleep(0.5)
+            planner.record_variant(kind, False)
             
+        except RetriesExhausted:
+            raise
         except Exception as e:
-            print(f"      ❌ Error en búsqueda de release: {e}")
+            log.warning(f"      ❌ Error en búsqueda de release: {e}")
+            note_error()
             continue
     
-    # Estrategia 2: Búsqueda de recordings y luego sus releases
-    print(f"   🎤 ESTRATEGIA 2: Recordings + releases asociados")
-    for artist_var in artist_variants[:2]:  # Solo las 2 primeras para no ser demasiado lento
+    return None, calls
+
+def strategy_recording(title_clean, variants):
+    """Estrategia 2: recordings y fechas de sus releases.
+    
+    Devuelve ``(year, peticiones)``; ``year`` es None si no hay coincidencia.
+    """
+    calls = 0
+    log.debug(f"   🎤 ESTRATEGIA 2: Recordings y fechas de sus releases")
+    _entity, template, limit, max_variants = STRATEGY_QUERIES["recording"]
+    for kind, artist_var in variants[:max_variants]:
         try:
-            query = f'recording:"{title_clean}" AND artist:"{artist_var}"'
-            print(f"      🔍 RECORDING: {query}")
+            query = template.format(title=title_clean, artist=artist_var)
+            log.debug(f"      🔍 RECORDING: {query}")
             
-            result = musicbrainzngs.search_recordings(query=query, limit=3)
+            calls += 1
+            result = client.search_recordings(query=query, limit=limit)
             recordings = result.get("recording-list", [])
+            note_candidates(len(recordings))
             
-            print(f"      📊 Recordings encontrados: {len(recordings)}")
+            log.debug(f"      📊 Recordings encontrados: {len(recordings)}")
             
             for recording in recordings:
                 recording_id = recording.get("id", "")
@@ -182,69 +400,309 @@ def search_release_year_fixed(title, artist):
                 
                 # Obtener artista
                 found_artist = ""
+                found_artist_id = None
                 artist_info = recording.get("artist-credit", [])
                 if artist_info:
                     found_artist = artist_info[0].get("artist", {}).get("name", "")
+                    found_artist_id = artist_info[0].get("artist", {}).get("id")
                 
-                print(f"         🎵 '{found_title}' por '{found_artist}' - ID: {recording_id}")
+                log.debug(f"         🎵 '{found_title}' por '{found_artist}' - ID: {recording_id}")
                 
                 if recording_id:
                     # Validación antes de buscar releases
                     title_sim = similarity(title_clean, found_title)
                     artist_sim = similarity(artist_var, found_artist)
                     
-                    print(f"         📈 Similitud título: {title_sim:.2f}, artista: {artist_sim:.2f}")
+                    log.debug(f"         📈 Similitud título: {title_sim:.2f}, artista: {artist_sim:.2f}")
                     
                     if title_sim >= 0.6 and artist_sim >= 0.5:
-                        year = get_year_from_releases(recording_id)
+                        # Las fechas suelen venir en el propio resultado de búsqueda
+                        year = recording_year(recording) or get_year_from_releases(recording_id)
                         if year:
-                            print(f"         ✅ ENCONTRADO VÍA RECORDING: {year}")
-                            return year
+                            log.debug(f"         ✅ ENCONTRADO VÍA RECORDING: {year}")
+                            note_artist_match(found_artist, found_artist_id)
+                            planner.record_variant(kind, True)
+                            return year, calls
                     else:
-                        print(f"         ⚠️ Similitud insuficiente, saltando...")
+                        log.debug(f"         ⚠️ Similitud insuficiente, saltando...")
             
-            time.sleep(0.5)
+            planner.record_variant(kind, False)
             
+        except RetriesExhausted:
+            raise
         except Exception as e:
-            print(f"      ❌ Error en búsqueda de recording: {e}")
+            log.warning(f"      ❌ Error en búsqueda de recording: {e}")
+            note_error()
             continue
     
-    # Estrategia 3: Búsqueda más simple sin comillas
-    print(f"   🔍 ESTRATEGIA 3: Búsqueda simple")
-    for artist_var in artist_variants[:2]:
+    return None, calls
+
+def strategy_simple(title_clean, variants):
+    """Estrategia 3: búsqueda más simple sin comillas.
+    
+    Devuelve ``(year, peticiones)``; ``year`` es None si no hay coincidencia.
+    """
+    calls = 0
+    log.debug(f"   🔍 ESTRATEGIA 3: Búsqueda simple")
+    _entity, template, limit, max_variants = STRATEGY_QUERIES["simple"]
+    for kind, artist_var in variants[:max_variants]:
         try:
-            query = f'{title_clean} AND {artist_var}'
-            print(f"      🔍 SIMPLE: {query}")
+            query = template.format(title=title_clean, artist=artist_var)
+            log.debug(f"      🔍 SIMPLE: {query}")
             
-            result = musicbrainzngs.search_releases(query=query, limit=3)
+            calls += 1
+            result = client.search_releases(query=query, limit=limit)
             releases = result.get("release-list", [])
+            note_candidates(len(releases))
             
             for release in releases:
                 date = release.get("date", "")
                 found_title = release.get("title", "")
                 
-                if date and len(date) >= 4:
-                    try:
-                        year = int(date[:4])
-                        if 1900 <= year <= 2025:
-                            title_sim = similarity(title_clean, found_title)
-                            print(f"         📈 '{found_title}' - {year} (sim: {title_sim:.2f})")
-                            
-                            if title_sim >= 0.7:  # Más estricto para búsqueda simple
-                                print(f"         ✅ ENCONTRADO VÍA SIMPLE: {year}")
-                                return year
-                    except (ValueError, TypeError):
-                        continue
+                year = parse_year(date)
+                if year:
+                    title_sim = similarity(title_clean, found_title)
+                    log.debug(f"         📈 '{found_title}' - {year} (sim: {title_sim:.2f})")
+                    
+                    if title_sim >= 0.7:  # Más estricto para búsqueda simple
+                        log.debug(f"         ✅ ENCONTRADO VÍA SIMPLE: {year}")
+                        planner.record_variant(kind, True)
+                        return year, calls
+            
+            planner.record_variant(kind, False)
+            
+        except RetriesExhausted:
+            raise
+        except Exception as e:
+            log.warning(f"      ❌ Error en búsqueda simple: {e}")
+            note_error()
+            continue
+    
+    return None, calls
+
+# Modo de bolsa de candidatos: una consulta grande por fila y reordenación local
+POOL_LIMIT = 50
+POOL_MARGIN = 0.1
+
+def score_candidates(title_clean, artist_var, recordings):
+    """Candidatos ``(title_sim, artist_sim, year, recording_id)`` que superan los umbrales.
+    
+    Cada recording aporta su propio título y, además, el de cada release en
+    el que aparece (como en la estrategia de releases). Todos los títulos de
+    la bolsa se puntúan de una vez con ``FuzzyMatcher``.
+    """
+    found = []
+    for recording in recordings:
+        found_artist = ""
+        artist_info = recording.get("artist-credit", [])
+        if artist_info:
+            found_artist = artist_info[0].get("artist", {}).get("name", "")
+        artist_sim = similarity(artist_var, found_artist)
+        if artist_sim < 0.5:
+            continue
+        
+        recording_id = recording.get("id", "")
+        found.append((recording.get("title", ""), artist_sim, recording_year(recording), recording_id))
+        for release in recording.get("release-list", []):
+            found.append((release.get("title", ""), artist_sim, parse_year(release.get("date", "")), recording_id))
+    
+    matcher = FuzzyMatcher([found_title for found_title, *_rest in found], normalize=str.lower)
+    scores = matcher.scores(title_clean, threshold=0.6)
+    return [
+        (float(title_sim), artist_sim, year, recording_id)
+        for (_found_title, artist_sim, year, recording_id), title_sim in zip(found, scores)
+        if title_sim >= 0.6
+    ]
+
+def pick_year(candidates):
+    """Año más temprano entre los candidatos de alta confianza.
+    
+    Son de alta confianza los que quedan a menos de ``POOL_MARGIN`` del
+    mejor título. Si ninguno trae fecha, se consultan los releases del mejor.
+    """
+    if not candidates:
+        return None
+    best_title = max(title_sim for title_sim, _artist_sim, _year, _id in candidates)
+    confident = [candidate for candidate in candidates if candidate[0] >= best_title - POOL_MARGIN]
+    years = [year for _title_sim, _artist_sim, year, _id in confident if year]
+    if years:
+        return min(years)
+    
+    _title_sim, _artist_sim, _year, recording_id = max(confident, key=lambda candidate: candidate[:2])
+    return get_year_from_releases(recording_id) if recording_id else None
+
+def strategy_pool(title_clean, variants):
+    """Bolsa de candidatos: recordings y sus releases en una sola consulta.
+    
+    Devuelve ``(year, peticiones)``; ``year`` es None si no hay coincidencia.
+    """
+    calls = 0
+    log.debug(f"   🧺 BOLSA DE CANDIDATOS")
+    _entity, template, limit, max_variants = STRATEGY_QUERIES["pool"]
+    for kind, artist_var in variants[:max_variants]:
+        try:
+            query = template.format(title=title_clean, artist=artist_var)
+            log.debug(f"      🔍 POOL: {query}")
+            
+            calls += 1
+            result = client.search_recordings(query=query, limit=limit)
+            recordings = result.get("recording-list", [])
+            note_candidates(len(recordings))
+            candidates = score_candidates(title_clean, artist_var, recordings)
+            
+            log.debug(f"      📊 Candidatos por encima del umbral: {len(candidates)}")
+            for title_sim, artist_sim, year, _recording_id in sorted(candidates, reverse=True)[:5]:
+                log.debug(f"         📈 {year} (título: {title_sim:.2f}, artista: {artist_sim:.2f})")
             
-            time.sleep(0.5)
+            if candidates:
+                year = pick_year(candidates)
+                planner.record_variant(kind, bool(year))
+                if year:
+                    log.debug(f"         ✅ ENCONTRADO EN LA BOLSA: {year}")
+                    # El artista aceptado es el del mejor candidato
+                    best_id = max(candidates, key=lambda candidate: candidate[:2])[3]
+                    best = next((recording for recording in recordings if recording.get("id") == best_id), {})
+                    note_artist_match(*credited_artist(best))
+                    return year, calls
+                continue
             
+            planner.record_variant(kind, False)
+            
+        except RetriesExhausted:
+            raise
         except Exception as e:
-            print(f"      ❌ Error en búsqueda simple: {e}")
+            log.warning(f"      ❌ Error en bolsa de candidatos: {e}")
+            note_error()
             continue
     
-    print(f"   ❌ No encontrado después de 3 estrategias")
+    return None, calls
+
+# Consulta de cada estrategia: (entidad, plantilla, límite, variantes de artista que prueba).
+# Recording y simple solo prueban 2 variantes para no ser demasiado lentas.
+STRATEGY_QUERIES = {
+    "release": ("release", 'release:"{title}" AND artist:"{artist}"', 5, 3),
+    "recording": ("recording", 'recording:"{title}" AND artist:"{artist}"', 3, 2),
+    "simple": ("release", '{title} AND {artist}', 3, 2),
+    "pool": ("recording", '(recording:"{title}" OR release:"{title}") AND artist:"{artist}"', POOL_LIMIT, 2),
+}
+
+STRATEGIES = {
+    "release": strategy_release,
+    "recording": strategy_recording,
+    "simple": strategy_simple,
+    "pool": strategy_pool,
+}
+
+def search_release_year_fixed(title, artist):
+    """Versión CORREGIDA que busca en recordings Y sus releases asociados.
+    
+    Si MusicBrainz sigue fallando tras los reintentos se abandona la canción
+    en lugar de gastar el resto de estrategias; queda anotada como error.
+    """
+    try:
+        return _search_release_year(title, artist)
+    except RetriesExhausted as e:
+        note_error()
+        _outcome.exhausted = True
+        log.warning(f"   ⏳ MusicBrainz no responde, se deja la canción para otro intento: {e}")
+        return None
+
+def _search_release_year(title, artist):
+    if not title or not artist:
+        return None
+    
+    title_clean = normalize_text(title)
+    _outcome.artist_match = None
+    variants = variants_for_artist(normalize_text(artist))
+    artist_variants = [variant for _kind, variant in variants]
+    
+    log.debug(f"   🎵 '{title_clean}' por '{artist_variants[0] if artist_variants else 'N/A'}'")
+    log.debug(f"   🔍 Variantes de artista ({len(artist_variants)}): {artist_variants[:3]}...")  # Muestra solo las primeras 3
+    
+    if offline_index is not None:
+        with metrics.timer("strategy_seconds", strategy="offline_index"):
+            year = offline_index.lookup_year(title_clean, artist_variants)
+        metrics.inc("strategy_attempts_total", strategy="offline_index")
+        if year:
+            metrics.inc("strategy_hits_total", strategy="offline_index")
+        log.debug(f"   {'✅ ENCONTRADO EN ÍNDICE LOCAL: ' + str(year) if year else '❌ No está en el índice local'}")
+        return year
+    
+    # Estrategia 0: Catálogo completo del artista, emparejado en memoria
+    if artist_catalog is not None and artist_catalog.should_browse(artist):
+        log.debug(f"   👤 ESTRATEGIA 0: Catálogo del artista")
+        try:
+            with metrics.timer("strategy_seconds", strategy="artist_catalog"):
+                year = artist_catalog.lookup(title_clean, artist, artist_variants[:3])
+            metrics.inc("strategy_attempts_total", strategy="artist_catalog")
+            note_candidates(artist_catalog.candidates(artist, artist_variants[:3]))
+            if year:
+                metrics.inc("strategy_hits_total", strategy="artist_catalog")
+                log.debug(f"         ✅ ENCONTRADO EN CATÁLOGO DEL ARTISTA: {year}")
+                # Ya resuelto por el catálogo: sale de la memoria del resolver
+                artist_id, name = artist_catalog.resolve_artist(artist, artist_variants[:3])
+                note_artist_match(name, artist_id)
+                learn_artist(normalize_text(artist))
+                return year
+        except RetriesExhausted:
+            raise
+        except Exception as e:
+            log.warning(f"      ❌ Error en catálogo del artista: {e}")
+            note_error()
+    
+    # Estrategia por lotes: una consulta OR con los títulos pendientes del artista
+    if batch_search is not None and batch_search.should_batch(artist):
+        log.debug(f"   📦 Consulta por lotes del artista")
+        try:
+            with metrics.timer("strategy_seconds", strategy="batch"):
+                found = batch_search.match(title_clean, normalize_text(artist))
+            metrics.inc("strategy_attempts_total", strategy="batch")
+            note_candidates(batch_search.candidates(title_clean, normalize_text(artist)))
+            if found:
+                year, name, artist_id = found
+                metrics.inc("strategy_hits_total", strategy="batch")
+                log.debug(f"         ✅ ENCONTRADO EN CONSULTA POR LOTES: {year}")
+                note_artist_match(name, artist_id)
+                learn_artist(normalize_text(artist))
+                return year
+        except RetriesExhausted:
+            raise
+        except Exception as e:
+            log.warning(f"      ❌ Error en consulta por lotes: {e}")
+            note_error()
+    
+    # Estrategias 1-3 en el orden que marca el planificador
+    variants = planner.order_variants(variants)
+    for name in planner.order_strategies():
+        with metrics.timer("strategy_seconds", strategy=name):
+            year, calls = STRATEGIES[name](title_clean, variants)
+        planner.record_strategy(name, calls, bool(year))
+        metrics.inc("strategy_attempts_total", strategy=name)
+        if year:
+            metrics.inc("strategy_hits_total", strategy=name)
+            learn_artist(normalize_text(artist))
+            return year
+    
+    log.debug(f"   ❌ No encontrado con ninguna estrategia")
     return None
 
+def search_release_year_with_reason(title, artist):
+    """Como ``search_release_year_fixed``, pero devuelve ``(year, reason)``.
+    
+    ``reason`` es None si se encontró el año; si no, ``error`` cuando alguna
+    consulta falló, ``low_similarity`` si hubo resultados sin coincidencia y
+    ``no_candidates`` si no hubo ninguno.
+    """
+    _outcome.candidates = 0
+    _outcome.errors = 0
+    _outcome.exhausted = False
+    year = search_release_year_fixed(title, artist)
+    if year:
+        return year, None
+    if _outcome.errors:
+        return None, "error"
+    return None, "low_similarity" if _outcome.candidates else "no_candidates"
+
 def is_year_missing(value):
     """Devuelve True si el valor de año es vacío o no válido."""
     if pd.isna(value):
@@ -254,120 +712,885 @@ def is_year_missing(value):
         return True
     try:
         year = int(float(text))
-        return year < 1900 or year > 2025
+        return year < MIN_YEAR or year > MAX_YEAR
     except (ValueError, TypeError):
         return True
 
-def process_file_fixed(input_path, output_path, batch_sleep=2.0, limit=None):
-    """Procesa el archivo con la lógica corregida."""
+def years_missing(values):
+    """Versión vectorizada de ``is_year_missing`` para una columna entera."""
+    years = pd.to_numeric(values.astype("string").str.strip(), errors="coerce")
+    years = np.trunc(years.to_numpy(dtype="float64", na_value=np.nan))
+    return pd.Series(~((years >= MIN_YEAR) & (years <= MAX_YEAR)), index=values.index)
+
+def normalize_column(values):
+    """Versión vectorizada de ``normalize_text`` para una columna entera."""
+    # Mismos espacios que split() en normalize_text, pero sin pasar fila a fila por Python
+    text = values.astype("string").str.replace(SPACES, " ", regex=True).str.strip(" ")
+    text = text.mask(text.str.lower() == "nan", "")
+    return text.fillna("").astype(str)
+
+def canonical_key(title, artist):
+    """Clave canónica de una canción: sin espacios extra, acentos ni mayúsculas."""
+    title = unidecode.unidecode(normalize_text(title)).casefold()
+    artist = unidecode.unidecode(normalize_text(artist)).casefold()
+    return (title, artist)
+
+def group_rows(rows_to_process):
+    """Agrupa las filas por canción para buscar cada una una sola vez.
     
-    print(f"🎵 Leyendo archivo: {input_path}")
+    Devuelve una lista de ``(indices, title, artist)`` en el orden de la
+    primera aparición; el título y artista son los de esa primera fila.
+    """
+    groups = {}
+    keys = {}
+    for idx, title, artist in rows_to_process:
+        # Las filas repetidas exactas no vuelven a pasar por unidecode
+        key = keys.get((title, artist))
+        if key is None:
+            key = keys[(title, artist)] = canonical_key(title, artist)
+        if key in groups:
+            groups[key][0].append(idx)
+        else:
+            groups[key] = ([idx], title, artist)
+    return list(groups.values())
+
+def lookup_row(position, total, indices, title, artist):
+    """Busca el año de una canción y devuelve (indices, year)."""
+    log.debug("="*60)
+    extra = f" (+{len(indices) - 1} duplicadas)" if len(indices) > 1 else ""
+    status = f" · {progress.describe()}" if progress is not None else ""
+    log.info(f"🔄 PROGRESO: {position}/{total} - Fila {indices[0]+1}{extra}{status}")
+    log.debug("="*60)
+    if negative_cache is None:
+        return indices, search_release_year_fixed(title, artist)
+    
+    year, reason = search_release_year_with_reason(title, artist)
+    if year:
+        negative_cache.forget(title, artist)
+    elif _outcome.exhausted:
+        # La API no respondía: no es un fallo de la canción, se reintenta en la próxima ejecución
+        log.debug(f"   ⏳ Sin anotar en la caché negativa: MusicBrainz no respondía")
+    else:
+        negative_cache.record(title, artist, reason)
+        metrics.inc("negative_cache_records_total", reason=reason)
+        log.debug(f"   🚫 Guardado en la caché negativa: {reason}")
+    return indices, year
+
+def cluster_units(work_units):
+    """Funde las canciones casi iguales de ``work_units`` (si está activado) y anota los grupos.
+    
+    Con ``--dry-run`` la línea de comandos no configura el informe CSV.
+    """
+    if clusterer is None:
+        return work_units
+    units, clusters = clusterer.cluster(work_units)
+    if not clusters:
+        return units
+    
+    rows = []
+    for cluster in clusters:
+        _indices, title, artist = cluster[0]
+        others = ", ".join(f"'{other_title}' / '{other_artist}'" for _i, other_title, other_artist in cluster[1:])
+        log.info(f"🔗 '{title}' / '{artist}' agrupa: {others}")
+        cluster_id = cluster[0][0][0] + 1
+        rows += [(cluster_id, idx + 1, member_title, member_artist)
+                   for indices, member_title, member_artist in cluster for idx in indices]
+    merged = sum(len(cluster) - 1 for cluster in clusters)
+    metrics.inc("clustered_songs_total", merged)
+    log.info(f"🔗 {len(clusters)} grupos de canciones casi iguales: {merged} búsquedas menos")
+    if cluster_report:
+        pd.DataFrame(rows).to_csv(cluster_report, mode="a", header=False, index=False)
+    return units
+
+def skip_known_misses(work_units):
+    """Quita las canciones de la caché negativa cuyo reintento aún no toca.
+    
+    Devuelve ``(work_units, filas saltadas)``.
+    """
+    if negative_cache is None:
+        return work_units, 0
+    
+    pending = []
+    skipped = 0
+    for unit in work_units:
+        if negative_cache.should_skip(unit[1], unit[2]):
+            skipped += len(unit[0])
+        else:
+            pending.append(unit)
+    if skipped:
+        metrics.inc("negative_cache_skipped_rows_total", skipped)
+    return pending, skipped
+
+def iter_lookups(work_units, workers=1, batch_sleep=0.0, tracker=None):
+    """Resuelve las canciones y produce (indices, year) a medida que terminan.
+    
+    Con ``workers > 1`` las canciones se buscan en paralelo; el ritmo real de
+    peticiones lo marca el token bucket compartido del cliente. Cada
+    ``PROGRESS_LOG_SECONDS`` se muestra el ritmo y el tiempo restante;
+    ``tracker`` permite llevar la cuenta a lo largo de varias tandas.
+    """
+    global progress
+    total = len(work_units)
+    progress = tracker = tracker or ProgressTracker(total)
+    
+    def finished(result):
+        tracker.update()
+        if tracker.due(PROGRESS_LOG_SECONDS) and (tracker.total is None or tracker.done < tracker.total):
+            counted = f"{tracker.done}/{tracker.total}" if tracker.total is not None else tracker.done
+            log.info(f"⏱️  {counted} canciones · {tracker.describe()}")
+        return result
     
+    if workers <= 1:
+        for i, (indices, title, artist) in enumerate(work_units):
+            yield finished(lookup_row(i + 1, total, indices, title, artist))
+            if batch_sleep:
+                time.sleep(batch_sleep)
+                metrics.inc("sleep_seconds_total", batch_sleep)
+        return
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(lookup_row, i + 1, total, indices, title, artist)
+            for i, (indices, title, artist) in enumerate(work_units)
+        ]
+        for future in as_completed(futures):
+            yield finished(future.result())
+
+TITLE_KEYWORDS = ['CANCION', 'CANCIÓN', 'TITULO', 'TÍTULO', 'SONG', 'TRACK', 'NOMBRE']
+ARTIST_KEYWORDS = ['ARTISTA', 'ARTIST', 'INTERPRETE', 'INTÉRPRETE']
+YEAR_KEYWORDS = ['AÑO', 'ANO', 'YEAR', 'FECHA', 'LANZAMIENTO']
+CATEGORY_KEYWORDS = ['HOMBRE', 'MUJER', 'GRUPO']
+DEFAULT_YEAR_COLUMN = "AÑO DE LANZAMIENTO"
+DEFAULT_CATEGORY_COLUMN = "HOMBRE / MUJER / DUO / GRUPO"
+
+def find_column(columns, keywords):
+    """Primera columna cuyo nombre contiene alguna de las palabras clave, o None."""
+    for col in columns:
+        if any(keyword in col.upper() for keyword in keywords):
+            return col
+    return None
+
+def detect_columns(columns):
+    """Devuelve (title_column, artist_column, year_column); None si no se encuentra."""
+    return find_column(columns, TITLE_KEYWORDS), find_column(columns, ARTIST_KEYWORDS), find_column(columns, YEAR_KEYWORDS)
+
+def profile_columns(columns):
+    """Columnas de perfil a rellenar: ``[categoría]`` o ``[categoría, género]``; vacío si está desactivado."""
+    if not fill_profiles:
+        return []
+    category_column = find_column(columns, CATEGORY_KEYWORDS) or DEFAULT_CATEGORY_COLUMN
+    return [category_column] + ([genre_column] if genre_column else [])
+
+def resolve_artist_entity(artist):
     try:
-        df = pd.read_csv(input_path, dtype=str)
-        df.columns = df.columns.str.strip()
-        print(f"📊 Archivo cargado: {len(df)} filas, {len(df.columns)} columnas")
-        
+        return artist_resolver.resolve(artist, [variant for _kind, variant in variants_for_artist(artist)])
     except Exception as e:
-        print(f"❌ Error leyendo archivo: {e}")
-        return
+        log.warning(f"      ❌ Error resolviendo el artista '{artist}': {e}")
+        return None
+
+def apply_previous(df, title_column, artist_column, year_column, extra_columns):
+    """Copia los valores de la salida anterior en las celdas vacías de las filas sin cambios.
     
-    # Mapeo de columnas
-    title_column = None
-    artist_column = None
-    year_column = None
+    Devuelve ``(reutilizadas, sin_año)``: cuántas filas recuperan el año y
+    la máscara de las filas sin cambios que ya se buscaron sin éxito (vacía
+    con ``retry_misses``). Ninguna de las dos se vuelve a buscar.
+    """
+    if previous_results is None:
+        return 0, pd.Series(False, index=df.index)
+    hashes = row_hashes(df[title_column], df[artist_column])
+    targets = dict(zip(["year", "category", "genre"], [year_column] + extra_columns))
+    reused = 0
+    for field, column in targets.items():
+        known = previous_results.values(field, hashes)
+        if column == year_column:
+            empty = years_missing(df[column])
+        else:
+            empty = normalize_column(df[column]) == ""
+        fill = empty & known.notna()
+        if fill.any():
+            df.loc[fill, column] = known[fill]
+        if field == "year":
+            reused = int(fill.sum())
     
-    for col in df.columns:
-        if any(keyword in col.upper() for keyword in ['CANCION', 'CANCIÓN', 'TITULO', 'TÍTULO', 'SONG', 'TRACK', 'NOMBRE']):
-            title_column = col
-            break
+    if retry_misses:
+        return reused, pd.Series(False, index=df.index)
+    return reused, previous_results.contains(hashes) & years_missing(df[year_column])
+
+def log_unchanged_misses(count):
+    if count:
+        log.info(f"♻️  Filas sin cambios que ya quedaron sin año: {count} (--retry-misses para buscarlas)")
+
+def profile_groups(df, artist_column, columns, rows=None):
+    """Artistas con alguna columna de perfil vacía: ``{clave: (artista, [índices])}``."""
+    if not columns:
+        return {}
     
-    for col in df.columns:
-        if any(keyword in col.upper() for keyword in ['ARTISTA', 'ARTIST', 'INTERPRETE', 'INTÉRPRETE']):
-            artist_column = col
-            break
+    artists = normalize_column(df[artist_column])
+    missing = pd.Series(False, index=df.index)
+    for column in columns:
+        missing |= normalize_column(df[column]) == ""
+    missing &= artists != ""
+    if rows is not None:
+        missing &= df.index.isin(rows)
+    if shard is not None:
+        missing &= shard_mask(artists, *shard)
     
-    for col in df.columns:
-        if any(keyword in col.upper() for keyword in ['AÑO', 'ANO', 'YEAR', 'FECHA', 'LANZAMIENTO']):
-            year_column = col
+    groups = {}
+    for idx, artist in zip(df.index[missing].tolist(), artists[missing].tolist()):
+        key = canonical_key("", artist)
+        groups.setdefault(key, (artist, []))[1].append(idx)
+    return groups
+
+def fill_artist_profiles(df, artist_column, columns, workers=1, rows=None):
+    """Rellena las columnas de perfil vacías con una sola consulta por artista distinto.
+    
+    ``columns`` es ``[categoría]`` o ``[categoría, género]``; las filas que
+    ya tienen valor no se tocan. Con ``rows`` (índices, p. ej. las filas
+    seleccionadas con ``--limit``) solo se miran esas filas. Devuelve
+    ``(celdas rellenadas, artistas consultados)``.
+    """
+    groups = profile_groups(df, artist_column, columns, rows)
+    if not groups:
+        return 0, 0
+    
+    names = [artist for artist, _indices in groups.values()]
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            entities = list(executor.map(resolve_artist_entity, names))
+    else:
+        entities = [resolve_artist_entity(artist) for artist in names]
+    
+    filled = 0
+    for (_artist, indices), entity in zip(groups.values(), entities):
+        values = [artist_category(entity), artist_genre(entity)]
+        for column, value in zip(columns, values):
+            if not value:
+                continue
+            for idx in indices:
+                if not normalize_text(df.at[idx, column]):
+                    df.at[idx, column] = value
+                    filled += 1
+    metrics.inc("profile_cells_filled_total", filled)
+    log.info(f"👥 Perfil de artista: {filled} celdas rellenadas ({len(groups)} artistas)")
+    return filled, len(groups)
+
+def select_rows(df, title_column, artist_column, year_column, journal_entries=None, limit=None, exclude=None):
+    """Filas sin año que hay que buscar, como lista de (idx, title, artist).
+    
+    Las filas ya registradas en ``journal_entries`` no se devuelven; si el
+    diario tenía su año se copia al DataFrame. Devuelve también cuántas se
+    reanudaron así. ``exclude`` es una máscara de filas que no se buscan.
+    """
+    journal_entries = journal_entries or {}
+    titles = normalize_column(df[title_column])
+    artists = normalize_column(df[artist_column])
+    candidates = years_missing(df[year_column]) & (titles != "") & (artists != "")
+    if exclude is not None:
+        candidates &= ~exclude
+    if shard is not None:
+        candidates &= shard_mask(artists, *shard)
+    # tolist() de una vez: recorrer una columna de texto de pandas elemento a elemento es lento
+    rows = zip(df.index[candidates].tolist(), titles[candidates].tolist(), artists[candidates].tolist())
+    
+    if not journal_entries:
+        return list(itertools.islice(rows, limit or None)), 0
+    
+    rows_to_process = []
+    total_resumed = 0
+    for idx, title, artist in rows:
+        if limit and len(rows_to_process) >= limit:
             break
+        
+        entry = journal_entries.get(idx)
+        if entry and canonical_key(entry["title"], entry["artist"]) == canonical_key(title, artist):
+            if entry["year"]:
+                df.at[idx, year_column] = str(entry["year"])
+            total_resumed += 1
+            continue
+        rows_to_process.append((idx, title, artist))
+    
+    return rows_to_process, total_resumed
+
+def record_result(df, indices, year, title_column, artist_column, year_column, journal):
+    """Anota el resultado de una canción en el diario y en todas sus filas."""
+    rows_label = ", ".join(str(idx + 1) for idx in indices)
+    for idx in indices:
+        journal.record(idx, normalize_text(df.at[idx, title_column]), normalize_text(df.at[idx, artist_column]), year)
+    
+    if year:
+        for idx in indices:
+            df.at[idx, year_column] = str(year)
+        log.info(f"✅ Fila(s) {rows_label}: AÑO ENCONTRADO Y GUARDADO: {year}")
+    else:
+        log.info(f"❌ Fila(s) {rows_label}: NO SE ENCONTRÓ AÑO")
+    
+    metrics.inc("rows_processed_total", len(indices))
+    if year:
+        metrics.inc("rows_found_total", len(indices))
+
+def estimate_cost(work_units, profile_artists=()):
+    """Peticiones y tiempo previstos para ``work_units``, sin hacer ninguna.
+    
+    Para cada canción se construyen las mismas consultas que harían las
+    estrategias y se miran en la caché de respuestas. El mínimo supone que
+    la primera consulta encuentra el año; el máximo, que no lo encuentra
+    ninguna y se prueban todas las estrategias y variantes, más las
+    ``get_recording_by_id`` de las grabaciones sin fecha (si la consulta no
+    está en caché, se supone que ninguna la trae). ``profile_artists`` son
+    los artistas cuyo perfil se buscaría (``--artist-profile``): al menos una
+    consulta y como mucho una por variante. Los tiempos salen del rate limit
+    configurado.
+    """
+    strategies = {name: {"queries": 0, "cached": 0} for name in planner.strategies}
+    profiles = {"queries": 0, "cached": 0}
+    minimum = 0
+    recording_lookups = 0
+    if offline_index is None:
+        for _indices, title, artist in work_units:
+            title_clean = normalize_text(title)
+            first = True
+            for name in planner.strategies:
+                entity, template, limit, max_variants = STRATEGY_QUERIES[name]
+                for _kind, artist_var in variants_for_artist(normalize_text(artist), peek=True)[:max_variants]:
+                    query = template.format(title=title_clean, artist=artist_var)
+                    cached = client.cache.peek(entity, query, limit) if client.cache is not None else None
+                    strategies[name]["cached" if cached is not None else "queries"] += 1
+                    if first:
+                        minimum += 0 if cached is not None else 1
+                        first = False
+                    if name in ("recording", "pool"):
+                        recordings = cached.get("recording-list", []) if cached is not None else [{}] * limit
+                        undated = sum(1 for recording in recordings if not recording_year(recording))
+                        # El pool solo consulta los releases del mejor candidato
+                        recording_lookups += undated if name == "recording" else min(undated, 1)
+        
+        for artist in profile_artists:
+            first = True
+            for _kind, variant in variants_for_artist(artist, peek=True)[:MAX_VARIANTS]:
+                query = ARTIST_QUERY.format(artist=variant)
+                cached = client.cache is not None and client.cache.contains("artist", query, ARTIST_LIMIT)
+                profiles["cached" if cached else "queries"] += 1
+                if first:
+                    minimum += 0 if cached else 1
+                    first = False
+    
+    maximum = sum(stats["queries"] for stats in strategies.values()) + recording_lookups + profiles["queries"]
+    return with_seconds({
+        "songs": len(work_units),
+        "rows": sum(len(indices) for indices, _title, _artist in work_units),
+        "strategies": strategies,
+        "recording_lookups": recording_lookups,
+        "profiles": profiles,
+        "profile_artists": len(profile_artists),
+        "min_calls": minimum,
+        "max_calls": maximum,
+    })
+
+def with_seconds(estimate):
+    """Añade a la estimación el tiempo mínimo y máximo con el rate limit configurado."""
+    rate = client.rate_limiter.rate
+    estimate["min_seconds"] = estimate["min_calls"] / rate
+    estimate["max_seconds"] = estimate["max_calls"] / rate
+    return estimate
+
+def add_estimates(total, estimate):
+    """Suma dos estimaciones de ``estimate_cost`` (p. ej. de bloques de ``--chunksize``)."""
+    if total is None:
+        return estimate
+    for key in ("songs", "rows", "recording_lookups", "profile_artists", "min_calls", "max_calls"):
+        total[key] += estimate[key]
+    for name, stats in estimate["strategies"].items():
+        for key, count in stats.items():
+            total["strategies"][name][key] += count
+    for key, count in estimate["profiles"].items():
+        total["profiles"][key] += count
+    return with_seconds(total)
+
+def log_estimate(estimate, total_resumed=0, total_skipped=0, total_reused=0):
+    summary_log.info("="*60)
+    summary_log.info("🧮 ESTIMACIÓN (--dry-run, no se ha hecho ninguna búsqueda)")
+    summary_log.info(f"📈 Filas a buscar: {estimate['rows']} ({estimate['songs']} canciones distintas)")
+    summary_log.info(f"⏭️  Ya resueltas en el diario: {total_resumed} · ♻️  reutilizadas: {total_reused} · "
+                     f"🚫 saltadas por la caché negativa: {total_skipped}")
+    if offline_index is not None:
+        summary_log.info("📚 Modo sin conexión: ninguna petición a MusicBrainz")
+    for name, stats in estimate["strategies"].items():
+        summary_log.info(f"   {name}: hasta {stats['queries']} peticiones ({stats['cached']} consultas ya en caché)")
+    if estimate["recording_lookups"]:
+        summary_log.info(f"   fechas por grabación (get_recording_by_id): hasta {estimate['recording_lookups']} peticiones")
+    if estimate["profile_artists"]:
+        profiles = estimate["profiles"]
+        summary_log.info(f"   perfil de {estimate['profile_artists']} artistas: hasta {profiles['queries']} peticiones "
+                         f"({profiles['cached']} consultas ya en caché)")
+    summary_log.info(f"🌐 Peticiones: entre {estimate['min_calls']} y {estimate['max_calls']}")
+    summary_log.info(f"⏱️  Tiempo con {client.rate_limiter.rate:g} peticiones/s: entre "
+                     f"{format_duration(estimate['min_seconds'])} y {format_duration(estimate['max_seconds'])}")
+    if artist_catalog is not None or batch_search is not None:
+        summary_log.info("ℹ️  No incluye --artist-first ni --batch-queries, que suelen reducir las peticiones")
+    summary_log.info("="*60)
+
+def write_output(df, output_path, year_column, source_path=None):
+    """Guarda ``df`` en el formato de ``output_path``.
+
+    Si ``df`` solo tiene las columnas de trabajo (entrada Parquet/Arrow), se
+    vuelve a leer el resto de ``source_path`` y se sustituyen esas columnas.
+    """
+    if source_path is not None:
+        full = read_table(source_path, year_column=find_column(read_column_names(source_path), YEAR_KEYWORDS))
+        for column in df.columns:
+            full[column] = df[column]
+        df = full
+    write_table(df, output_path, year_column)
+
+def merge_shards(input_path, shard_paths, output_path):
+    """Junta las salidas de ``--shard`` en ``output_path`` con el orden de filas de ``input_path``.
+    
+    Los diarios de los shards (si existen) se juntan en el diario de la salida.
+    Devuelve cuántas filas tiene el diario combinado.
+    """
+    original = read_table(input_path)
+    merged = merge_tables(original, [read_table(path) for path in shard_paths])
+    year_column = detect_columns(merged.columns)[2] or DEFAULT_YEAR_COLUMN
+    write_table(merged, output_path, year_column)
+    
+    journals = [default_journal_path(path) for path in shard_paths if os.path.exists(default_journal_path(path))]
+    entries = merge_journals(journals, default_journal_path(output_path)) if journals else 0
+    log.info(f"🧩 {len(shard_paths)} shards combinados en {output_path} ({len(merged)} filas, {entries} en el diario)")
+    return entries
+
+def log_summary(total_processed, total_found, output_path):
+    summary_log.info("="*60)
+    summary_log.info(f"🎉 ¡Procesamiento completado!")
+    summary_log.info(f"   📊 Total procesado: {total_processed} canciones")
+    summary_log.info(f"   ✅ Años encontrados: {total_found}")
+    if total_processed > 0:
+        summary_log.info(f"   📈 Tasa de éxito: {(total_found/total_processed*100):.1f}%")
+    summary_log.info(f"💾 Archivo final: {output_path}")
+    
+    stats = planner.summary()["strategies"]
+    if any(entry["attempts"] for entry in stats.values()):
+        summary_log.info(f"🧭 Estrategias (aciertos/filas, peticiones):")
+        for name, entry in stats.items():
+            summary_log.info(f"   {name}: {entry['hits']}/{entry['attempts']}, {entry['calls']} peticiones")
+
+def process_file_fixed(input_path, output_path, batch_sleep=0.0, limit=None, workers=1,
+                       journal_path=None, resume=False, save_every=0, chunksize=None, dry_run=False):
+    """Procesa el archivo con la lógica corregida y devuelve un resumen.
+    
+    Cada fila procesada se anota en un diario JSONL (``journal_path``, por
+    defecto junto a la salida). Con ``resume=True`` se reaplican los años del
+    diario y se saltan las filas ya resueltas. El CSV se escribe al final y,
+    si ``save_every`` es mayor que 0, cada ``save_every`` canciones resueltas.
+    
+    Con ``chunksize`` el archivo se procesa por bloques (ver
+    ``process_file_streaming``). Con ``dry_run`` solo se planifica: no se
+    hace ninguna búsqueda ni se escribe nada y el resumen trae la estimación
+    de ``estimate_cost``.
+    """
+    if chunksize:
+        return process_file_streaming(input_path, output_path, chunksize, batch_sleep=batch_sleep,
+                                      limit=limit, workers=workers, journal_path=journal_path,
+                                      resume=resume, dry_run=dry_run)
+    
+    log.info(f"🎵 Leyendo archivo: {input_path}")
+    
+    try:
+        all_columns = read_column_names(input_path)
+        source_year_column = find_column(all_columns, YEAR_KEYWORDS)
+        planning_columns = None
+        if file_format(input_path) != "csv":
+            # Parquet/Arrow: solo se cargan las columnas que se leen o rellenan
+            planning_columns = [column for column in all_columns
+                                if column in detect_columns(all_columns) or column in profile_columns(all_columns)]
+        df = read_table(input_path, columns=planning_columns, year_column=source_year_column)
+        log.info(f"📊 Archivo cargado: {len(df)} filas, {len(all_columns)} columnas")
+        
+    except Exception as e:
+        log.error(f"❌ Error leyendo archivo: {e}")
+        return
+    
+    # Mapeo de columnas
+    title_column, artist_column, year_column = detect_columns(df.columns)
     
     if not title_column or not artist_column:
-        print(f"❌ ERROR: No se encontraron las columnas necesarias.")
+        log.error(f"❌ ERROR: No se encontraron las columnas necesarias.")
         return
     
     if not year_column:
-        year_column = "AÑO DE LANZAMIENTO"
+        year_column = DEFAULT_YEAR_COLUMN
         df[year_column] = pd.NA
     
-    print(f"🎯 Usando columnas: {title_column}, {artist_column}, {year_column}")
+    extra_columns = profile_columns(df.columns)
+    for column in extra_columns:
+        if column not in df.columns:
+            df[column] = pd.NA
+    
+    log.info(f"🎯 Usando columnas: {title_column}, {artist_column}, {year_column}")
+    
+    journal_path = journal_path or default_journal_path(output_path)
+    journal_entries = load_journal(journal_path) if resume else {}
+    if resume:
+        log.info(f"📓 Reanudando desde {journal_path}: {len(journal_entries)} filas registradas")
+    
+    total_reused, unchanged_misses = apply_previous(df, title_column, artist_column, year_column, extra_columns)
+    total_unchanged = int(unchanged_misses.sum())
+    if previous_results is not None:
+        log.info(f"♻️  Filas reutilizadas de la salida anterior: {total_reused}")
+        log_unchanged_misses(total_unchanged)
     
     # Filtra filas que necesitan procesamiento
-    rows_to_process = []
-    for idx, row in df.iterrows():
-        if limit and len(rows_to_process) >= limit:
-            break
-            
-        if is_year_missing(row[year_column]):
-            title = normalize_text(row[title_column])
-            artist = normalize_text(row[artist_column])
-            
-            if title and artist:
-                rows_to_process.append((idx, title, artist))
+    rows_to_process, total_resumed = select_rows(df, title_column, artist_column, year_column,
+                                                 journal_entries, limit, exclude=unchanged_misses)
+    
+    if resume:
+        log.info(f"⏭️  Filas ya resueltas en el diario: {total_resumed}")
+    
+    work_units, total_skipped = skip_known_misses(cluster_units(group_rows(rows_to_process)))
+    if total_skipped:
+        log.info(f"🚫 Filas saltadas por la caché negativa: {total_skipped}")
+    plan_lookups(work_units)
+    log.info(f"📈 Filas para procesar: {len(rows_to_process) - total_skipped} ({len(work_units)} canciones distintas)")
     
-    print(f"\n📈 Filas para procesar: {len(rows_to_process)}")
+    # Con --limit solo se perfilan los artistas de las filas seleccionadas
+    selected = [idx for idx, _title, _artist in rows_to_process] if limit else None
+    
+    if dry_run:
+        profiled = [artist for artist, _indices in profile_groups(df, artist_column, extra_columns, selected).values()]
+        estimate = estimate_cost(work_units, profiled)
+        log_estimate(estimate, total_resumed=total_resumed, total_skipped=total_skipped, total_reused=total_reused)
+        return {
+            "rows": len(rows_to_process),
+            "songs": len(work_units),
+            "resumed": total_resumed,
+            "skipped": total_skipped,
+            "reused": total_reused,
+            "unchanged_misses": total_unchanged,
+            "estimate": estimate,
+        }
     
     total_processed = 0
     total_found = 0
     
-    for i, (idx, title, artist) in enumerate(rows_to_process):
-        print(f"\n" + "="*60)
-        print(f"🔄 PROGRESO: {i+1}/{len(rows_to_process)} - Fila {idx+1}")
-        print("="*60)
-        
-        year = search_release_year_fixed(title, artist)
-        
-        if year:
-            df.at[idx, year_column] = year
-            total_found += 1
-            print(f"✅ AÑO ENCONTRADO Y GUARDADO: {year}")
+    with CheckpointJournal(journal_path, resume=resume) as journal:
+        for done, (indices, year) in enumerate(iter_lookups(work_units, workers=workers, batch_sleep=batch_sleep), 1):
+            record_result(df, indices, year, title_column, artist_column, year_column, journal)
+            total_processed += len(indices)
+            if year:
+                total_found += len(indices)
             
-            # Guarda progreso cada resultado encontrado
-            df.to_csv(output_path, index=False)
-            print(f"💾 Progreso guardado")
-        else:
-            print(f"❌ NO SE ENCONTRÓ AÑO")
-        
-        total_processed += 1
-        print(f"⏳ Esperando {batch_sleep} segundos...")
-        time.sleep(batch_sleep)
+            if save_every and done % save_every == 0:
+                write_output(df, output_path, year_column, input_path if planning_columns else None)
+                log.debug(f"💾 Progreso guardado")
+    
+    total_profiles, _artists = fill_artist_profiles(df, artist_column, extra_columns, workers=workers, rows=selected)
     
     # Guarda el archivo final
-    df.to_csv(output_path, index=False)
+    write_output(df, output_path, year_column, input_path if planning_columns else None)
+    
+    log_summary(total_processed, total_found, output_path)
+    
+    return {
+        "rows": len(rows_to_process),
+        "songs": len(work_units),
+        "processed": total_processed,
+        "found": total_found,
+        "resumed": total_resumed,
+        "skipped": total_skipped,
+        "reused": total_reused,
+        "unchanged_misses": total_unchanged,
+        "profiles": total_profiles,
+    }
+
+def process_file_streaming(input_path, output_path, chunksize=50000, batch_sleep=0.0, limit=None,
+                           workers=1, journal_path=None, resume=False, memo_size=100000, dry_run=False):
+    """Procesa catálogos enormes por bloques de ``chunksize`` filas.
+    
+    Cada bloque se lee, se enriquece y se añade al CSV de salida antes de
+    leer el siguiente, así que la memoria no depende del tamaño del archivo.
+    El orden de filas y las columnas de salida son los mismos que en
+    ``process_file_fixed``. Los años de las últimas ``memo_size`` canciones
+    se recuerdan para no repetir búsquedas entre bloques. Al reanudar, el
+    diario se indexa una sola vez y de cada bloque solo se leen las entradas
+    de sus filas.
     
-    print(f"\n" + "="*60)
-    print(f"🎉 ¡Procesamiento completado!")
-    print(f"   📊 Total procesado: {total_processed} canciones")
-    print(f"   ✅ Años encontrados: {total_found}")
-    print(f"   📈 Tasa de éxito: {(total_found/total_processed*100):.1f}%" if total_processed > 0 else "")
-    print(f"💾 Archivo final: {output_path}")
+    Con ``dry_run`` la estimación también se hace bloque a bloque: no se
+    busca nada, no se abre el diario ni se escribe la salida.
+    """
+    log.info(f"🎵 Leyendo archivo por bloques de {chunksize} filas: {input_path}")
+    
+    journal_path = journal_path or default_journal_path(output_path)
+    journal_index = None
+    if resume:
+        journal_index = JournalIndex(journal_path)
+        log.info(f"📓 Reanudando desde {journal_path}: {len(journal_index)} filas registradas")
+    
+    memo = LRUCache(memo_size)
+    # Artistas ya incluidos en la estimación del perfil (--dry-run)
+    profiled = LRUCache(memo_size)
+    estimate = None
+    # Un solo contador para todos los bloques: el ritmo no se reinicia en cada uno
+    tracker = ProgressTracker(None)
+    columns = None
+    writer = None
+    total_rows = 0
+    total_songs = 0
+    total_processed = 0
+    total_found = 0
+    total_resumed = 0
+    total_skipped = 0
+    total_reused = 0
+    total_unchanged = 0
+    total_profiles = 0
+    
+    try:
+        reader = iter_chunks(input_path, chunksize,
+                             year_column=find_column(read_column_names(input_path), YEAR_KEYWORDS))
+    except Exception as e:
+        log.error(f"❌ Error leyendo archivo: {e}")
+        return
+    
+    try:
+        with nullcontext() if dry_run else CheckpointJournal(journal_path, resume=resume) as journal:
+            for chunk_number, df in enumerate(reader):
+                df.columns = df.columns.str.strip()
+                
+                if columns is None:
+                    title_column, artist_column, year_column = detect_columns(df.columns)
+                    if not title_column or not artist_column:
+                        log.error(f"❌ ERROR: No se encontraron las columnas necesarias.")
+                        return
+                    year_column = year_column or DEFAULT_YEAR_COLUMN
+                    extra_columns = profile_columns(df.columns)
+                    columns = list(dict.fromkeys(list(df.columns) + [year_column] + extra_columns))
+                    log.info(f"🎯 Usando columnas: {title_column}, {artist_column}, {year_column}")
+                for column in columns:
+                    if column not in df.columns:
+                        df[column] = pd.NA
+                reused, unchanged_misses = apply_previous(df, title_column, artist_column, year_column, extra_columns)
+                total_reused += reused
+                total_unchanged += int(unchanged_misses.sum())
+                
+                remaining = limit - total_rows if limit else None
+                if remaining is not None and remaining <= 0:
+                    rows_to_process, resumed = [], 0
+                else:
+                    journal_entries = {}
+                    if journal_index is not None and len(df):
+                        journal_entries = journal_index.entries(range(df.index[0], df.index[-1] + 1))
+                    rows_to_process, resumed = select_rows(df, title_column, artist_column, year_column,
+                                                           journal_entries, remaining, exclude=unchanged_misses)
+                total_rows += len(rows_to_process)
+                total_resumed += resumed
+                
+                # Las canciones ya vistas en bloques anteriores no se vuelven a buscar
+                pending = []
+                for indices, title, artist in group_rows(rows_to_process):
+                    year = memo.get(canonical_key(title, artist), MISSING)
+                    if year is not MISSING:
+                        if not dry_run:
+                            record_result(df, indices, year, title_column, artist_column, year_column, journal)
+                        total_processed += len(indices)
+                        total_found += len(indices) if year else 0
+                    else:
+                        pending.append((indices, title, artist))
+                pending, skipped = skip_known_misses(cluster_units(pending))
+                total_skipped += skipped
+                total_songs += len(pending)
+                
+                log.info(f"📦 Bloque {chunk_number + 1}: {len(df)} filas, {len(rows_to_process)} para procesar "
+                         f"({len(pending)} canciones nuevas)")
+                plan_lookups(pending)
+                selected = [idx for idx, _title, _artist in rows_to_process] if limit else None
+                
+                if dry_run:
+                    for _indices, title, artist in pending:
+                        memo.put(canonical_key(title, artist), None)
+                    artists = []
+                    for key, (artist, _indices) in profile_groups(df, artist_column, extra_columns, selected).items():
+                        if key not in profiled:
+                            profiled.put(key, True)
+                            artists.append(artist)
+                    estimate = add_estimates(estimate, estimate_cost(pending, artists))
+                    continue
+                
+                keys = {indices[0]: canonical_key(title, artist) for indices, title, artist in pending}
+                for indices, year in iter_lookups(pending, workers=workers, batch_sleep=batch_sleep, tracker=tracker):
+                    record_result(df, indices, year, title_column, artist_column, year_column, journal)
+                    total_processed += len(indices)
+                    total_found += len(indices) if year else 0
+                    memo.put(keys[indices[0]], year)
+                
+                filled, _artists = fill_artist_profiles(df, artist_column, extra_columns, workers=workers, rows=selected)
+                total_profiles += filled
+                if writer is None:
+                    writer = ChunkWriter(output_path, columns, year_column)
+                writer.write(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    if previous_results is not None:
+        log.info(f"♻️  Filas reutilizadas de la salida anterior: {total_reused}")
+        log_unchanged_misses(total_unchanged)
+    if total_skipped:
+        log.info(f"🚫 Filas saltadas por la caché negativa: {total_skipped}")
+    
+    if dry_run:
+        estimate = estimate or estimate_cost([])
+        log_estimate(estimate, total_resumed=total_resumed, total_skipped=total_skipped, total_reused=total_reused)
+        return {
+            "rows": total_rows,
+            "songs": total_songs,
+            "resumed": total_resumed,
+            "skipped": total_skipped,
+            "reused": total_reused,
+            "unchanged_misses": total_unchanged,
+            "estimate": estimate,
+        }
+    
+    log_summary(total_processed, total_found, output_path)
+    
+    return {
+        "rows": total_rows,
+        "songs": total_songs,
+        "processed": total_processed,
+        "found": total_found,
+        "resumed": total_resumed,
+        "skipped": total_skipped,
+        "reused": total_reused,
+        "unchanged_misses": total_unchanged,
+        "profiles": total_profiles,
+    }
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Versión CORREGIDA que busca releases asociados.")
-    parser.add_argument("input", help="Ruta al CSV original")
-    parser.add_argument("-o", "--output", help="CSV de salida")
-    parser.add_argument("--sleep", type=float, default=2.0, help="Segundos de espera entre llamadas")
+    parser.add_argument("input", help="Ruta al catálogo original (.csv, .parquet o .arrow)")
+    parser.add_argument("-o", "--output", help="Archivo de salida; el formato sale de la extensión")
+    parser.add_argument("--sleep", type=float, default=0.0, help="Pausa adicional entre canciones (solo en modo secuencial)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Peticiones por segundo a MusicBrainz")
+    parser.add_argument("--burst", type=int, default=1, help="Peticiones que se pueden acumular en ráfaga")
+    parser.add_argument("--max-retries", type=int, default=5, help="Reintentos de cada petición ante 503 o errores de red")
+    parser.add_argument("--retry-delay", type=float, default=1.0, help="Espera base (s) del backoff exponencial entre reintentos")
+    parser.add_argument("--workers", type=int, default=1, help="Canciones procesadas en paralelo")
     parser.add_argument("--limit", type=int, help="Número de canciones a procesar")
+    parser.add_argument("--offline-index", help="Índice local de MusicBrainz (ver offline_index.py); no usa la red")
+    parser.add_argument("--artist-first", action="store_true", help="Recorre el catálogo de cada artista y empareja los títulos en local")
+    parser.add_argument("--artist-first-min-songs", type=int, default=3, help="Canciones pendientes mínimas para recorrer el catálogo de un artista")
+    parser.add_argument("--batch-queries", action="store_true", help="Agrupa los títulos de cada artista en consultas OR compartidas")
+    parser.add_argument("--batch-min-titles", type=int, default=2, help="Títulos pendientes mínimos de un artista para consultarlos por lotes")
+    parser.add_argument("--candidate-pool", action="store_true", help="Una consulta de hasta 50 candidatos por canción, ordenados en local")
+    parser.add_argument("--artist-profile", action="store_true", help="Rellena HOMBRE / MUJER / DUO / GRUPO con el tipo y género del artista en MusicBrainz")
+    parser.add_argument("--genre-column", help="Rellena también esta columna con la etiqueta principal del artista (implica --artist-profile)")
+    parser.add_argument("--cluster", action="store_true", help="Busca una sola vez las canciones casi iguales (p. ej. con '(En Vivo)' o erratas)")
+    parser.add_argument("--cluster-threshold", type=float, default=0.9, help="Similitud mínima de título para agrupar canciones")
+    parser.add_argument("--cluster-report", help="CSV con los grupos formados (grupo, fila, título, artista)")
+    parser.add_argument("--chunksize", type=int, help="Procesa el archivo por bloques de N filas (memoria acotada)")
+    parser.add_argument("--previous", help="Salida enriquecida anterior: reutiliza sus años en las filas con el mismo título y artista")
+    parser.add_argument("--retry-misses", action="store_true", help="Con --previous, vuelve a buscar las filas sin cambios que quedaron sin año")
+    parser.add_argument("--shard", type=parse_shard, help="Procesa solo la parte i de N (p. ej. 1/4), repartida por artista")
+    parser.add_argument("--merge", nargs="+", metavar="SALIDA_SHARD", help="Junta las salidas de --shard en el orden del archivo de entrada y termina")
+    parser.add_argument("--dry-run", action="store_true", help="Solo estima filas, peticiones y tiempo sin buscar nada ni escribir la salida")
+    parser.add_argument("--journal", help="Diario JSONL de progreso (por defecto <salida>.journal.jsonl)")
+    parser.add_argument("--resume", action="store_true", help="Reanuda saltando las filas registradas en el diario")
+    parser.add_argument("--save-every", type=int, default=0, help="Guarda el CSV cada N canciones resueltas (0 = solo al final)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Muestra solo errores y el resumen final")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Muestra cada consulta, candidato y similitud")
+    parser.add_argument("--metrics", help="Exporta métricas al terminar (.json, o .prom para Prometheus)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="Ruta de la caché SQLite de respuestas")
+    parser.add_argument("--no-cache", action="store_true", help="No usar la caché de respuestas")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL / 86400, help="Días de validez de la caché")
+    parser.add_argument("--negative-cache", default=DEFAULT_NEGATIVE_CACHE_PATH, help="Ruta de la caché SQLite de canciones no encontradas")
+    parser.add_argument("--no-negative-cache", action="store_true", help="Vuelve a buscar todas las canciones sin año")
+    parser.add_argument("--miss-backoff", type=float, default=DEFAULT_MISS_BACKOFF / 86400, help="Días antes de reintentar una canción no encontrada (se duplica en cada intento)")
+    parser.add_argument("--error-backoff", type=float, default=DEFAULT_ERROR_BACKOFF / 3600, help="Horas antes de reintentar una canción que falló por error de red")
+    parser.add_argument("--artist-table", default=DEFAULT_ARTIST_TABLE_PATH, help="Tabla SQLite de artistas resueltos (ver artist_table.py)")
+    parser.add_argument("--no-artist-table", action="store_true", help="No usar ni aprender la tabla de artistas")
+    parser.add_argument("--cache-max-entries", type=int, default=DEFAULT_MAX_ENTRIES, help="Máximo de respuestas guardadas en caché")
     args = parser.parse_args()
+    setup_logging(args.quiet, args.verbose)
     
     if not args.output:
         base_name = os.path.splitext(args.input)[0]
         extension = os.path.splitext(args.input)[1]
         args.output = f"{base_name}_solucionado{extension}"
+    if args.shard and not args.merge:
+        # También con -o: dos shards con el mismo -o no deben pisarse
+        args.output = shard_output_path(args.output, *args.shard)
+    
+    if args.merge:
+        merge_shards(args.input, args.merge, args.output)
+        raise SystemExit(0)
 
-    print("🛠️ VERSIÓN CORREGIDA - Búsqueda de releases asociados")
-    print(f"📂 Archivo entrada: {args.input}")
-    print(f"📂 Archivo salida: {args.output}")
-    print(f"⏱️  Pausa entre búsquedas: {args.sleep} segundos")
+    log.info("🛠️ VERSIÓN CORREGIDA - Búsqueda de releases asociados")
+    log.info(f"📂 Archivo entrada: {args.input}")
+    log.info(f"📂 Archivo salida: {args.output}")
+    log.info(f"⏱️  Límite: {args.rate} peticiones/s (ráfaga {args.burst}), {args.workers} hilo(s)")
 
-    process_file_fixed(args.input, args.output, args.sleep, args.limit)
\ No newline at end of file
+    configure_rate_limit(args.rate, args.burst)
+    if args.shard:
+        configure_shard(*args.shard)
+        log.info(f"🧩 Shard {args.shard[0]}/{args.shard[1]}")
+    configure_retries(args.max_retries, args.retry_delay)
+    if args.artist_first:
+        configure_artist_first(args.artist_first_min_songs)
+    if args.batch_queries:
+        configure_batch_queries(args.batch_min_titles)
+    if args.candidate_pool:
+        configure_candidate_pool()
+    if args.cluster or args.cluster_report:
+        configure_clustering(args.cluster_threshold, report_path=None if args.dry_run else args.cluster_report)
+    if args.artist_profile or args.genre_column:
+        if args.offline_index:
+            log.warning("⚠️  El perfil de artista necesita la API; se ignora en modo sin conexión")
+        else:
+            configure_artist_profiles(args.genre_column)
+    if args.previous:
+        previous = configure_incremental(args.previous, retry=args.retry_misses)
+        log.info(f"♻️  Modo incremental: {len(previous)} canciones con año en {args.previous}")
+    if args.offline_index:
+        configure_offline_index(args.offline_index)
+        log.info(f"📚 Modo sin conexión con el índice: {args.offline_index}")
+
+    # Con --dry-run solo se abren, en modo lectura, las bases que ya existen
+    def use_store(path):
+        return not args.dry_run or os.path.exists(path)
+    read_only = " (solo lectura)" if args.dry_run else ""
+
+    if not args.no_cache and use_store(args.cache):
+        configure_cache(args.cache, ttl=args.cache_ttl * 86400, max_entries=args.cache_max_entries,
+                        read_only=args.dry_run)
+        log.info(f"🗄️  Caché de respuestas: {args.cache}{read_only}")
+    
+    if not args.no_artist_table and use_store(args.artist_table):
+        configure_artist_table(args.artist_table, read_only=args.dry_run)
+        log.info(f"📇 Tabla de artistas: {args.artist_table} ({len(artist_table)} artistas){read_only}")
+    
+    if not args.no_negative_cache and not args.offline_index and use_store(args.negative_cache):
+        configure_negative_cache(args.negative_cache, miss_backoff=args.miss_backoff * 86400,
+                                 error_backoff=args.error_backoff * 3600, read_only=args.dry_run)
+        log.info(f"🚫 Caché negativa: {args.negative_cache}{read_only}")
+
+    try:
+        process_file_fixed(args.input, args.output, args.sleep, args.limit, args.workers,
+                           journal_path=args.journal, resume=args.resume, save_every=args.save_every,
+                           chunksize=args.chunksize, dry_run=args.dry_run)
+    finally:
+        if client.cache is not None:
+            summary_log.info(f"🗄️  Caché: {client.cache.hits} aciertos, {client.cache.misses} fallos")
+        client.close()
+        if negative_cache is not None:
+            counts = negative_cache.counts()
+            summary_log.info(f"🚫 Caché negativa: {', '.join(f'{reason}: {count}' for reason, count in sorted(counts.items())) or 'vacía'}")
+            negative_cache.close()
+        if artist_table is not None:
+            summary_log.info(f"📇 Tabla de artistas: {len(artist_table)} artistas, usada en {artist_table.hits} búsquedas")
+            artist_table.close()
+        summary_log.info(
+            f"⏱️  Red: {metrics.counter_value('network_seconds_total'):.1f} s, "
+            f"espera del rate limit: {metrics.counter_value('rate_limit_wait_seconds_total'):.1f} s, "
+            f"pausas: {metrics.counter_value('sleep_seconds_total'):.1f} s, "
+            f"peticiones: {client.network_calls}"
+        )
+        if args.metrics:
+            metrics.write(args.metrics)
+            summary_log.info(f"📈 Métricas guardadas en {args.metrics}")
@@ -3,6 +3,7 @@
 
 Esta versión es más permisiva y muestra información detallada de los resultados.
 """
+import numpy as np
 import pandas as pd
 import musicbrainzngs
 import unidecode
@@ -13,6 +14,8 @@ import os
 import re
 from difflib import SequenceMatcher
 
+from text_keys import MAX_YEAR, MIN_YEAR, SPACES
+
 # Identifícate para cumplir las políticas de MusicBrainz
 musicbrainzngs.set_useragent("VibraMusicYearFiller", "2.0", "contacto@tusitio.com")
 
@@ -67,10 +70,23 @@ def is_year_missing(value):
         return True
     try:
         year = int(float(text))
-        return year < 1900 or year > 2025
+        return year < MIN_YEAR or year > MAX_YEAR
     except (ValueError, TypeError):
         return True
 
+def years_missing(values):
+    """Versión vectorizada de ``is_year_missing`` para una columna entera."""
+    years = pd.to_numeric(values.astype("string").str.strip(), errors="coerce")
+    years = np.trunc(years.to_numpy(dtype="float64", na_value=np.nan))
+    return pd.Series(~((years >= MIN_YEAR) & (years <= MAX_YEAR)), index=values.index)
+
+def normalize_column_basic(values):
+    """Versión vectorizada de ``normalize_text_basic`` para una columna entera."""
+    # Mismos espacios que split() en normalize_text_basic, pero sin pasar fila a fila por Python
+    text = values.astype("string").str.replace(SPACES, " ", regex=True).str.strip(" ")
+    text = text.mask(text.str.lower() == "nan", "")
+    return text.fillna("").astype(str)
+
 def search_release_year_debug(title, artist):
     """Versión DEBUG: más permisiva y con información detallada."""
     
@@ -128,7 +144,7 @@ def search_release_year_debug(title, artist):
                 if date and len(date) >= 4:
                     try:
                         year = int(date[:4])
-                        if 1900 <= year <= 2025:
+                        if MIN_YEAR <= year <= MAX_YEAR:
                             # Calcular similitudes
                             title_sim = similarity(title_basic, found_title)
                             artist_sim = similarity(artist_variants[0], found_artist)
@@ -222,17 +238,10 @@ def process_file_debug(input_path, output_path, batch_sleep=2.0, limit=5):
     print(f"🎯 Usando columnas: {title_column}, {artist_column}, {year_column}")
     
     # Filtra filas que necesitan procesamiento
-    rows_to_process = []
-    for idx, row in df.iterrows():
-        if len(rows_to_process) >= limit:
-            break
-            
-        if is_year_missing(row[year_column]):
-            title = normalize_text_basic(row[title_column])
-            artist = normalize_text_basic(row[artist_column])
-            
-            if title and artist:
-                rows_to_process.append((idx, title, artist))
+    titles = normalize_column_basic(df[title_column])
+    artists = normalize_column_basic(df[artist_column])
+    candidates = years_missing(df[year_column]) & (titles != "") & (artists != "")
+    rows_to_process = list(zip(df.index[candidates], titles[candidates], artists[candidates]))[:limit]
     
     print(f"\n📈 [DEBUG] Procesando solo {len(rows_to_process)} canciones para diagnóstico")
     
@@ -251,7 +260,7 @@ def process_file_debug(input_path, output_path, batch_sleep=2.0, limit=5):
         year = search_release_year_debug(title, artist)
         
         if year:
-            df.at[idx, year_column] = year
+            df.at[idx, year_column] = str(year)
             total_found += 1
             print(f"✅ AÑO ENCONTRADO Y GUARDADO: {year}")
         else:
@@ -0,0 +1,63 @@
+"""Comparación aproximada de una cadena contra muchas a la vez.
+
+``FuzzyMatcher`` normaliza los candidatos y calcula su perfil de caracteres
+una sola vez. Para cada consulta obtiene con NumPy una cota superior de la
+similitud de todos los candidatos (la ``quick_ratio`` de ``difflib``) y solo
+calcula la similitud exacta de ``SequenceMatcher`` en los que pueden superar
+el umbral. Las puntuaciones son las mismas que las de ``SequenceMatcher``, así
+que los umbrales 0.5/0.6/0.7 siguen valiendo.
+"""
+from difflib import SequenceMatcher
+
+import numpy as np
+
+
+def ratio(a, b):
+    """Similitud de ``SequenceMatcher`` entre dos cadenas ya normalizadas."""
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+class FuzzyMatcher:
+    """Candidatos preprocesados para puntuar consultas en bloque."""
+
+    def __init__(self, choices, normalize=None):
+        self.normalize = normalize
+        self.keys = [normalize(choice) if normalize else choice for choice in choices]
+        self._vocabulary = {}
+        for key in self.keys:
+            for char in key:
+                self._vocabulary.setdefault(char, len(self._vocabulary))
+
+        self._counts = np.zeros((len(self.keys), max(len(self._vocabulary), 1)), dtype=np.int32)
+        for row, key in enumerate(self.keys):
+            for char in key:
+                self._counts[row, self._vocabulary[char]] += 1
+        self._lengths = np.array([len(key) for key in self.keys], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def upper_bounds(self, query_key):
+        """Cota superior de la similitud de ``query_key`` con cada candidato."""
+        profile = np.zeros(self._counts.shape[1], dtype=np.int32)
+        for char in query_key:
+            column = self._vocabulary.get(char)
+            if column is not None:
+                profile[column] += 1
+        overlap = np.minimum(self._counts, profile).sum(axis=1)
+        total = self._lengths + len(query_key)
+        return np.divide(2.0 * overlap, total, out=np.ones(len(self.keys)), where=total > 0)
+
+    def scores(self, query, threshold=0.0):
+        """Similitud de ``query`` con cada candidato (0.0 si no llega a ``threshold``)."""
+        query_key = self.normalize(query) if self.normalize else query
+        scores = np.zeros(len(self.keys))
+        if not self.keys:
+            return scores
+        for row in np.flatnonzero(self.upper_bounds(query_key) >= threshold):
+            score = ratio(query_key, self.keys[row])
+            if score >= threshold:
+                scores[row] = score
+        return scores
@@ -0,0 +1,64 @@
+"""Modo incremental: reutiliza los valores de una salida enriquecida anterior.
+
+Cada fila se identifica por un hash del título y el artista normalizados
+(sin acentos, mayúsculas ni espacios extra). Las filas de la exportación
+nueva cuyo hash ya estaba en la salida anterior recuperan el año (y el
+perfil del artista) sin consultar MusicBrainz; las que ya estaban pero
+seguían sin año tampoco se vuelven a buscar. Solo las filas nuevas o con
+título o artista editados pasan a la búsqueda.
+"""
+import hashlib
+
+import pandas as pd
+
+from text_keys import index_key
+
+
+def content_hash(title, artist):
+    """Hash estable de una fila a partir de su título y artista."""
+    text = f"{index_key(artist)}\x1f{index_key(title)}"
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def row_hashes(titles, artists):
+    """``content_hash`` de cada fila, como Series con el mismo índice."""
+    titles = titles.astype("string").fillna("")
+    artists = artists.astype("string").fillna("")
+    return pd.Series([content_hash(title, artist) for title, artist in zip(titles, artists)],
+                     index=titles.index, dtype=object)
+
+
+class PreviousResults:
+    """Valores conocidos de la salida anterior, por campo y hash de fila.
+
+    ``fields`` asocia un nombre de campo (``year``, ``category``...) a la
+    columna del archivo anterior; las celdas vacías se ignoran y, si una
+    canción aparece varias veces, se queda el primer valor.
+    """
+
+    def __init__(self, df, title_column, artist_column, fields):
+        hashes = row_hashes(df[title_column], df[artist_column])
+        self._hashes = set(hashes)
+        self._values = {}
+        for field, column in fields.items():
+            if column not in df.columns:
+                continue
+            values = df[column].astype("string").str.strip()
+            known = values.notna() & (values != "")
+            self._values[field] = (pd.Series(values[known].to_numpy(), index=hashes[known].to_numpy())
+                                   .groupby(level=0, sort=False).first().to_dict())
+        self.rows = len(df)
+
+    def __len__(self):
+        return len(self._values.get("year", {}))
+
+    def fields(self):
+        return list(self._values)
+
+    def contains(self, hashes):
+        """Serie booleana: True en las filas que ya estaban en la salida anterior."""
+        return hashes.isin(self._hashes)
+
+    def values(self, field, hashes):
+        """Valor anterior de ``field`` para cada hash (NA si no se conoce)."""
+        return hashes.map(self._values.get(field, {}))
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Servicio HTTP/JSON local para buscar años sin arrancar el script cada vez.
+
+El proceso se queda en marcha con las cachés calientes (memo en memoria,
+caché SQLite de respuestas, catálogos por artista...) y todas las peticiones
+de todos los clientes salen por el mismo cliente de MusicBrainz, es decir,
+por el mismo token bucket.
+
+* ``POST /lookup`` con ``{"songs": [{"title": ..., "artist": ...}, ...]}``
+  devuelve ``{"results": [{"title", "artist", "year", "source"}, ...]}`` en
+  el mismo orden. ``source`` es ``memo`` (ya resuelta en este proceso),
+  ``lookup`` (buscada ahora), ``invalid`` (sin título o artista),
+  ``skipped`` (en la caché negativa) o ``error`` (MusicBrainz no respondió
+  tras los reintentos). Si alguna canción queda en ``error`` la respuesta es 503 con
+  los mismos ``results`` y un ``"error"``; otros fallos dan 500 con
+  ``{"error": ...}``.
+* ``GET /health`` devuelve el estado y el tamaño de las cachés.
+* ``GET /metrics`` devuelve las métricas en formato Prometheus.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import fill_release_year
+from bounded_cache import LRUCache
+from fill_release_year import canonical_key, normalize_text
+from metrics import metrics
+
+MAX_BATCH = 500
+
+
+class LookupService:
+    """Resuelve lotes de canciones compartiendo memo, cachés y rate limit."""
+
+    def __init__(self, workers=4, memo_size=100000):
+        self.memo_size = memo_size
+        self._memo = LRUCache(memo_size)
+        # Un único pool para todos los clientes: acota la concurrencia total
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def lookup(self, songs):
+        """Lista de ``{"title", "artist", "year", "source"}`` para cada ``(title, artist)``.
+        
+        ``server_lookups_total`` cuenta canciones de la petición (no claves distintas).
+        """
+        results = [{"title": title, "artist": artist, "year": None, "source": "lookup"} for title, artist in songs]
+        work_units = {}
+        for position, (title, artist) in enumerate(songs):
+            title, artist = normalize_text(title), normalize_text(artist)
+            if not title or not artist:
+                results[position]["source"] = "invalid"
+                metrics.inc("server_lookups_total", source="invalid")
+                continue
+            key = canonical_key(title, artist)
+            year = self._memo.get(key)
+            if year is not None:
+                results[position].update(year=year, source="memo")
+                metrics.inc("server_lookups_total", source="memo")
+            elif key in work_units:
+                work_units[key][0].append(position)
+            else:
+                work_units[key] = ([position], title, artist)
+
+        pending, _skipped = fill_release_year.skip_known_misses(list(work_units.values()))
+        pending_keys = {canonical_key(title, artist) for _positions, title, artist in pending}
+        for key, (positions, _title, _artist) in work_units.items():
+            if key not in pending_keys:
+                for position in positions:
+                    results[position]["source"] = "skipped"
+                metrics.inc("server_lookups_total", len(positions), source="skipped")
+
+        total = len(pending)
+        futures = [self._executor.submit(self._lookup_row, i + 1, total, positions, title, artist)
+                   for i, (positions, title, artist) in enumerate(pending)]
+        for (positions, title, artist), future in zip(pending, futures):
+            year, exhausted = future.result()
+            source = "error" if exhausted else "lookup"
+            if year:
+                self._memo.put(canonical_key(title, artist), year)
+            for position in positions:
+                results[position].update(year=year, source=source)
+            metrics.inc("server_lookups_total", len(positions), source=source)
+        return results
+
+    @staticmethod
+    def _lookup_row(position, total, positions, title, artist):
+        """``(year, exhausted)``: ``exhausted`` indica que MusicBrainz no respondió."""
+        # _outcome es por hilo: se limpia en el hilo del pool que hace la búsqueda
+        fill_release_year._outcome.exhausted = False
+        _positions, year = fill_release_year.lookup_row(position, total, positions, title, artist)
+        return year, fill_release_year._outcome.exhausted
+
+    def health(self):
+        client = fill_release_year.client
+        return {
+            "status": "ok",
+            "memo": len(self._memo),
+            "network_calls": client.network_calls,
+            "cache_hits": client.cache.hits if client.cache is not None else 0,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def parse_songs(payload):
+    """Extrae ``[(title, artist), ...]`` del cuerpo; lanza ValueError si no es válido."""
+    songs = payload.get("songs") if isinstance(payload, dict) else None
+    if not isinstance(songs, list):
+        raise ValueError('se espera {"songs": [{"title": ..., "artist": ...}, ...]}')
+    if len(songs) > MAX_BATCH:
+        raise ValueError(f"como máximo {MAX_BATCH} canciones por petición")
+    parsed = []
+    for song in songs:
+        if not isinstance(song, dict):
+            raise ValueError("cada canción debe ser un objeto con title y artist")
+        parsed.append((song.get("title") or "", song.get("artist") or ""))
+    return parsed
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def log_message(self, format, *args):
+        fill_release_year.log.debug(f"🌐 {self.address_string()} {format % args}")
+
+    def _send(self, status, body, content_type="application/json; charset=utf-8"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self._send(200, self.service.health())
+        elif path == "/metrics":
+            self._send(200, metrics.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._send(404, {"error": "no encontrado"})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/lookup":
+            self._send(404, {"error": "no encontrado"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            songs = parse_songs(json.loads(self.rfile.read(length) or b"null"))
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+
+        started = time.perf_counter()
+        try:
+            results = self.service.lookup(songs)
+        except Exception as e:
+            fill_release_year.log.error(f"❌ Error en /lookup: {e}")
+            self._send(500, {"error": str(e)})
+            return
+        body = {"results": results, "seconds": round(time.perf_counter() - started, 4)}
+        failed = sum(result["source"] == "error" for result in results)
+        if failed:
+            fill_release_year.log.warning(f"⏳ MusicBrainz no responde: {failed} canción(es) sin buscar")
+            body["error"] = f"MusicBrainz no responde: {failed} canción(es) sin buscar"
+            self._send(503, body)
+            return
+        self._send(200, body)
+
+
+def start_server(service, host="127.0.0.1", port=0):
+    """Arranca el servicio en un hilo y devuelve el servidor (``server.server_address``)."""
+    handler = type("BoundLookupHandler", (LookupHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio local de búsqueda de años (HTTP/JSON).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--workers", type=int, default=4, help="Búsquedas simultáneas entre todos los clientes")
+    parser.add_argument("--rate", type=float, default=1.0, help="Peticiones por segundo a MusicBrainz (compartidas)")
+    parser.add_argument("--burst", type=int, default=1, help="Peticiones que se pueden acumular en ráfaga")
+    parser.add_argument("--max-retries", type=int, default=5, help="Reintentos ante 503 o errores de red")
+    parser.add_argument("--offline-index", help="Índice local de MusicBrainz; no usa la red")
+    parser.add_argument("--cache", default=fill_release_year.DEFAULT_CACHE_PATH, help="Ruta de la caché SQLite de respuestas")
+    parser.add_argument("--no-cache", action="store_true", help="No usar la caché de respuestas")
+    parser.add_argument("--negative-cache", default=fill_release_year.DEFAULT_NEGATIVE_CACHE_PATH, help="Ruta de la caché SQLite de canciones no encontradas")
+    parser.add_argument("--no-negative-cache", action="store_true", help="Vuelve a buscar todas las canciones sin año")
+    parser.add_argument("--memo-size", type=int, default=100000, help="Años recordados en memoria")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Muestra cada consulta, candidato y similitud")
+    args = parser.parse_args()
+    fill_release_year.setup_logging(verbose=args.verbose)
+
+    fill_release_year.configure_rate_limit(args.rate, args.burst)
+    fill_release_year.configure_retries(args.max_retries)
+    if args.offline_index:
+        fill_release_year.configure_offline_index(args.offline_index)
+    if not args.no_cache:
+        fill_release_year.configure_cache(args.cache)
+    if not args.no_negative_cache and not args.offline_index:
+        fill_release_year.configure_negative_cache(args.negative_cache)
+
+    service = LookupService(workers=args.workers, memo_size=args.memo_size)
+    server = start_server(service, args.host, args.port)
+    print(f"🎧 Servicio de años en http://{args.host}:{server.server_address[1]}/lookup")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n📊 Canciones en memoria: {service.health()['memo']}, peticiones a MusicBrainz: {fill_release_year.client.network_calls}")
+        server.shutdown()
+        service.close()
+        fill_release_year.client.close()
@@ -0,0 +1,134 @@
+"""Caché persistente en SQLite para las respuestas de MusicBrainz.
+
+Cada respuesta se guarda con una clave formada por el tipo de consulta,
+la consulta normalizada y el límite pedido. Las entradas caducan tras
+``ttl`` segundos y, si la tabla supera ``max_entries``, se eliminan las
+menos usadas recientemente.
+"""
+import json
+import time
+
+from sqlite_store import SQLiteStore
+
+DEFAULT_CACHE_PATH = ".musicbrainz_cache.sqlite"
+DEFAULT_TTL = 30 * 24 * 3600  # 30 días
+DEFAULT_MAX_ENTRIES = 200000
+
+
+def normalize_query(query):
+    """Normaliza una consulta Lucene: espacios colapsados y sin mayúsculas."""
+    return ' '.join(str(query).split()).casefold()
+
+
+def make_key(kind, query, limit):
+    """Clave única de caché para una consulta."""
+    return f"{kind}|{normalize_query(query)}|{limit}"
+
+
+class ResponseCache(SQLiteStore):
+    """Caché clave/valor en SQLite con TTL y desalojo por tamaño."""
+
+    TABLE = "responses"
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS responses (
+               key TEXT PRIMARY KEY,
+               payload TEXT NOT NULL,
+               created_at REAL NOT NULL,
+               accessed_at REAL NOT NULL
+           )""",
+        "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)",
+    )
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 read_only=False):
+        super().__init__(path, read_only=read_only)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_evict = 0
+
+    def get(self, kind, query, limit):
+        """Devuelve la respuesta guardada o None si no existe o caducó."""
+        key = make_key(kind, query, limit)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            payload, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                if not self.read_only:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            if not self.read_only:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            self.hits += 1
+        return json.loads(payload)
+
+    def contains(self, kind, query, limit):
+        """True si hay una respuesta vigente, sin contarla como acierto ni refrescarla."""
+        return self.peek(kind, query, limit) is not None
+
+    def peek(self, kind, query, limit):
+        """Respuesta vigente o None, sin contarla como acierto ni refrescarla."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM responses WHERE key = ?", (make_key(kind, query, limit),)
+            ).fetchone()
+        if row is None or (self.ttl is not None and time.time() - row[1] > self.ttl):
+            return None
+        return json.loads(row[0])
+
+    def set(self, kind, query, limit, response):
+        """Guarda una respuesta en la caché."""
+        key = make_key(kind, query, limit)
+        now = time.time()
+        payload = json.dumps(response, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            self._conn.commit()
+            self._writes_since_evict += 1
+            # Desaloja por lotes para no contar la tabla en cada escritura
+            if self.max_entries and self._writes_since_evict >= 100:
+                self._evict()
+
+    def _evict(self):
+        """Elimina entradas caducadas y las menos usadas si sobra tamaño."""
+        self._writes_since_evict = 0
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        if self.max_entries:
+            total = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            excess = total - self.max_entries
+        else:
+            excess = 0
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,),
+            )
+        self._conn.commit()
+
+    def evict(self):
+        """Fuerza el desalojo de entradas caducadas y sobrantes."""
+        with self._lock:
+            self._evict()
+
+    def close(self):
+        if not self.read_only:
+            with self._lock:
+                self._evict()
+        super().close()
@@ -0,0 +1,161 @@
+"""Capa única de acceso a MusicBrainz.
+
+Todas las llamadas de ``fill_release_year.py`` pasan por ``MusicBrainzClient``
+para poder aplicar en un solo sitio la caché de respuestas, el límite de
+peticiones compartido por todos los hilos y los reintentos.
+"""
+import functools
+import threading
+import time
+
+import musicbrainzngs
+import musicbrainzngs.musicbrainz
+
+from metrics import metrics
+from rate_limiter import TokenBucket
+from retry_policy import RETRYABLE, CircuitBreaker, RetriesExhausted, RetryPolicy, classify
+
+# Identifícate para cumplir las políticas de MusicBrainz
+musicbrainzngs.set_useragent("VibraMusicYearFiller", "3.0", "contacto@tusitio.com")
+
+# El limitador propio de musicbrainzngs mantiene un lock durante toda la
+# petición HTTP y serializaría los hilos; el control lo hace TokenBucket.
+musicbrainzngs.set_rate_limit(False)
+
+# musicbrainzngs reintenta los 5xx hasta 8 veces con esperas fijas, sin mirar
+# Retry-After ni pasar por el rate limiter; los reintentos los hace RetryPolicy.
+musicbrainzngs.musicbrainz._safe_read = functools.partial(musicbrainzngs.musicbrainz._safe_read, max_retries=1)
+
+
+def user_agent():
+    """User-Agent que manda musicbrainzngs, para las peticiones a la API hechas a mano."""
+    return musicbrainzngs.musicbrainz._useragent
+
+
+def error_reason(exc):
+    """Clasifica un error de musicbrainzngs para las métricas (``http_503``, ...)."""
+    cause = getattr(exc, "cause", None)
+    code = getattr(cause, "code", None) or getattr(exc, "code", None)
+    if code:
+        return f"http_{code}"
+    return type(cause or exc).__name__
+
+
+class MusicBrainzClient:
+    """Envuelve las llamadas de ``musicbrainzngs`` con caché, rate limit y reintentos."""
+
+    def __init__(self, cache=None, rate_limiter=None, retry_policy=None, breaker=None, sleep=time.sleep):
+        self.cache = cache
+        self.rate_limiter = rate_limiter or TokenBucket(rate=1.0, burst=1)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+        self.network_calls = 0
+        self._lock = threading.Lock()
+
+    def _call(self, kind, func, query, limit, **params):
+        """Ejecuta ``func`` pasando por la caché, el rate limiter y los reintentos.
+        
+        ``query`` es la consulta Lucene en las búsquedas; en los *browse* es
+        una descripción de los parámetros que sirve como clave de caché.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(kind, query, limit)
+            if cached is not None:
+                metrics.inc("mb_cache_hits_total", kind=kind)
+                return cached
+            metrics.inc("mb_cache_misses_total", kind=kind)
+
+        if not params:
+            params = {"query": query}
+        if limit is not None:
+            params["limit"] = limit
+        
+        attempt = 0
+        while True:
+            result, exc = self._request(kind, func, params)
+            if exc is None:
+                break
+            
+            error_kind = classify(exc)
+            if error_kind not in RETRYABLE:
+                raise exc
+            if attempt >= self.retry_policy.max_retries:
+                raise RetriesExhausted(error_kind, attempt + 1, exc) from exc
+            
+            delay = self.retry_policy.delay(attempt, exc)
+            metrics.inc("mb_retries_total", kind=kind, reason=error_kind)
+            metrics.inc("retry_wait_seconds_total", delay)
+            self.sleep(delay)
+            attempt += 1
+
+        if self.cache is not None:
+            self.cache.set(kind, query, limit, result)
+        return result
+
+    def _request(self, kind, func, params):
+        """Una petición HTTP; devuelve ``(result, None)`` o ``(None, exc)``."""
+        paused = self.breaker.before_call()
+        if paused:
+            metrics.inc("circuit_breaker_wait_seconds_total", paused)
+        waited = self.rate_limiter.acquire()
+        metrics.inc("rate_limit_wait_seconds_total", waited)
+        with self._lock:
+            self.network_calls += 1
+        metrics.inc("mb_api_calls_total", kind=kind)
+        
+        started = time.perf_counter()
+        try:
+            result = func(**params)
+        except Exception as exc:
+            metrics.inc("mb_api_errors_total", kind=kind, reason=error_reason(exc))
+            self._record_outcome(classify(exc) not in RETRYABLE)
+            return None, exc
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe("mb_request_seconds", elapsed, kind=kind)
+            metrics.inc("network_seconds_total", elapsed)
+        self._record_outcome(True)
+        return result, None
+
+    def _record_outcome(self, success):
+        trips = self.breaker.trips
+        self.breaker.record(success)
+        if self.breaker.trips > trips:
+            metrics.inc("circuit_breaker_trips_total")
+
+    def search_releases(self, query, limit=5):
+        return self._call("release", musicbrainzngs.search_releases, query, limit)
+
+    def search_recordings(self, query, limit=5):
+        return self._call("recording", musicbrainzngs.search_recordings, query, limit)
+
+    def get_recording_by_id(self, recording_id, includes=("releases",)):
+        includes = list(includes)
+        return self._call(
+            "lookup-recording", musicbrainzngs.get_recording_by_id,
+            f"id={recording_id} inc={'+'.join(includes)}", None,
+            id=recording_id, includes=includes,
+        )
+
+    def search_artists(self, query, limit=5):
+        return self._call("artist", musicbrainzngs.search_artists, query, limit)
+
+    def browse_release_groups(self, artist, limit=100, offset=0):
+        return self._call(
+            "browse-release-group", musicbrainzngs.browse_release_groups,
+            f"artist={artist} offset={offset}", limit,
+            artist=artist, offset=offset,
+        )
+
+    def browse_releases(self, artist, limit=100, offset=0, includes=("recordings",)):
+        includes = list(includes)
+        return self._call(
+            "browse-release", musicbrainzngs.browse_releases,
+            f"artist={artist} offset={offset} inc={'+'.join(includes)}", limit,
+            artist=artist, offset=offset, includes=includes,
+        )
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
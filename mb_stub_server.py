@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""Servidor local que imita los endpoints ``/ws/2`` de MusicBrainz.
+
+Sirve para medir cambios (peticiones por fila, filas por minuto) sin tocar
+la API real. Responde en el XML que espera ``musicbrainzngs``:
+
+* búsquedas de ``release``, ``recording`` y ``artist`` (``?query=``),
+* *browse* de ``release-group`` y ``release`` por artista,
+* *lookup* de ``recording/<id>``.
+
+Los datos salen de un catálogo JSONL (``title``, ``artist``, ``year``)
+generado con ``build-catalog`` a partir de CSVs ya enriquecidos, como
+``resultados/base_total_musical_notion_solucionado.csv``. Además, con
+``--fixtures`` se sirven respuestas grabadas tal cual; con ``--record`` las
+peticiones que no estén grabadas se reenvían a MusicBrainz y se guardan.
+
+Se puede añadir latencia (``--latency``) e inyectar errores 503
+(``--error-rate``) para simular la API bajo carga.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+import pandas as pd
+
+from mb_client import user_agent
+from text_keys import index_key
+
+NAMESPACE_ID = uuid.UUID("6f1b7c8e-2f55-4d8e-9a4e-0d6b5e2f6a10")
+XML_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<metadata xmlns="http://musicbrainz.org/ns/mmd-2.0#" xmlns:ext="http://musicbrainz.org/ns/ext#-2.0">'
+)
+XML_FOOTER = '</metadata>'
+
+FIELD_PATTERN = re.compile(r'(\w+):"((?:[^"\\]|\\.)*)"|(\w+):(\S+)')
+
+
+def stable_id(*parts):
+    """MBID estable derivado del contenido."""
+    return str(uuid.uuid5(NAMESPACE_ID, "|".join(index_key(part) for part in parts)))
+
+
+def build_catalog(csv_paths, output_path, sample=None, seed=0, head=None):
+    """Genera el catálogo JSONL del stub a partir de CSVs con años ya resueltos.
+    
+    ``head`` limita cada CSV a sus primeras filas y ``sample`` toma una
+    muestra aleatoria del total.
+    """
+    entries = {}
+    for path in csv_paths:
+        df = pd.read_csv(path, dtype=str, nrows=head)
+        df.columns = df.columns.str.strip()
+        title_column = next(c for c in df.columns if 'CANCI' in c.upper() or 'TITUL' in c.upper())
+        artist_column = next(c for c in df.columns if 'ARTIST' in c.upper())
+        year_column = next(c for c in df.columns if 'AÑO' in c.upper() or 'YEAR' in c.upper())
+        for title, artist, year in zip(df[title_column], df[artist_column], df[year_column]):
+            if pd.isna(title) or pd.isna(artist) or pd.isna(year):
+                continue
+            title = ' '.join(str(title).split())
+            artist = ' '.join(str(artist).split())
+            try:
+                year = int(float(year))
+            except ValueError:
+                continue
+            entries.setdefault((index_key(title), index_key(artist)), {
+                "title": title.title(), "artist": artist.title(), "year": year,
+            })
+
+    values = list(entries.values())
+    if sample and len(values) > sample:
+        values = random.Random(seed).sample(values, sample)
+
+    with open(output_path, "w", encoding="utf-8") as catalog_file:
+        for entry in values:
+            catalog_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return len(values)
+
+
+def load_catalog(path):
+    catalog = []
+    with open(path, encoding="utf-8") as catalog_file:
+        for line in catalog_file:
+            if line.strip():
+                entry = json.loads(line)
+                entry["title_key"] = index_key(entry["title"])
+                entry["artist_key"] = index_key(entry["artist"])
+                entry["artist_id"] = stable_id(entry["artist"])
+                entry["recording_id"] = stable_id(entry["title"], entry["artist"])
+                entry["release_id"] = stable_id("release", entry["title"], entry["artist"])
+                catalog.append(entry)
+    return catalog
+
+
+def parse_query(query):
+    """Extrae los campos de una consulta Lucene: ``{campo: [frases]}`` y términos sueltos."""
+    fields = {}
+    for match in FIELD_PATTERN.finditer(query):
+        name = (match.group(1) or match.group(3)).lower()
+        value = match.group(2) if match.group(1) else match.group(4)
+        fields.setdefault(name, []).append(value.replace('\\"', '"'))
+    free_text = FIELD_PATTERN.sub(" ", query)
+    free_text = re.sub(r'\b(AND|OR|NOT)\b|[()]', " ", free_text)
+    return fields, index_key(free_text).split()
+
+
+def _matches(entry, fields, terms):
+    title_fields = fields.get("recording", []) + fields.get("release", []) + fields.get("releasegroup", [])
+    if title_fields and not any(index_key(phrase) in entry["title_key"] for phrase in title_fields):
+        return False
+    artist_fields = fields.get("artist", [])
+    if artist_fields and not any(index_key(phrase) in entry["artist_key"] for phrase in artist_fields):
+        return False
+    if "rid" in fields and entry["recording_id"] not in fields["rid"]:
+        return False
+    if "arid" in fields and entry["artist_id"] not in fields["arid"]:
+        return False
+    haystack = f"{entry['title_key']} {entry['artist_key']}"
+    return all(term in haystack for term in terms)
+
+
+def _artist_credit_xml(entry):
+    return (
+        f'<artist-credit><name-credit><artist id="{entry["artist_id"]}">'
+        f'<name>{escape(entry["artist"])}</name><sort-name>{escape(entry["artist"])}</sort-name>'
+        f'</artist></name-credit></artist-credit>'
+    )
+
+
+def _release_xml(entry, with_tracks=False):
+    tracks = ""
+    if with_tracks:
+        tracks = (
+            f'<medium-list count="1"><medium><position>1</position><track-list count="1" offset="0">'
+            f'<track id="{stable_id("track", entry["title"], entry["artist"])}"><position>1</position>'
+            f'<recording id="{entry["recording_id"]}"><title>{escape(entry["title"])}</title></recording>'
+            f'</track></track-list></medium></medium-list>'
+        )
+    return (
+        f'<release id="{entry["release_id"]}" ext:score="100"><title>{escape(entry["title"])}</title>'
+        f'<date>{entry["year"]}</date>{_artist_credit_xml(entry)}{tracks}</release>'
+    )
+
+
+def _recording_xml(entry):
+    return (
+        f'<recording id="{entry["recording_id"]}" ext:score="100"><title>{escape(entry["title"])}</title>'
+        f'{_artist_credit_xml(entry)}<release-list count="1">'
+        f'<release id="{entry["release_id"]}"><title>{escape(entry["title"])}</title>'
+        f'<date>{entry["year"]}</date></release></release-list></recording>'
+    )
+
+
+def _release_group_xml(entry):
+    return (
+        f'<release-group id="{stable_id("group", entry["title"], entry["artist"])}" type="Single">'
+        f'<title>{escape(entry["title"])}</title><first-release-date>{entry["year"]}</first-release-date>'
+        f'</release-group>'
+    )
+
+
+class StubState:
+    """Catálogo, configuración y contadores compartidos por las peticiones."""
+
+    def __init__(self, catalog, latency=0.0, jitter=0.0, error_rate=0.0, fixtures_dir=None,
+                 record=False, upstream="https://musicbrainz.org", seed=0):
+        self.catalog = catalog
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fixtures_dir = fixtures_dir
+        self.record = record
+        self.upstream = upstream.rstrip("/")
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.by_endpoint = {}
+        self.lock = threading.Lock()
+
+    def count(self, endpoint, error=False):
+        with self.lock:
+            self.requests += 1
+            self.errors += 1 if error else 0
+            self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + 1
+
+    def should_fail(self):
+        with self.lock:
+            return self.error_rate and self.random.random() < self.error_rate
+
+    def fixture_path(self, path_and_query):
+        digest = hashlib.sha1(path_and_query.encode("utf-8")).hexdigest()
+        return os.path.join(self.fixtures_dir, f"{digest}.xml")
+
+    def search(self, entity, query, limit, offset):
+        fields, terms = parse_query(query)
+        found = [entry for entry in self.catalog if _matches(entry, fields, terms)]
+        page = found[offset:offset + limit]
+        if entity == "release":
+            items = "".join(_release_xml(entry) for entry in page)
+        elif entity == "recording":
+            items = "".join(_recording_xml(entry) for entry in page)
+        elif entity == "artist":
+            artists = {}
+            for entry in found:
+                artists.setdefault(entry["artist_id"], entry)
+            page = list(artists.values())[offset:offset + limit]
+            found = list(artists.values())
+            items = "".join(
+                f'<artist id="{entry["artist_id"]}" ext:score="100"><name>{escape(entry["artist"])}</name>'
+                f'<sort-name>{escape(entry["artist"])}</sort-name></artist>'
+                for entry in page
+            )
+        else:
+            return None
+        return f'<{entity}-list count="{len(found)}" offset="{offset}">{items}</{entity}-list>'
+
+    def browse(self, entity, artist_id, limit, offset):
+        found = [entry for entry in self.catalog if entry["artist_id"] == artist_id]
+        page = found[offset:offset + limit]
+        if entity == "release-group":
+            items = "".join(_release_group_xml(entry) for entry in page)
+        elif entity == "release":
+            items = "".join(_release_xml(entry, with_tracks=True) for entry in page)
+        else:
+            return None
+        return f'<{entity}-list count="{len(found)}" offset="{offset}">{items}</{entity}-list>'
+
+    def lookup_recording(self, recording_id):
+        for entry in self.catalog:
+            if entry["recording_id"] == recording_id:
+                return _recording_xml(entry)
+        return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        state = self.state
+        parts = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        segments = [segment for segment in parts.path.split("/") if segment]
+        endpoint = "/".join(segments[2:3]) or "?"
+
+        if state.latency or state.jitter:
+            time.sleep(state.latency + state.random.uniform(0, state.jitter))
+
+        if state.should_fail():
+            state.count(endpoint, error=True)
+            self._send(503, b"<error><text>Rate limit exceeded</text></error>", {"Retry-After": "1"})
+            return
+
+        state.count(endpoint)
+
+        if state.fixtures_dir:
+            fixture = state.fixture_path(self.path)
+            if os.path.exists(fixture):
+                with open(fixture, "rb") as fixture_file:
+                    self._send(200, fixture_file.read())
+                return
+            if state.record:
+                request = urllib.request.Request(state.upstream + self.path, headers={"User-Agent": user_agent()})
+                with urllib.request.urlopen(request) as response:
+                    body = response.read()
+                os.makedirs(state.fixtures_dir, exist_ok=True)
+                with open(fixture, "wb") as fixture_file:
+                    fixture_file.write(body)
+                self._send(200, body)
+                return
+
+        if segments[:2] != ["ws", "2"] or len(segments) < 3:
+            self._send(404, b"<error><text>Not Found</text></error>")
+            return
+
+        entity = segments[2]
+        limit = int(params.get("limit", 25))
+        offset = int(params.get("offset", 0))
+
+        if len(segments) == 4 and entity == "recording":
+            body = state.lookup_recording(segments[3])
+        elif "query" in params:
+            body = state.search(entity, params["query"], limit, offset)
+        elif "artist" in params:
+            body = state.browse(entity, params["artist"], limit, offset)
+        else:
+            body = None
+
+        if body is None:
+            self._send(404, b"<error><text>Not Found</text></error>")
+            return
+        self._send(200, (XML_HEADER + body + XML_FOOTER).encode("utf-8"))
+
+
+def start_stub(state, host="127.0.0.1", port=0):
+    """Arranca el stub en un hilo y devuelve el servidor (``server.server_address``)."""
+    handler = type("BoundStubHandler", (StubHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub local de la API /ws/2 de MusicBrainz.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    catalog_parser = subparsers.add_parser("build-catalog", help="Genera el catálogo JSONL a partir de CSVs enriquecidos")
+    catalog_parser.add_argument("csv", nargs="+", help="CSVs con la columna de año ya completada")
+    catalog_parser.add_argument("-o", "--output", required=True, help="Catálogo JSONL de salida")
+    catalog_parser.add_argument("--sample", type=int, help="Número máximo de canciones (muestra aleatoria)")
+    catalog_parser.add_argument("--head", type=int, help="Usa solo las primeras N filas de cada CSV")
+    catalog_parser.add_argument("--seed", type=int, default=0, help="Semilla de la muestra")
+
+    serve_parser = subparsers.add_parser("serve", help="Arranca el servidor")
+    serve_parser.add_argument("catalog", help="Catálogo JSONL")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8800)
+    serve_parser.add_argument("--latency", type=float, default=0.0, help="Latencia fija por petición (s)")
+    serve_parser.add_argument("--jitter", type=float, default=0.0, help="Latencia aleatoria adicional máxima (s)")
+    serve_parser.add_argument("--error-rate", type=float, default=0.0, help="Proporción de respuestas 503")
+    serve_parser.add_argument("--fixtures", help="Directorio de respuestas grabadas")
+    serve_parser.add_argument("--record", action="store_true", help="Graba en --fixtures las respuestas reales que falten")
+    args = parser.parse_args()
+
+    if args.command == "build-catalog":
+        total = build_catalog(args.csv, args.output, sample=args.sample, seed=args.seed, head=args.head)
+        print(f"✅ {total} canciones en {args.output}")
+    else:
+        state = StubState(load_catalog(args.catalog), latency=args.latency, jitter=args.jitter,
+                          error_rate=args.error_rate, fixtures_dir=args.fixtures, record=args.record)
+        server = start_stub(state, args.host, args.port)
+        print(f"🧪 Stub de MusicBrainz en http://{args.host}:{server.server_address[1]}/ws/2")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            print(f"\n📊 Peticiones: {state.requests} (503: {state.errors})")
+            server.shutdown()
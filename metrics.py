@@ -0,0 +1,136 @@
+"""Métricas de ejecución: contadores e histogramas de latencia.
+
+Un único registro ``metrics`` recoge las llamadas a la API, aciertos de la
+caché, errores 503, tiempo de espera del rate limiter, tiempo de red y
+resultados por estrategia. Al final se exporta como JSON o en el formato
+de texto de Prometheus (según la extensión del archivo).
+"""
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Límites superiores (segundos) de los buckets de los histogramas
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Histogram:
+    """Histograma acumulado con buckets fijos."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": buckets}
+
+
+class Metrics:
+    """Registro thread-safe de contadores e histogramas con etiquetas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            key = _label_key(labels)
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Mide la duración del bloque en el histograma ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self.counters.get(name, {}).get(_label_key(labels), 0)
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started = time.time()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "elapsed_seconds": round(time.time() - self.started, 3),
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self.counters.items()
+                },
+                "histograms": {
+                    name: [{"labels": dict(key), **histogram.to_dict()} for key, histogram in series.items()]
+                    for name, series in self.histograms.items()
+                },
+            }
+
+    def to_prometheus(self):
+        """Exporta en el formato de texto de Prometheus."""
+        def fmt_labels(key, extra=()):
+            pairs = list(key) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{fmt_labels(key)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{fmt_labels(key, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_sum{fmt_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{fmt_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Guarda las métricas: Prometheus si termina en ``.prom``/``.txt``, si no JSON."""
+        with open(path, "w", encoding="utf-8") as metrics_file:
+            if path.endswith((".prom", ".txt")):
+                metrics_file.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), metrics_file, ensure_ascii=False, indent=2)
+
+
+# Registro compartido por todo el proceso
+metrics = Metrics()
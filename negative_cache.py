@@ -0,0 +1,107 @@
+"""Caché negativa persistente: canciones sin año y cuándo volver a buscarlas.
+
+Cada búsqueda fallida se guarda con su motivo:
+
+* ``no_candidates``: MusicBrainz no devolvió ningún resultado.
+* ``low_similarity``: hubo resultados pero ninguno superó los umbrales.
+* ``error``: la búsqueda falló por red, 503, etc.
+
+Las dos primeras son fallos reales y se reintentan tras ``miss_backoff``
+(que se duplica en cada intento). Los errores son transitorios y se
+reintentan mucho antes, tras ``error_backoff``. Mientras no venza el plazo
+la canción se salta y no gasta peticiones.
+"""
+import time
+
+from sqlite_store import SQLiteStore
+from text_keys import index_key
+
+DEFAULT_NEGATIVE_CACHE_PATH = ".musicbrainz_misses.sqlite"
+DEFAULT_MISS_BACKOFF = 30 * 24 * 3600  # 30 días
+DEFAULT_ERROR_BACKOFF = 3600  # 1 hora
+MAX_BACKOFF = 365 * 24 * 3600
+
+MISS_REASONS = ("no_candidates", "low_similarity")
+TRANSIENT_REASONS = ("error",)
+
+
+def song_key(title, artist):
+    """Clave de una canción, igual para variantes de mayúsculas, acentos y espacios."""
+    return f"{index_key(artist)}|{index_key(title)}"
+
+
+class NegativeCache(SQLiteStore):
+    """Registro en SQLite de canciones no encontradas con reintento programado."""
+
+    TABLE = "misses"
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS misses (
+               key TEXT PRIMARY KEY,
+               title TEXT NOT NULL,
+               artist TEXT NOT NULL,
+               reason TEXT NOT NULL,
+               attempts INTEGER NOT NULL,
+               checked_at REAL NOT NULL,
+               retry_at REAL NOT NULL
+           )""",
+    )
+
+    def __init__(self, path=DEFAULT_NEGATIVE_CACHE_PATH, miss_backoff=DEFAULT_MISS_BACKOFF,
+                 error_backoff=DEFAULT_ERROR_BACKOFF, clock=time.time, read_only=False):
+        super().__init__(path, read_only=read_only)
+        self.miss_backoff = miss_backoff
+        self.error_backoff = error_backoff
+        self.clock = clock
+
+    def _backoff(self, reason, attempts):
+        if reason in TRANSIENT_REASONS:
+            base, cap = self.error_backoff, self.miss_backoff
+        else:
+            base, cap = self.miss_backoff, MAX_BACKOFF
+        return min(base * 2 ** (attempts - 1), cap)
+
+    def record(self, title, artist, reason):
+        """Anota un fallo y programa el siguiente intento; devuelve ``retry_at``."""
+        key = song_key(title, artist)
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute("SELECT reason, attempts FROM misses WHERE key = ?", (key,)).fetchone()
+            attempts = 1
+            # Los intentos solo se acumulan dentro del mismo tipo (fallo real o error)
+            if row and (row[0] in TRANSIENT_REASONS) == (reason in TRANSIENT_REASONS):
+                attempts = row[1] + 1
+            retry_at = now + self._backoff(reason, attempts)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO misses (key, title, artist, reason, attempts, checked_at, retry_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, title, artist, reason, attempts, now, retry_at),
+            )
+            self._conn.commit()
+        return retry_at
+
+    def get(self, title, artist):
+        """Entrada guardada como diccionario, o None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT reason, attempts, checked_at, retry_at FROM misses WHERE key = ?",
+                (song_key(title, artist),),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("reason", "attempts", "checked_at", "retry_at"), row))
+
+    def should_skip(self, title, artist):
+        """True si la canción falló y su plazo de reintento aún no ha vencido."""
+        entry = self.get(title, artist)
+        return entry is not None and self.clock() < entry["retry_at"]
+
+    def forget(self, title, artist):
+        """Borra la canción (p. ej. cuando por fin se encuentra)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM misses WHERE key = ?", (song_key(title, artist),))
+            self._conn.commit()
+
+    def counts(self):
+        """Número de canciones guardadas por motivo."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT reason, COUNT(*) FROM misses GROUP BY reason").fetchall())
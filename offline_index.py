@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Índice local construido a partir de un volcado de MusicBrainz.
+
+Permite completar años sin conexión. El comando ``build`` lee un volcado
+JSON (una entidad *recording* o *release-group* por línea, como en los
+volcados JSON oficiales) o un TSV con columnas ``title``, ``artist`` y
+``date`` y guarda en SQLite el título, el artista acreditado y el año de
+lanzamiento más temprano, indexados por artista y título normalizados.
+
+``OfflineIndex`` es el backend de búsqueda que ``fill_release_year.py`` usa
+en lugar del cliente HTTP cuando se pasa ``--offline-index``.
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import threading
+
+from bounded_cache import LRUCache
+from fuzzy_match import FuzzyMatcher
+from text_keys import index_key, parse_year
+
+
+def _credit_names(artist_credit):
+    """Devuelve el crédito completo y cada artista acreditado por separado."""
+    if isinstance(artist_credit, str):
+        return [artist_credit]
+
+    full = ""
+    names = []
+    for credit in artist_credit or []:
+        if isinstance(credit, str):
+            full += credit
+            continue
+        name = credit.get("name") or credit.get("artist", {}).get("name", "")
+        full += name + credit.get("joinphrase", "")
+        artist_name = credit.get("artist", {}).get("name")
+        names.extend(filter(None, [name, artist_name]))
+    return [full] + names if full else names
+
+
+def _entity_year(entity):
+    """Año más temprano de una entidad: first-release-date o fechas de sus releases."""
+    years = [parse_year(entity.get("first-release-date") or entity.get("date"))]
+    for release in entity.get("releases", []) or entity.get("release-list", []):
+        years.append(parse_year(release.get("date")))
+    years = [year for year in years if year]
+    return min(years) if years else None
+
+
+def iter_dump_records(dump_path):
+    """Produce ``(title, artist_names, year)`` para cada entrada del volcado."""
+    if dump_path.endswith((".tsv", ".tab")):
+        with open(dump_path, encoding="utf-8", newline="") as dump_file:
+            reader = csv.DictReader(dump_file, delimiter="\t")
+            for row in reader:
+                year = parse_year(row.get("date") or row.get("first_release_date"))
+                if row.get("title") and row.get("artist") and year:
+                    yield row["title"], [row["artist"]], year
+        return
+
+    with open(dump_path, encoding="utf-8") as dump_file:
+        for line in dump_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entity = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            year = _entity_year(entity)
+            names = _credit_names(entity.get("artist-credit"))
+            if entity.get("title") and names and year:
+                yield entity["title"], names, year
+
+
+def build_index(dump_path, index_path, batch_size=10000):
+    """Ingiere un volcado en el índice SQLite y devuelve las entradas leídas."""
+    conn = sqlite3.connect(index_path)
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS recordings (
+               artist_key TEXT NOT NULL,
+               title_key TEXT NOT NULL,
+               artist TEXT NOT NULL,
+               title TEXT NOT NULL,
+               year INTEGER NOT NULL,
+               PRIMARY KEY (artist_key, title_key)
+           ) WITHOUT ROWID"""
+    )
+
+    upsert = (
+        "INSERT INTO recordings (artist_key, title_key, artist, title, year) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (artist_key, title_key) DO UPDATE SET "
+        "year = MIN(year, excluded.year), "
+        "title = CASE WHEN excluded.year < year THEN excluded.title ELSE title END, "
+        "artist = CASE WHEN excluded.year < year THEN excluded.artist ELSE artist END"
+    )
+
+    total = 0
+    batch = []
+    for title, names, year in iter_dump_records(dump_path):
+        title_key = index_key(title)
+        for artist_key in dict.fromkeys(index_key(name) for name in names):
+            if artist_key:
+                batch.append((artist_key, title_key, names[0], title, year))
+        total += 1
+        if len(batch) >= batch_size:
+            conn.executemany(upsert, batch)
+            batch = []
+    if batch:
+        conn.executemany(upsert, batch)
+
+    conn.commit()
+    conn.close()
+    return total
+
+
+class OfflineIndex:
+    """Backend de búsqueda local sobre el índice SQLite."""
+
+    def __init__(self, path, title_threshold=0.6, max_artists=10000):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.title_threshold = title_threshold
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Por artista: (filas, matcher); acotado como las demás cachés en memoria
+        self._artist_rows = LRUCache(max_artists)
+
+    def _rows_for_artist(self, artist_key):
+        """Filas del artista y su ``FuzzyMatcher`` de títulos (se cargan una vez por artista reciente)."""
+        entry = self._artist_rows.get(artist_key)
+        if entry is None:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT title_key, title, year FROM recordings WHERE artist_key = ?",
+                    (artist_key,),
+                ).fetchall()
+            entry = (rows, FuzzyMatcher([found_key for found_key, _title, _year in rows]))
+            self._artist_rows.put(artist_key, entry)
+        return entry
+
+    def lookup_year(self, title, artist_variants):
+        """Devuelve el año más temprano para el título y las variantes de artista."""
+        title_key = index_key(title)
+        best = None
+        for artist_key in dict.fromkeys(index_key(variant) for variant in artist_variants):
+            rows, matcher = self._rows_for_artist(artist_key)
+            if not rows:
+                continue
+            scores = matcher.scores(title_key, self.title_threshold)
+            for (_found_key, _found_title, year), score in zip(rows, scores):
+                if not score or score < self.title_threshold:
+                    continue
+                candidate = (float(score), -year)
+                if best is None or candidate > best:
+                    best = candidate
+            if best and best[0] == 1.0:
+                break
+        return -best[1] if best else None
+
+    def close(self):
+        self._conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construye el índice local de MusicBrainz.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Ingiere un volcado JSON/TSV en el índice")
+    build_parser.add_argument("dump", help="Volcado de MusicBrainz (JSON por líneas o TSV)")
+    build_parser.add_argument("-o", "--output", default="musicbrainz_index.sqlite", help="Índice SQLite de salida")
+
+    lookup_parser = subparsers.add_parser("lookup", help="Consulta un título y artista en el índice")
+    lookup_parser.add_argument("index", help="Índice SQLite")
+    lookup_parser.add_argument("title", help="Título de la canción")
+    lookup_parser.add_argument("artist", help="Artista")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(f"📥 Leyendo volcado: {args.dump}")
+        total = build_index(args.dump, args.output)
+        print(f"✅ {total} entradas indexadas en {args.output}")
+    else:
+        index = OfflineIndex(args.index)
+        year = index.lookup_year(args.title, [args.artist])
+        print(year if year else "❌ No encontrado")
+        index.close()
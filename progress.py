@@ -0,0 +1,69 @@
+"""Ritmo y tiempo restante de una ejecución en curso.
+
+``ProgressTracker`` cuenta las canciones terminadas y calcula el ritmo sobre
+una ventana de las últimas completadas, así que refleja el ritmo actual
+(caché caliente, 503, pausas) y no solo la media desde el arranque.
+"""
+import threading
+import time
+from collections import deque
+
+
+def format_duration(seconds):
+    """``3725`` -> ``1h 02m``; ``95`` -> ``1m 35s``."""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressTracker:
+    """Canciones terminadas, ritmo reciente y ETA."""
+
+    def __init__(self, total, window=50, clock=time.monotonic):
+        # None si no se conoce de antemano (modo por bloques): sin ETA
+        self.total = total
+        self.done = 0
+        self.clock = clock
+        self._started = self._last_report = clock()
+        self._recent = deque([(self._started, 0)], maxlen=window + 1)
+        self._lock = threading.Lock()
+
+    def update(self, count=1):
+        with self._lock:
+            self.done += count
+            self._recent.append((self.clock(), self.done))
+
+    def rate(self):
+        """Canciones por segundo en la ventana reciente (0.0 sin datos)."""
+        with self._lock:
+            (first_time, first_done), (last_time, last_done) = self._recent[0], self._recent[-1]
+        elapsed = last_time - first_time
+        return (last_done - first_done) / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        """Segundos estimados hasta terminar, o None si aún no hay ritmo o total."""
+        rate = self.rate()
+        if not rate or self.total is None:
+            return None
+        return max(self.total - self.done, 0) / rate
+
+    def due(self, seconds):
+        """True si han pasado ``seconds`` desde el último aviso (y empieza a contar de nuevo)."""
+        with self._lock:
+            now = self.clock()
+            if now - self._last_report < seconds:
+                return False
+            self._last_report = now
+            return True
+
+    def describe(self):
+        """Texto para el log: ``12.5 canciones/min · ETA 3m 20s``."""
+        rate = self.rate()
+        if not rate:
+            return "calculando ritmo..."
+        if self.total is None:
+            return f"{rate * 60:.1f} canciones/min"
+        return f"{rate * 60:.1f} canciones/min · ETA {format_duration(self.eta())}"
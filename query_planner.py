@@ -0,0 +1,109 @@
+"""Planificador de consultas: variantes de artista y orden de estrategias.
+
+La búsqueda de MusicBrainz (Lucene) no distingue mayúsculas, así que las
+variantes que solo difieren en capitalización generan la misma consulta.
+``plan_artist_variants`` las pliega y devuelve un orden estable.
+
+``QueryPlanner`` lleva la cuenta de aciertos por estrategia y por tipo de
+variante y reordena sobre la marcha para que la estrategia con más aciertos
+por petición se pruebe primero, saltando las que casi nunca aciertan.
+"""
+import re
+import threading
+
+import unidecode
+
+# Orden por defecto de los tipos de variante
+VARIANT_KINDS = ("original", "sin_acentos", "principal", "principal_sin_acentos")
+
+COLLABORATION_SPLIT = re.compile(r'\s*(?:&|/|,|\band\b|\by\b|\bfeat\.?\b|\bft\.?\b)\s*', re.IGNORECASE)
+
+
+def lucene_key(text):
+    """Forma de una variante tal y como la ve el buscador (sin mayúsculas)."""
+    return ' '.join(str(text).split()).casefold()
+
+
+def plan_artist_variants(artist):
+    """Devuelve ``[(tipo, variante)]`` sin duplicados bajo Lucene y en orden fijo."""
+    artist = ' '.join(str(artist).split())
+    candidates = [("original", artist), ("sin_acentos", unidecode.unidecode(artist))]
+
+    parts = COLLABORATION_SPLIT.split(artist, maxsplit=1)
+    if len(parts) > 1:
+        main_artist = parts[0].strip()
+        candidates.append(("principal", main_artist))
+        candidates.append(("principal_sin_acentos", unidecode.unidecode(main_artist)))
+
+    variants = {}
+    for kind, variant in candidates:
+        key = lucene_key(variant)
+        if key and key not in variants:
+            variants[key] = (kind, variant)
+    return list(variants.values())
+
+
+class QueryPlanner:
+    """Estadísticas de aciertos y orden adaptativo de estrategias y variantes."""
+
+    def __init__(self, strategies=("release", "recording", "simple"), min_attempts=20,
+                 skip_below=0.02, probe_every=20):
+        self.strategies = tuple(strategies)
+        self.min_attempts = min_attempts
+        self.skip_below = skip_below
+        self.probe_every = probe_every
+        # estrategia -> [filas intentadas, aciertos, peticiones]
+        self.strategy_stats = {name: [0, 0, 0] for name in self.strategies}
+        # tipo de variante -> [consultas, aciertos]
+        self.variant_stats = {kind: [0, 0] for kind in VARIANT_KINDS}
+        self._rows = 0
+        self._lock = threading.Lock()
+
+    def _hits_per_call(self, name):
+        attempts, hits, calls = self.strategy_stats[name]
+        # Suavizado de Laplace para no descartar nada sin datos
+        return (hits + 1) / (calls + 2)
+
+    def _is_skipped(self, name):
+        attempts, hits, _calls = self.strategy_stats[name]
+        return attempts >= self.min_attempts and hits / attempts < self.skip_below
+
+    def order_strategies(self):
+        """Estrategias a probar en esta fila, de más a menos rentable."""
+        with self._lock:
+            self._rows += 1
+            probing = self.probe_every and self._rows % self.probe_every == 0
+            ordered = sorted(self.strategies, key=self._hits_per_call, reverse=True)
+            active = [name for name in ordered if probing or not self._is_skipped(name)]
+            return active or ordered[:1]
+
+    def order_variants(self, variants):
+        """Ordena ``[(tipo, variante)]`` por tasa de acierto de su tipo (orden estable)."""
+        with self._lock:
+            def rate(item):
+                queries, hits = self.variant_stats.get(item[0], (0, 0))
+                return (hits + 1) / (queries + 2)
+            return sorted(variants, key=rate, reverse=True)
+
+    def record_strategy(self, name, calls, hit):
+        with self._lock:
+            stats = self.strategy_stats[name]
+            stats[0] += 1
+            stats[1] += 1 if hit else 0
+            stats[2] += calls
+
+    def record_variant(self, kind, hit):
+        with self._lock:
+            stats = self.variant_stats.setdefault(kind, [0, 0])
+            stats[0] += 1
+            stats[1] += 1 if hit else 0
+
+    def summary(self):
+        """Copia de las estadísticas para mostrar al final de la ejecución."""
+        with self._lock:
+            return {
+                "strategies": {name: dict(zip(("attempts", "hits", "calls"), stats))
+                               for name, stats in self.strategy_stats.items()},
+                "variants": {kind: dict(zip(("queries", "hits"), stats))
+                             for kind, stats in self.variant_stats.items()},
+            }
@@ -0,0 +1,46 @@
+"""Limitador de peticiones tipo *token bucket* compartido entre hilos.
+
+MusicBrainz permite de media una petición por segundo por IP. El cubo se
+rellena a ``rate`` fichas por segundo hasta un máximo de ``burst``; cada
+petición consume una ficha y espera si no hay ninguna disponible.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket thread-safe."""
+
+    def __init__(self, rate=1.0, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate debe ser mayor que 0")
+        if burst < 1:
+            raise ValueError("burst debe ser al menos 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Bloquea hasta obtener una ficha. Devuelve los segundos esperados."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self.waited += waited
+                    return waited
+                delay = (1.0 - self._tokens) / self.rate
+            # Duerme fuera del lock para no bloquear el relleno a otros hilos
+            self._sleep(delay)
+            waited += delay
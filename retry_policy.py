@@ -0,0 +1,163 @@
+"""Reintentos con backoff exponencial y circuit breaker para MusicBrainz.
+
+Los errores se clasifican en:
+
+* ``throttle``: 503/429, MusicBrainz pide que bajemos el ritmo.
+* ``server``: otros 5xx.
+* ``network``: timeouts, conexiones cortadas, etc.
+* ``permanent``: 400/404, errores de uso o de parseo; no se reintentan.
+
+Los tres primeros se reintentan con backoff exponencial con jitter,
+respetando ``Retry-After`` si viene en la respuesta. ``CircuitBreaker``
+vigila la tasa de errores de todas las peticiones y, si se dispara, detiene
+a todos los hilos durante un tiempo de enfriamiento antes de dejar pasar
+una petición de prueba.
+"""
+import random
+import socket
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import musicbrainzngs
+
+RETRYABLE = ("throttle", "server", "network")
+
+
+class RetriesExhausted(Exception):
+    """Una petición siguió fallando tras todos los reintentos."""
+
+    def __init__(self, kind, attempts, cause):
+        super().__init__(f"{kind} tras {attempts} intentos: {cause}")
+        self.kind = kind
+        self.attempts = attempts
+        self.cause = cause
+
+
+def http_code(exc):
+    cause = getattr(exc, "cause", None)
+    return getattr(cause, "code", None) or getattr(exc, "code", None)
+
+
+def classify(exc):
+    """Tipo de error: ``throttle``, ``server``, ``network`` o ``permanent``."""
+    code = http_code(exc)
+    if code in (429, 503):
+        return "throttle"
+    if code and 500 <= code < 600:
+        return "server"
+    if code:
+        return "permanent"
+    cause = getattr(exc, "cause", None)
+    if isinstance(exc, musicbrainzngs.NetworkError) or isinstance(
+            cause or exc, (socket.timeout, TimeoutError, ConnectionError)):
+        return "network"
+    return "permanent"
+
+
+def retry_after(exc, now=None):
+    """Segundos pedidos en la cabecera ``Retry-After``, o None."""
+    headers = getattr(getattr(exc, "cause", None), "headers", None) or getattr(exc, "headers", None)
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(when - (now if now is not None else time.time()), 0.0)
+
+
+class RetryPolicy:
+    """Backoff exponencial con jitter: la mitad fija y la otra mitad aleatoria."""
+
+    def __init__(self, max_retries=5, base_delay=1.0, max_delay=60.0, rng=None):
+        if max_retries < 0:
+            raise ValueError("max_retries no puede ser negativo")
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt, exc=None):
+        """Espera antes del reintento ``attempt`` (0 = primer reintento)."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** attempt)
+        delay = ceiling / 2 + self.rng.uniform(0, ceiling / 2)
+        requested = retry_after(exc) if exc is not None else None
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """Detiene todas las peticiones cuando se dispara la tasa de errores.
+
+    Estados: ``closed`` (normal), ``open`` (todos esperan ``cooldown``) y
+    ``half_open`` (pasa una sola petición de prueba). Si la prueba falla se
+    vuelve a abrir con el doble de espera, hasta ``max_cooldown``.
+    """
+
+    def __init__(self, window=20, threshold=0.5, min_calls=10, cooldown=30.0, max_cooldown=300.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.window = window
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.clock = clock
+        self.sleep = sleep
+        self.state = "closed"
+        self.trips = 0
+        self._cooldown = cooldown
+        self._opened_at = 0.0
+        self._probing = False
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Bloquea mientras el circuito está abierto; devuelve los segundos esperados."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                if self.state == "closed":
+                    return waited
+                remaining = self._opened_at + self._cooldown - self.clock()
+                if self.state == "open" and remaining <= 0:
+                    self.state = "half_open"
+                if self.state == "half_open" and not self._probing:
+                    self._probing = True
+                    return waited
+                pause = remaining if remaining > 0 else min(1.0, self._cooldown)
+            self.sleep(pause)
+            waited += pause
+
+    def record(self, success):
+        """Anota el resultado de una petición (los errores permanentes cuentan como éxito)."""
+        with self._lock:
+            if self.state == "half_open" and self._probing:
+                self._probing = False
+                if success:
+                    self.state = "closed"
+                    self._cooldown = self.base_cooldown
+                    self._outcomes.clear()
+                else:
+                    self._open(min(self._cooldown * 2, self.max_cooldown))
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (self.state == "closed" and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.threshold):
+                self._open(self._cooldown)
+
+    def _open(self, cooldown):
+        self.state = "open"
+        self.trips += 1
+        self._cooldown = cooldown
+        self._opened_at = self.clock()
+        self._outcomes.clear()
@@ -0,0 +1,84 @@
+"""Reparto del catálogo entre varios procesos o máquinas (``--shard i/N``).
+
+Cada fila va al shard que indica un hash estable del artista normalizado,
+así que todas las canciones de un artista caen en el mismo shard y su
+catálogo y su entidad solo se resuelven en un nodo. Cada shard escribe el
+archivo completo con solo sus filas rellenas; ``merge_tables`` junta las
+salidas sobre el archivo original conservando su orden de filas.
+"""
+import hashlib
+
+import pandas as pd
+
+from text_keys import index_key
+
+
+def parse_shard(text):
+    """``"2/4"`` -> ``(2, 4)``; los shards se numeran desde 1."""
+    try:
+        index, count = (int(part) for part in str(text).split("/"))
+    except ValueError:
+        raise ValueError(f"shard no válido: {text!r} (se espera i/N, p. ej. 1/4)") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"shard no válido: {text!r} (i debe estar entre 1 y N)")
+    return index, count
+
+
+def shard_of(artist, count):
+    """Shard (1..``count``) de un artista; igual en cualquier proceso o máquina."""
+    digest = hashlib.blake2b(index_key(artist).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+def shard_mask(artists, index, count):
+    """Serie booleana con las filas cuyo artista pertenece al shard ``index``."""
+    owners = {}
+    for artist in artists:
+        if artist not in owners:
+            owners[artist] = shard_of(artist, count)
+    return artists.map(owners) == index
+
+
+def shard_output_path(output_path, index, count):
+    """``salida.csv`` -> ``salida.shard1of4.csv`` (sin cambios si ya lleva el sufijo)."""
+    suffix = f".shard{index}of{count}"
+    base, extension = output_path.rsplit(".", 1) if "." in output_path else (output_path, "")
+    if base.endswith(suffix):
+        return output_path
+    return base + suffix + (f".{extension}" if extension else "")
+
+
+def merge_tables(original, shards):
+    """Junta las salidas de los shards sobre ``original``.
+
+    Cada celda que un shard cambió respecto al original se copia al
+    resultado, que conserva el orden de filas del original. Las columnas
+    nuevas (p. ej. el año si no existía) se añaden al final. Lanza
+    ValueError si los archivos no tienen las mismas filas o si dos shards
+    cambiaron la misma celda.
+    """
+    merged = original.copy()
+    changed_by = {}
+    for number, shard in enumerate(shards, 1):
+        if len(shard) != len(original):
+            raise ValueError(f"el shard {number} tiene {len(shard)} filas y el original {len(original)}")
+        shard = shard.set_axis(original.index)
+        for column in shard.columns:
+            values = shard[column]
+            if column in original.columns:
+                before = original[column].astype("string").str.strip()
+                after = values.astype("string").str.strip()
+                changed = ~(before.eq(after).fillna(False) | (before.isna() & after.isna()))
+            else:
+                changed = values.notna()
+                if column not in merged.columns:
+                    merged[column] = pd.NA
+            if not changed.any():
+                continue
+            overlap = changed & changed_by.get(column, pd.Series(False, index=original.index))
+            if overlap.any():
+                raise ValueError(f"la columna {column} de la fila {overlap.idxmax() + 1} cambió en dos shards")
+            changed_by[column] = changed_by.get(column, pd.Series(False, index=original.index)) | changed
+            merged[column] = merged[column].astype(object)
+            merged.loc[changed, column] = values[changed]
+    return merged
@@ -0,0 +1,143 @@
+"""Agrupa canciones casi iguales para buscarlas una sola vez.
+
+``group_rows`` solo junta las filas con la misma clave exacta. Aquí se unen
+además las que difieren en detalles: ``"LABIOS ROTOS"`` y ``"Labios Rotos
+(En Vivo)"``, o una errata en el artista. Para no comparar todas contra
+todas, solo se comparan las canciones que comparten bloque:
+
+* mismo artista normalizado, o
+* mismo par de trigramas de título menos frecuentes (para erratas en el
+  artista).
+
+Los bloques de más de ``max_block`` canciones (un artista con cientos de
+títulos) se parten por la primera palabra del título y, si siguen siendo
+grandes, en ventanas solapadas sobre los títulos ordenados.
+
+Dentro de cada bloque se exige similitud alta en el título (sin paréntesis
+ni sufijos tipo ``- Remaster``) y en el artista.
+"""
+import re
+from collections import Counter, defaultdict
+
+from fuzzy_match import FuzzyMatcher, ratio
+from text_keys import index_key
+
+DEFAULT_TITLE_THRESHOLD = 0.9
+DEFAULT_ARTIST_THRESHOLD = 0.85
+MAX_BLOCK = 200
+
+BRACKETS = re.compile(r"\s*[\(\[][^\)\]]*[\)\]]")
+SUFFIX = re.compile(r"\s+-\s+.*$")
+
+
+def core_title(title):
+    """Título normalizado sin paréntesis, corchetes ni sufijos ``- ...``."""
+    text = SUFFIX.sub("", BRACKETS.sub("", str(title)))
+    return index_key(text) or index_key(title)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # La canción que aparece antes queda como representante
+            self.parent[max(a, b)] = min(a, b)
+
+
+class SongClusterer:
+    """Une unidades ``(indices, title, artist)`` de canciones casi iguales."""
+
+    def __init__(self, title_threshold=DEFAULT_TITLE_THRESHOLD, artist_threshold=DEFAULT_ARTIST_THRESHOLD,
+                 max_block=MAX_BLOCK):
+        self.title_threshold = title_threshold
+        self.artist_threshold = artist_threshold
+        self.max_block = max_block
+        self.comparisons = 0
+
+    def _blocks(self, titles, artists):
+        blocks = defaultdict(list)
+        for position, artist in enumerate(artists):
+            blocks[("artist", artist)].append(position)
+
+        grams = [trigrams(title) for title in titles]
+        frequency = Counter(gram for title_grams in grams for gram in title_grams)
+        for position, title_grams in enumerate(grams):
+            rarest = sorted(title_grams, key=lambda gram: (frequency[gram], gram))[:2]
+            blocks[("title", tuple(rarest))].append(position)
+        return [block for members in blocks.values() if len(members) > 1
+                for block in self._split(members, titles)]
+
+    def _split(self, members, titles):
+        if len(members) <= self.max_block:
+            yield members
+            return
+        by_word = defaultdict(list)
+        for member in members:
+            by_word[titles[member].split(" ", 1)[0]].append(member)
+        step = max(1, self.max_block // 2)
+        for group in by_word.values():
+            if len(group) <= self.max_block:
+                if len(group) > 1:
+                    yield group
+                continue
+            # Ordenados por título, los parecidos quedan cerca: ventanas que se solapan a la mitad
+            ordered = sorted(group, key=lambda member: (titles[member], member))
+            for start in range(0, len(ordered), step):
+                yield sorted(ordered[start:start + self.max_block])
+                if start + self.max_block >= len(ordered):
+                    break
+
+    def cluster(self, work_units):
+        """Devuelve ``(unidades, grupos)``.
+
+        Las unidades de un mismo grupo se funden en la primera (sus índices
+        se juntan). ``grupos`` lista, para cada fusión, las unidades
+        originales, empezando por la representante.
+        """
+        if len(work_units) < 2:
+            return list(work_units), []
+
+        titles = [core_title(title) for _indices, title, _artist in work_units]
+        artists = [index_key(artist) for _indices, _title, artist in work_units]
+        union = _UnionFind(len(work_units))
+
+        for members in self._blocks(titles, artists):
+            matcher = FuzzyMatcher([titles[member] for member in members])
+            for offset, member in enumerate(members[:-1]):
+                scores = matcher.scores(titles[member], threshold=self.title_threshold)
+                for other_offset in range(offset + 1, len(members)):
+                    other = members[other_offset]
+                    if scores[other_offset] < self.title_threshold or union.find(member) == union.find(other):
+                        continue
+                    self.comparisons += 1
+                    if ratio(artists[member], artists[other]) >= self.artist_threshold:
+                        union.union(member, other)
+
+        groups = defaultdict(list)
+        for position in range(len(work_units)):
+            groups[union.find(position)].append(position)
+
+        units = []
+        clusters = []
+        for root in sorted(groups):
+            members = groups[root]
+            _indices, title, artist = work_units[root]
+            indices = sorted(idx for member in members for idx in work_units[member][0])
+            units.append((indices, title, artist))
+            if len(members) > 1:
+                clusters.append([work_units[member] for member in members])
+        return units, clusters
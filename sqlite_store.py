@@ -0,0 +1,51 @@
+"""Base común de los almacenes en SQLite.
+
+La caché de respuestas, la caché negativa y la tabla de artistas abren su
+base igual: crean la carpeta si falta, usan WAL y comparten una conexión
+entre hilos protegida por un único lock. Con ``read_only`` (``--dry-run``)
+la base debe existir y no se escribe nada en ella.
+"""
+import os
+import pathlib
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """Conexión SQLite compartida entre hilos, protegida por ``_lock``.
+
+    Las subclases definen ``TABLE`` (la tabla principal, para ``len``) y
+    ``SCHEMA`` (las sentencias ``CREATE ... IF NOT EXISTS``).
+    """
+
+    TABLE = None
+    SCHEMA = ()
+
+    def __init__(self, path, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self._lock = threading.Lock()
+
+        if read_only:
+            # mode=ro: falla si no existe y SQLite rechaza cualquier escritura
+            uri = f"{pathlib.Path(path).absolute().as_uri()}?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            return
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
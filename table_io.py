@@ -0,0 +1,167 @@
+"""Lectura y escritura de catálogos en CSV, Parquet o Arrow según la extensión.
+
+CSV se lee como texto (``dtype=str``), igual que siempre. Parquet y Arrow
+(IPC/Feather) se leen con ``pyarrow`` en modo *memory-mapped* y pidiendo solo
+las columnas necesarias; al escribirlos la columna de año se guarda como
+entero con nulos (``Int64``). ``pyarrow`` solo hace falta para esos formatos.
+"""
+import os
+
+import pandas as pd
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+
+
+def file_format(path):
+    """``csv``, ``parquet`` o ``arrow`` según la extensión del archivo."""
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension in PARQUET_EXTENSIONS:
+        return "parquet"
+    if extension in ARROW_EXTENSIONS:
+        return "arrow"
+    return "csv"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("Los archivos Parquet/Arrow necesitan pyarrow: pip install pyarrow") from exc
+    return pyarrow
+
+
+def read_column_names(path):
+    """Nombres de columna (sin espacios sobrantes) sin leer los datos."""
+    fmt = file_format(path)
+    if fmt == "csv":
+        return list(pd.read_csv(path, dtype=str, nrows=0).columns.str.strip())
+    return [name.strip() for name in _raw_column_names(path)]
+
+
+def _as_text(df, year_column=None):
+    """Convierte el año numérico a texto como en CSV (``2006``, no ``2006.0``)."""
+    if year_column in df.columns and pd.api.types.is_numeric_dtype(df[year_column]):
+        df[year_column] = pd.to_numeric(df[year_column], errors="coerce").astype("Int64").astype("string")
+    return df
+
+
+def read_table(path, columns=None, year_column=None):
+    """Lee el archivo entero o solo ``columns`` (nombres ya sin espacios)."""
+    fmt = file_format(path)
+    if fmt == "csv":
+        df = pd.read_csv(path, dtype=str)
+        df.columns = df.columns.str.strip()
+        return df[columns] if columns else df
+
+    pa = _pyarrow()
+    raw_columns = None
+    if columns:
+        # Los nombres del archivo pueden traer espacios; se piden tal cual
+        by_name = {}
+        for name in _raw_column_names(path):
+            by_name.setdefault(name.strip(), name)
+        raw_columns = [by_name[column] for column in columns if column in by_name]
+    if fmt == "parquet":
+        table = pa.parquet.read_table(path, columns=raw_columns, memory_map=True)
+    else:
+        table = pa.feather.read_table(path, columns=raw_columns, memory_map=True)
+    df = table.to_pandas()
+    df.columns = df.columns.str.strip()
+    return _as_text(df, year_column)
+
+
+def _raw_column_names(path):
+    pa = _pyarrow()
+    if file_format(path) == "parquet":
+        return pa.parquet.read_schema(path, memory_map=True).names
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def iter_chunks(path, chunksize, year_column=None):
+    """Produce el archivo en bloques de ``chunksize`` filas con índice continuo."""
+    fmt = file_format(path)
+    if fmt == "csv":
+        yield from pd.read_csv(path, dtype=str, chunksize=chunksize)
+        return
+
+    pa = _pyarrow()
+    if fmt == "parquet":
+        batches = pa.parquet.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunksize)
+    else:
+        batches = pa.ipc.open_file(pa.memory_map(path)).read_all().to_batches(max_chunksize=chunksize)
+    start = 0
+    for batch in batches:
+        df = batch.to_pandas()
+        df.index = pd.RangeIndex(start, start + len(df))
+        start += len(df)
+        yield _as_text(df, year_column)
+
+
+def _to_arrow(df, year_column=None, schema=None):
+    pa = _pyarrow()
+    df = df.copy()
+    for column in df.columns:
+        if column == year_column:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+        elif not pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = df[column].astype("string")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return table.cast(schema) if schema is not None else table
+
+
+def write_table(df, path, year_column=None):
+    """Escribe ``df`` en el formato que indica la extensión de ``path``."""
+    fmt = file_format(path)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+        return
+    pa = _pyarrow()
+    table = _to_arrow(df, year_column)
+    if fmt == "parquet":
+        pa.parquet.write_table(table, path)
+    else:
+        pa.feather.write_feather(table, path)
+
+
+class ChunkWriter:
+    """Escribe bloques sucesivos en un mismo archivo CSV, Parquet o Arrow."""
+
+    def __init__(self, path, columns, year_column=None):
+        self.path = path
+        self.columns = columns
+        self.year_column = year_column
+        self.format = file_format(path)
+        self._writer = None
+        self._schema = None
+        self._first = True
+
+    def write(self, df):
+        if self.format == "csv":
+            df.to_csv(self.path, index=False, columns=self.columns,
+                      mode="w" if self._first else "a", header=self._first)
+        else:
+            pa = _pyarrow()
+            table = _to_arrow(df[self.columns], self.year_column, self._schema)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.format == "parquet":
+                    self._writer = pa.parquet.ParquetWriter(self.path, table.schema)
+                else:
+                    self._writer = pa.ipc.new_file(self.path, table.schema)
+            self._writer.write_table(table)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
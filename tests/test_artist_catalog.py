@@ -0,0 +1,58 @@
+import unittest
+
+from artist_catalog import ArtistCatalog
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def search_artists(self, query, limit=5):
+        self.calls.append(('search_artists', query))
+        return {'artist-list': [
+            {'id': 'zoe-id', 'name': 'Zoé', 'sort-name': 'Zoé'},
+            {'id': 'other-id', 'name': 'Zoe Wees', 'sort-name': 'Wees, Zoe'},
+        ]}
+
+    def browse_release_groups(self, artist, limit=100, offset=0):
+        self.calls.append(('browse_release_groups', offset))
+        groups = [{'title': 'Memo Rex Commander y el corazón atómico de la Vía Láctea', 'first-release-date': '2006-08-01'}]
+        return {'release-group-list': groups, 'release-group-count': 1}
+
+    def browse_releases(self, artist, limit=100, offset=0):
+        self.calls.append(('browse_releases', offset))
+        pages = [
+            [{'date': '2011-04-12', 'medium-list': [{'track-list': [{'recording': {'title': 'Labios rotos'}}]}]}],
+            [{'date': '2006-08-01', 'medium-list': [{'track-list': [
+                {'recording': {'title': 'Labios rotos'}},
+                {'recording': {'title': 'Vía Láctea'}},
+            ]}]}],
+        ]
+        page = offset // 1
+        return {'release-list': pages[page] if page < len(pages) else [], 'release-count': 2}
+
+
+class TestArtistCatalog(unittest.TestCase):
+    def test_resolves_artist_once_and_matches_locally(self):
+        client = FakeClient()
+        catalog = ArtistCatalog(client)
+
+        self.assertEqual(catalog.lookup('LABIOS ROTOS', 'ZOE', ['ZOE']), 2006)
+        self.assertEqual(catalog.lookup('VIA LACTEA', 'ZOE', ['ZOE']), 2006)
+        self.assertIsNone(catalog.lookup('SOÑE', 'ZOE', ['ZOE']))
+        self.assertGreater(catalog.candidates('ZOE', ['ZOE']), 0)
+
+        kinds = [kind for kind, _ in client.calls]
+        self.assertEqual(kinds.count('search_artists'), 1)
+        self.assertEqual(kinds.count('browse_release_groups'), 1)
+        self.assertEqual(kinds.count('browse_releases'), 2)
+
+    def test_plan_skips_artists_with_few_songs(self):
+        catalog = ArtistCatalog(FakeClient(), min_songs=2)
+        catalog.plan(['ZOE', 'Zoé', 'Rata Blanca'])
+        self.assertTrue(catalog.should_browse('ZOE'))
+        self.assertFalse(catalog.should_browse('RATA BLANCA'))
+
+
+if __name__ == '__main__':
+    unittest.main()
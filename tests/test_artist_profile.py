@@ -0,0 +1,77 @@
+import unittest
+
+import pandas as pd
+
+import fill_release_year
+from artist_profile import ArtistResolver, artist_category, artist_genre
+from text_keys import index_key
+
+ARTISTS = {
+    'zoe': {'id': 'zoe-id', 'name': 'Zoé', 'sort-name': 'Zoé', 'type': 'Group',
+            'tag-list': [{'name': 'rock', 'count': '3'}, {'name': 'mexican', 'count': '1'}]},
+    'shakira': {'id': 'sh-id', 'name': 'Shakira', 'sort-name': 'Shakira', 'type': 'Person', 'gender': 'Female',
+                'tag-list': [{'name': 'pop', 'count': '7'}]},
+    'jesse & joy': {'id': 'jj-id', 'name': 'Jesse & Joy', 'sort-name': 'Jesse & Joy', 'type': 'Group',
+                    'disambiguation': 'Mexican pop duo'},
+}
+
+
+class FakeClient:
+    def __init__(self):
+        self.queries = []
+
+    def search_artists(self, query, limit=5):
+        self.queries.append(query)
+        name = index_key(query.split('"')[1])
+        return {'artist-list': [ARTISTS[name]] if name in ARTISTS else []}
+
+
+class TestArtistProfile(unittest.TestCase):
+    def test_category_and_genre(self):
+        self.assertEqual(artist_category(ARTISTS['zoe']), 'GRUPO')
+        self.assertEqual(artist_category(ARTISTS['shakira']), 'MUJER')
+        self.assertEqual(artist_category({'type': 'Person', 'gender': 'Male'}), 'HOMBRE')
+        self.assertEqual(artist_category(ARTISTS['jesse & joy']), 'DUO')
+        self.assertIsNone(artist_category({'type': 'Person'}))
+        self.assertIsNone(artist_category(None))
+        self.assertEqual(artist_genre(ARTISTS['zoe']), 'ROCK')
+        self.assertIsNone(artist_genre(ARTISTS['jesse & joy']))
+
+    def test_fill_one_request_per_artist(self):
+        client = FakeClient()
+        original = fill_release_year.artist_resolver
+        fill_release_year.artist_resolver = ArtistResolver(client)
+        try:
+            df = pd.DataFrame({
+                'ARTISTAS': ['Zoé', 'ZOE', 'Shakira', 'Jesse & Joy', 'Desconocido'],
+                'HOMBRE / MUJER / DUO / GRUPO': [None, None, 'SOLISTA', None, None],
+                'GÉNERO': [None, 'ALTERNATIVO', None, None, None],
+            }, dtype='str')
+            filled, artists = fill_release_year.fill_artist_profiles(
+                df, 'ARTISTAS', ['HOMBRE / MUJER / DUO / GRUPO', 'GÉNERO'])
+        finally:
+            fill_release_year.artist_resolver = original
+
+        self.assertEqual(list(df['HOMBRE / MUJER / DUO / GRUPO'][:4]), ['GRUPO', 'GRUPO', 'SOLISTA', 'DUO'])
+        self.assertEqual(list(df['GÉNERO'][:3]), ['ROCK', 'ALTERNATIVO', 'POP'])
+        self.assertEqual((filled, artists), (5, 4))
+        self.assertEqual(len(client.queries), 4)
+
+    def test_fill_only_selected_rows(self):
+        client = FakeClient()
+        original = fill_release_year.artist_resolver
+        fill_release_year.artist_resolver = ArtistResolver(client)
+        try:
+            df = pd.DataFrame({'ARTISTAS': ['Zoé', 'Shakira', 'ZOE'],
+                               'HOMBRE / MUJER / DUO / GRUPO': [None, None, None]}, dtype='str')
+            filled, artists = fill_release_year.fill_artist_profiles(
+                df, 'ARTISTAS', ['HOMBRE / MUJER / DUO / GRUPO'], rows=[0])
+        finally:
+            fill_release_year.artist_resolver = original
+
+        self.assertEqual((filled, artists), (1, 1))
+        self.assertEqual(df['HOMBRE / MUJER / DUO / GRUPO'].isna().tolist(), [False, True, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
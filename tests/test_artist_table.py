@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+
+import fill_release_year
+from artist_table import ArtistTable
+from query_planner import QueryPlanner
+
+
+class FakeClient:
+    def __init__(self):
+        self.queries = []
+
+    def search_releases(self, query, limit=5):
+        self.queries.append(query)
+        return {'release-list': [{'title': 'Yo no quiero volverme tan loco', 'date': '1982-01-01',
+                                  'artist-credit': [{'artist': {'name': 'Charly García', 'id': 'mbid-charly'}}]}]}
+
+    def search_recordings(self, query, limit=5):
+        self.queries.append(query)
+        return {'recording-list': [{'id': 'rec-1', 'title': 'Yo no quiero volverme tan loco',
+                                    'first-release-date': '1982-01-01',
+                                    'artist-credit': [{'artist': {'name': 'Charly García', 'id': 'mbid-charly'}}]}]}
+
+
+class TestArtistTable(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'artists.sqlite')
+        self.table = ArtistTable(self.path)
+
+    def tearDown(self):
+        self.table.close()
+        self.tmpdir.cleanup()
+
+    def test_learns_and_persists(self):
+        self.assertTrue(self.table.learn('CHARLY GARCIA ', 'Charly García', 'mbid-charly', 0.9))
+        self.assertFalse(self.table.learn('Charly Garcia', 'Otro', 'mbid-otro', 0.8))
+        self.assertFalse(self.table.learn('Rata Blanca', 'Rata Blanca', 'mbid-rata', 0.5))
+        self.table.close()
+
+        self.table = ArtistTable(self.path)
+        entry = self.table.get('Charly García')
+        self.assertEqual((entry['name'], entry['mbid'], entry['source']), ('Charly García', 'mbid-charly', 'match'))
+        self.assertEqual(entry['raw'], 'CHARLY GARCIA')
+        self.assertIsNone(self.table.get('Rata Blanca'))
+
+    def test_manual_entries_win(self):
+        self.table.set('Charly García y Pedro Aznar', 'Charly García')
+        self.assertFalse(self.table.learn('Charly García y Pedro Aznar', 'Pedro Aznar', 'mbid-pedro', 1.0))
+        self.assertEqual(self.table.get('charly garcia y pedro aznar')['name'], 'Charly García')
+
+    def test_csv_round_trip(self):
+        self.table.learn('ZOE', 'Zoé', 'mbid-zoe', 0.95)
+        csv_path = os.path.join(self.tmpdir.name, 'artists.csv')
+        self.assertEqual(self.table.export_csv(csv_path), 1)
+        with open(csv_path, 'a', encoding='utf-8') as csv_file:
+            csv_file.write('Los Enanitos,Enanitos Verdes,,,\n')
+        self.assertEqual(self.table.import_csv(csv_path), 2)
+        self.assertEqual(self.table.get('los enanitos')['source'], 'manual')
+
+
+class TestArtistTableLookups(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.originals = fill_release_year.client, fill_release_year.planner
+        fill_release_year.client = FakeClient()
+        fill_release_year.planner = QueryPlanner()
+        fill_release_year.configure_artist_table(os.path.join(self.tmpdir.name, 'artists.sqlite'))
+
+    def tearDown(self):
+        fill_release_year.artist_table.close()
+        fill_release_year.artist_table = None
+        fill_release_year.artist_resolver.table = None
+        fill_release_year.client, fill_release_year.planner = self.originals
+        self.tmpdir.cleanup()
+
+    def test_match_is_learned_and_skips_variants(self):
+        title, artist = 'Yo no quiero volverme tan loco', 'Charly García y Pedro Aznar'
+        self.assertEqual(fill_release_year.search_release_year_fixed(title, artist), 1982)
+        entry = fill_release_year.artist_table.get(artist)
+        self.assertEqual((entry['name'], entry['mbid']), ('Charly García', 'mbid-charly'))
+
+        self.assertEqual(fill_release_year.variants_for_artist(artist), [('tabla', 'Charly García')])
+        fill_release_year.client.queries.clear()
+        self.assertEqual(fill_release_year.search_release_year_fixed(title, artist), 1982)
+        self.assertEqual(fill_release_year.client.queries,
+                         ['release:"Yo no quiero volverme tan loco" AND artist:"Charly García"'])
+
+    def test_candidate_pool_match_is_learned(self):
+        fill_release_year.planner = QueryPlanner(strategies=('pool',))
+        artist = 'Charly García y Pedro Aznar'
+        self.assertEqual(fill_release_year.search_release_year_fixed('Yo no quiero volverme tan loco', artist), 1982)
+        entry = fill_release_year.artist_table.get(artist)
+        self.assertEqual((entry['name'], entry['mbid']), ('Charly García', 'mbid-charly'))
+
+    def test_accented_canonical_name_is_learned(self):
+        for artist, name in [('ZOE', 'Zoé'), ('MANA', 'Maná')]:
+            fill_release_year._outcome.artist_match = (name, f'mbid-{artist}')
+            fill_release_year.learn_artist(artist)
+            entry = fill_release_year.artist_table.get(artist)
+            self.assertEqual(entry['name'], name)
+            self.assertEqual(entry['confidence'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
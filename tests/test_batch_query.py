@@ -0,0 +1,67 @@
+import unittest
+
+from batch_query import BatchedRecordingSearch, build_queries, lucene_phrase
+
+
+def recording(title, artist, date):
+    return {'title': title, 'artist-credit': [{'artist': {'name': artist}}], 'first-release-date': date}
+
+
+class FakeClient:
+    def __init__(self):
+        self.queries = []
+
+    def search_recordings(self, query, limit=5):
+        self.queries.append(query)
+        return {'recording-list': [
+            recording('Labios rotos (en vivo)', 'Zoé', '2011-04-12'),
+            recording('Labios rotos', 'Zoé', '2006-08-01'),
+            recording('Soñé', 'Zoé', '1999'),
+            recording('Soñé', 'Otro artista', '1980'),
+        ]}
+
+
+class TestBuildQueries(unittest.TestCase):
+    def test_single_or_query(self):
+        queries = build_queries('Zoé', ['Labios rotos', 'Soñé'])
+        self.assertEqual(queries, [('artist:"Zoé" AND (recording:"Labios rotos" OR recording:"Soñé")',
+                                    ['Labios rotos', 'Soñé'])])
+
+    def test_respects_length_and_title_limits(self):
+        titles = [f'Cancion {i}' for i in range(10)]
+        for query, chunk in build_queries('Zoé', titles, max_length=120):
+            self.assertLessEqual(len(query), 120)
+        self.assertEqual(sum(len(chunk) for _query, chunk in build_queries('Zoé', titles, max_length=120)), 10)
+        self.assertEqual([len(chunk) for _query, chunk in build_queries('Zoé', titles, max_titles=4)], [4, 4, 2])
+
+    def test_escapes_quotes(self):
+        self.assertEqual(lucene_phrase('Say "hi" \\o/'), '"Say \\"hi\\" \\\\o/"')
+
+
+class TestBatchedRecordingSearch(unittest.TestCase):
+    def test_one_query_per_artist(self):
+        client = FakeClient()
+        search = BatchedRecordingSearch(client)
+        search.plan([('LABIOS ROTOS', 'ZOE'), ('SOÑE', 'ZOE'), ('Cancion inexistente', 'ZOE'), ('Otra', 'Solo')])
+
+        self.assertTrue(search.should_batch('Zoé'))
+        self.assertFalse(search.should_batch('Solo'))
+        self.assertEqual(search.lookup('LABIOS ROTOS', 'ZOE'), 2006)
+        self.assertEqual(search.lookup('SOÑE', 'ZOE'), 1999)
+        self.assertIsNone(search.lookup('Cancion inexistente', 'ZOE'))
+        self.assertEqual(search.match('SOÑE', 'ZOE'), (1999, 'Zoé', None))
+        self.assertEqual(len(client.queries), 1)
+
+    def test_new_titles_are_queried_later(self):
+        client = FakeClient()
+        search = BatchedRecordingSearch(client)
+        search.plan([('LABIOS ROTOS', 'ZOE'), ('Cancion inexistente', 'ZOE')])
+        search.lookup('LABIOS ROTOS', 'ZOE')
+        search.plan([('SOÑE', 'ZOE'), ('Otra', 'ZOE')])
+        self.assertEqual(search.lookup('SOÑE', 'ZOE'), 1999)
+        self.assertEqual(len(client.queries), 2)
+        self.assertNotIn('LABIOS ROTOS', client.queries[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from bounded_cache import MISSING, KeyLocks, LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+
+    def test_stored_none_is_not_missing(self):
+        cache = LRUCache(2)
+        cache.put('a', None)
+        self.assertIsNone(cache.get('a', MISSING))
+        self.assertIs(cache.get('b', MISSING), MISSING)
+
+
+class TestKeyLocks(unittest.TestCase):
+    def test_same_key_same_lock(self):
+        locks = KeyLocks(stripes=4)
+        self.assertIs(locks(('catalog', 'x')), locks(('catalog', 'x')))
+        self.assertEqual(len({id(locks(key)) for key in range(100)}), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
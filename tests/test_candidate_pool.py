@@ -0,0 +1,51 @@
+import unittest
+
+import fill_release_year
+from fill_release_year import pick_year, score_candidates
+
+
+def recording(title, artist, releases, recording_id='rec'):
+    return {'id': recording_id, 'title': title, 'artist-credit': [{'artist': {'name': artist}}],
+            'release-list': [{'title': release_title, 'date': date} for release_title, date in releases]}
+
+
+RECORDINGS = [
+    recording('Labios rotos (en vivo)', 'Zoé', [('MTV Unplugged', '2011-04-12')], 'rec-live'),
+    recording('Labios rotos', 'Zoé', [('Memo Rex Commander', '2006-08-01'), ('Labios rotos', '2006-05-01')], 'rec-1'),
+    recording('Labios rotos', 'Otro artista', [('Labios rotos', '1980')], 'rec-other'),
+    recording('Soñé', 'Zoé', [('Zoé', '1999')], 'rec-sone'),
+]
+
+
+class FakeClient:
+    def __init__(self):
+        self.queries = []
+
+    def search_recordings(self, query, limit=5):
+        self.queries.append((query, limit))
+        return {'recording-list': RECORDINGS}
+
+
+class TestCandidatePool(unittest.TestCase):
+    def test_earliest_year_among_confident_matches(self):
+        candidates = score_candidates('Labios Rotos', 'Zoe', RECORDINGS)
+        self.assertNotIn('rec-other', [candidate[3] for candidate in candidates])
+        # La versión en vivo queda por debajo del margen de confianza
+        self.assertEqual(pick_year(candidates), 2006)
+        self.assertIsNone(pick_year([]))
+
+    def test_single_request_per_row(self):
+        original = fill_release_year.client
+        fill_release_year.client = FakeClient()
+        try:
+            year, calls = fill_release_year.strategy_pool('Soñé', [('original', 'Zoé'), ('sin_acentos', 'Zoe')])
+            self.assertEqual((year, calls), (1999, 1))
+            query, limit = fill_release_year.client.queries[0]
+            self.assertEqual(query, '(recording:"Soñé" OR release:"Soñé") AND artist:"Zoé"')
+            self.assertEqual(limit, fill_release_year.POOL_LIMIT)
+        finally:
+            fill_release_year.client = original
+
+
+if __name__ == '__main__':
+    unittest.main()
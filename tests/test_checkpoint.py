@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+from checkpoint import CheckpointJournal, JournalIndex, load_journal
+
+
+class TestCheckpointJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'out.csv.journal.jsonl')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_records_found_and_not_found(self):
+        with CheckpointJournal(self.path) as journal:
+            journal.record(0, 'LABIOS ROTOS', 'ZOE', 2006)
+            journal.record(3, 'SOÑE', 'ZOE', None)
+
+        entries = load_journal(self.path)
+        self.assertEqual(entries[0]['year'], 2006)
+        self.assertEqual(entries[0]['status'], 'found')
+        self.assertIsNone(entries[3]['year'])
+        self.assertEqual(entries[3]['status'], 'not_found')
+
+    def test_resume_appends_and_ignores_partial_line(self):
+        with CheckpointJournal(self.path) as journal:
+            journal.record(0, 'A', 'B', None)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"row": 1, "tit')
+
+        self.assertEqual(list(load_journal(self.path)), [0])
+
+        with CheckpointJournal(self.path, resume=True) as journal:
+            journal.record(0, 'A', 'B', 1999)
+        self.assertEqual(load_journal(self.path)[0]['year'], 1999)
+
+    def test_index_reads_only_requested_rows(self):
+        with CheckpointJournal(self.path) as journal:
+            for row in (5, 0, 12, 7):
+                journal.record(row, 'A', 'B', None)
+            journal.record(5, 'A', 'B', 1999)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"row": 6, "tit')
+        # Al reanudar se cierra la línea cortada
+        CheckpointJournal(self.path, resume=True).close()
+
+        index = JournalIndex(self.path)
+        self.assertEqual(len(index), 4)
+        entries = index.entries(range(5, 10))
+        self.assertEqual(sorted(entries), [5, 7])
+        # Gana la última línea de la fila, como en load_journal
+        self.assertEqual(entries[5]['year'], 1999)
+        self.assertEqual(index.entries(range(20, 30)), {})
+        self.assertEqual(len(JournalIndex(os.path.join(self.tmpdir.name, 'nope.jsonl'))), 0)
+
+    def test_missing_journal(self):
+        self.assertEqual(load_journal(os.path.join(self.tmpdir.name, 'nope.jsonl')), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
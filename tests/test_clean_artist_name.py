@@ -2,17 +2,28 @@ import unittest
 from fill_release_year import clean_artist_name
 
 class TestCleanArtistName(unittest.TestCase):
+    # La última variante es siempre la más reducida: artista principal sin acentos
     def test_basic_separators(self):
-        self.assertEqual(clean_artist_name('Juan y Pedro'), 'Juan')
-        self.assertEqual(clean_artist_name('Juan Y Pedro'), 'Juan')
-        self.assertEqual(clean_artist_name('A & B'), 'A')
-        self.assertEqual(clean_artist_name('A AND B'), 'A')
-        self.assertEqual(clean_artist_name('Grupo / Colaborador'), 'Grupo')
-        self.assertEqual(clean_artist_name('Grupo, Otro'), 'Grupo')
+        self.assertEqual(clean_artist_name('Juan y Pedro')[-1], 'Juan')
+        self.assertEqual(clean_artist_name('Juan Y Pedro')[-1], 'Juan')
+        self.assertEqual(clean_artist_name('A & B')[-1], 'A')
+        self.assertEqual(clean_artist_name('A AND B')[-1], 'A')
+        self.assertEqual(clean_artist_name('Grupo / Colaborador')[-1], 'Grupo')
+        self.assertEqual(clean_artist_name('Grupo, Otro')[-1], 'Grupo')
 
     def test_no_separator(self):
-        self.assertEqual(clean_artist_name('SoloArtist'), 'SoloArtist')
-        self.assertEqual(clean_artist_name('Beyoncé'), 'Beyonce')
+        self.assertEqual(clean_artist_name('SoloArtist')[-1], 'SoloArtist')
+        self.assertEqual(clean_artist_name('Beyoncé')[-1], 'Beyonce')
+
+    def test_case_variants_are_folded(self):
+        self.assertEqual(clean_artist_name('CHARLY GARCIA '), ['CHARLY GARCIA'])
+        self.assertEqual(clean_artist_name('Beyoncé'), ['Beyoncé', 'Beyonce'])
+
+    def test_order_is_deterministic(self):
+        self.assertEqual(
+            clean_artist_name('Charly García y Pedro Aznar'),
+            ['Charly García y Pedro Aznar', 'Charly Garcia y Pedro Aznar', 'Charly García', 'Charly Garcia'],
+        )
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,192 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import fill_release_year
+from mb_cache import ResponseCache
+from progress import ProgressTracker, format_duration
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CSV = """CANCIÓN,ARTISTA,AÑO DE LANZAMIENTO
+LABIOS ROTOS,ZOE,
+Tu Vicio,Charly García & Pedro Aznar,
+Labios Rotos,Zoé,
+Soñé,Zoé,1999
+"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProgressTracker(unittest.TestCase):
+    def test_rate_and_eta(self):
+        clock = FakeClock()
+        tracker = ProgressTracker(10, clock=clock)
+        self.assertIsNone(tracker.eta())
+        self.assertEqual(tracker.describe(), 'calculando ritmo...')
+        for _ in range(4):
+            clock.now += 3.0
+            tracker.update()
+        self.assertAlmostEqual(tracker.rate(), 1 / 3)
+        self.assertAlmostEqual(tracker.eta(), 18.0)
+        self.assertEqual(tracker.describe(), '20.0 canciones/min · ETA 18s')
+
+    def test_unknown_total_and_due(self):
+        clock = FakeClock()
+        tracker = ProgressTracker(None, clock=clock)
+        clock.now += 2.0
+        tracker.update()
+        self.assertIsNone(tracker.eta())
+        self.assertEqual(tracker.describe(), '30.0 canciones/min')
+        self.assertFalse(tracker.due(30))
+        clock.now += 30.0
+        self.assertTrue(tracker.due(30))
+        self.assertFalse(tracker.due(30))
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(95), '1m 35s')
+        self.assertEqual(format_duration(3725), '1h 02m')
+
+
+class TestDryRun(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_limiter = fill_release_year.client.rate_limiter
+        fill_release_year.configure_rate_limit(2.0)
+        cache = fill_release_year.configure_cache(os.path.join(self.tmpdir.name, 'cache.sqlite'))
+        cache.set('release', 'release:"LABIOS ROTOS" AND artist:"ZOE"', 5, {'release-list': []})
+        self.input = os.path.join(self.tmpdir.name, 'input.csv')
+        with open(self.input, 'w', encoding='utf-8') as csv_file:
+            csv_file.write(CSV)
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        fill_release_year.client.cache.close()
+        fill_release_year.client.cache = None
+        fill_release_year.client.rate_limiter = self.original_limiter
+        self.tmpdir.cleanup()
+
+    def test_estimates_without_lookups(self):
+        output = os.path.join(self.tmpdir.name, 'output.csv')
+        summary = fill_release_year.process_file_fixed(self.input, output, dry_run=True)
+        self.assertFalse(os.path.exists(output))
+        self.assertFalse(os.path.exists(output + '.journal.jsonl'))
+        self.assertEqual(fill_release_year.client.network_calls, 0)
+
+        estimate = summary['estimate']
+        self.assertEqual((estimate['rows'], estimate['songs']), (3, 2))
+        # La colaboración prueba 3 variantes en release y 2 en las demás
+        self.assertEqual(estimate['strategies']['release'], {'queries': 3, 'cached': 1})
+        self.assertEqual(estimate['strategies']['simple'], {'queries': 3, 'cached': 0})
+        # Sin la consulta en caché, cada grabación puede necesitar get_recording_by_id
+        self.assertEqual(estimate['recording_lookups'], 9)
+        self.assertEqual((estimate['min_calls'], estimate['max_calls']), (1, 18))
+        self.assertEqual(estimate['max_seconds'], 9.0)
+
+    def test_cached_recordings_with_dates_need_no_lookup(self):
+        cache = fill_release_year.client.cache
+        cache.set('recording', 'recording:"LABIOS ROTOS" AND artist:"ZOE"', 3,
+                  {'recording-list': [{'id': 'r1', 'first-release-date': '2006'}, {'id': 'r2'}]})
+        estimate = fill_release_year.estimate_cost([([0], 'LABIOS ROTOS', 'ZOE')])
+        # Solo r2 no trae fecha
+        self.assertEqual(estimate['recording_lookups'], 1)
+
+    def test_artist_profiles_are_estimated(self):
+        fill_release_year.configure_artist_profiles()
+        try:
+            summary = fill_release_year.process_file_fixed(self.input, os.path.join(self.tmpdir.name, 'out.csv'),
+                                                           dry_run=True)
+        finally:
+            fill_release_year.fill_profiles = False
+        estimate = summary['estimate']
+        # Zoé (1 variante) y la colaboración (3 como mucho)
+        self.assertEqual(estimate['profile_artists'], 2)
+        self.assertEqual(estimate['profiles'], {'queries': 1 + 3, 'cached': 0})
+        self.assertEqual(estimate['max_calls'], 18 + 4)
+
+    def test_chunked_estimate_matches_and_streams(self):
+        whole = fill_release_year.process_file_fixed(self.input, os.path.join(self.tmpdir.name, 'out.csv'),
+                                                     dry_run=True)
+        with mock.patch.object(fill_release_year, 'read_table', side_effect=AssertionError('archivo completo')):
+            chunked = fill_release_year.process_file_fixed(self.input, os.path.join(self.tmpdir.name, 'out.csv'),
+                                                           dry_run=True, chunksize=2)
+        # La fila repetida del segundo bloque sale de la memoria del primero: no se busca
+        self.assertEqual(chunked['estimate']['rows'], whole['estimate']['rows'] - 1)
+        for key in ('songs', 'strategies', 'recording_lookups', 'min_calls', 'max_calls', 'max_seconds'):
+            self.assertEqual(chunked['estimate'][key], whole['estimate'][key])
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, 'out.csv')))
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, 'out.csv.journal.jsonl')))
+
+    def test_no_side_effects(self):
+        table = fill_release_year.configure_artist_table(os.path.join(self.tmpdir.name, 'artists.sqlite'))
+        table.set('Charly García & Pedro Aznar', 'Charly García')
+        # Como la línea de comandos con --dry-run: agrupa, pero sin informe
+        fill_release_year.configure_clustering()
+        try:
+            with open(self.input, 'a', encoding='utf-8') as csv_file:
+                csv_file.write('Labios Rotos (En Vivo),Zoé,\n')
+            summary = fill_release_year.process_file_fixed(self.input, os.path.join(self.tmpdir.name, 'out.csv'),
+                                                           dry_run=True)
+        finally:
+            fill_release_year.artist_table = None
+            fill_release_year.clusterer = fill_release_year.cluster_report = None
+            table.close()
+        # La tabla sí cambia la estimación, pero no cuenta como uso
+        self.assertEqual(summary['estimate']['strategies']['release'], {'queries': 1, 'cached': 1})
+        self.assertEqual(table.hits, 0)
+        self.assertEqual(summary['songs'], 2)
+
+
+class TestDryRunCli(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmpdir.name, 'input.csv'), 'w', encoding='utf-8') as csv_file:
+            csv_file.write(CSV)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def dry_run(self):
+        subprocess.run([sys.executable, os.path.join(ROOT, 'fill_release_year.py'), 'input.csv', '--dry-run', '-q'],
+                       cwd=self.tmpdir.name, check=True, capture_output=True)
+
+    def test_does_not_create_stores(self):
+        self.dry_run()
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)), ['input.csv'])
+
+    def test_existing_cache_is_opened_read_only(self):
+        path = os.path.join(self.tmpdir.name, fill_release_year.DEFAULT_CACHE_PATH)
+        cache = ResponseCache(path)
+        cache.set('release', 'viejo', 5, {'release-list': []})
+        cache.close()
+        # Caducada: un close() normal la borraría al desalojar
+        conn = sqlite3.connect(path)
+        conn.execute("UPDATE responses SET created_at = 0")
+        conn.commit()
+        conn.close()
+        with open(path, 'rb') as cache_file:
+            before = hashlib.sha256(cache_file.read()).hexdigest()
+
+        self.dry_run()
+        with open(path, 'rb') as cache_file:
+            self.assertEqual(hashlib.sha256(cache_file.read()).hexdigest(), before)
+        cache = ResponseCache(path, read_only=True)
+        self.assertEqual(len(cache), 1)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from difflib import SequenceMatcher
+
+from fuzzy_match import FuzzyMatcher, ratio
+
+
+CHOICES = ['Labios rotos', 'Labios rotos (en vivo)', 'Soñé', 'Vía Láctea', 'Mujer amante', '']
+
+
+class TestFuzzyMatcher(unittest.TestCase):
+    def test_scores_match_sequence_matcher(self):
+        matcher = FuzzyMatcher(CHOICES, normalize=str.lower)
+        for query in ['LABIOS ROTOS', 'labios roto', 'Sone', 'Mujer', '']:
+            expected = [SequenceMatcher(None, query.lower(), choice.lower()).ratio() for choice in CHOICES]
+            self.assertEqual(list(matcher.scores(query)), expected)
+
+    def test_threshold_prunes_low_scores(self):
+        matcher = FuzzyMatcher(CHOICES, normalize=str.lower)
+        scores = matcher.scores('Labios rotos', threshold=0.6)
+        self.assertEqual(scores[0], 1.0)
+        self.assertGreater(scores[1], 0.6)
+        self.assertEqual(list(scores[2:]), [0.0] * 4)
+
+    def test_upper_bound_never_below_ratio(self):
+        matcher = FuzzyMatcher(CHOICES)
+        for query in ['Labios', 'Soñe', 'amante mujer']:
+            for bound, choice in zip(matcher.upper_bounds(query), CHOICES):
+                self.assertGreaterEqual(bound, ratio(query, choice))
+
+    def test_empty_matcher(self):
+        self.assertEqual(len(FuzzyMatcher([]).scores('Labios rotos')), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+
+from fill_release_year import canonical_key, group_rows
+
+
+class TestGroupRows(unittest.TestCase):
+    def test_canonical_key(self):
+        self.assertEqual(canonical_key('  Soñé ', 'CHARLY  GARCIA '), canonical_key('sone', 'Charly García'))
+
+    def test_group_rows_fans_out(self):
+        rows = [
+            (0, 'LABIOS ROTOS', 'ZOE'),
+            (1, 'Mujer Amante', 'Rata Blanca'),
+            (2, 'Labios Rotos', 'Zoé'),
+        ]
+        self.assertEqual(group_rows(rows), [
+            ([0, 2], 'LABIOS ROTOS', 'ZOE'),
+            ([1], 'Mujer Amante', 'Rata Blanca'),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import fill_release_year
+from incremental import content_hash
+from offline_index import build_index
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'musicbrainz_dump_sample.jsonl')
+
+PREVIOUS = """CANCIÓN,ARTISTA,AÑO DE LANZAMIENTO
+LABIOS ROTOS,ZOE,2006
+SOÑE,ZOE,0
+Tu Vicio,Pedro Aznar,
+"""
+
+# Nueva exportación: una fila con otro formato, una editada y una nueva
+CURRENT = """CANCIÓN,ARTISTA,AÑO DE LANZAMIENTO
+Labios  Rotos,Zoé,
+SOÑE,ZOE,
+Tu Vicio (Live),Pedro Aznar,
+Tu Vicio,Pedro Aznar,
+"""
+
+
+class TestContentHash(unittest.TestCase):
+    def test_ignores_accents_case_and_spaces(self):
+        self.assertEqual(content_hash('Labios  Rotos', 'Zoé'), content_hash('LABIOS ROTOS', 'ZOE'))
+        self.assertNotEqual(content_hash('Labios Rotos', 'Zoé'), content_hash('Labios Rotos', 'Caifanes'))
+
+
+class TestIncremental(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        index_path = os.path.join(self.tmpdir.name, 'index.sqlite')
+        build_index(FIXTURE, index_path)
+        fill_release_year.configure_offline_index(index_path)
+        self.previous = self.write('previous.csv', PREVIOUS)
+        self.input = self.write('input.csv', CURRENT)
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        fill_release_year.offline_index.close()
+        fill_release_year.offline_index = None
+        fill_release_year.previous_results = None
+        fill_release_year.retry_misses = False
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as csv_file:
+            csv_file.write(text)
+        return path
+
+    def test_only_new_rows_are_looked_up(self):
+        previous = fill_release_year.configure_incremental(self.previous)
+        self.assertEqual(len(previous), 1)
+
+        output = os.path.join(self.tmpdir.name, 'output.csv')
+        summary = fill_release_year.process_file_fixed(self.input, output)
+        self.assertEqual(summary['reused'], 1)
+        self.assertEqual(summary['unchanged_misses'], 2)
+        self.assertEqual(summary['rows'], 1)
+        with open(output, encoding='utf-8') as output_file:
+            self.assertEqual(output_file.read().splitlines()[1], 'Labios  Rotos,Zoé,2006')
+
+    def test_streaming(self):
+        fill_release_year.configure_incremental(self.previous)
+        output = os.path.join(self.tmpdir.name, 'output.csv')
+        summary = fill_release_year.process_file_fixed(self.input, output, chunksize=2)
+        self.assertEqual(summary['reused'], 1)
+        self.assertEqual(summary['unchanged_misses'], 2)
+        self.assertEqual(summary['rows'], 1)
+
+    def count_lookups(self, retry):
+        fill_release_year.configure_incremental(self.previous, retry=retry)
+        output = os.path.join(self.tmpdir.name, 'output.csv')
+        with mock.patch.object(fill_release_year, 'search_release_year_fixed',
+                               wraps=fill_release_year.search_release_year_fixed) as search:
+            fill_release_year.process_file_fixed(self.input, output)
+        return [call.args for call in search.call_args_list]
+
+    def test_unchanged_rows_without_year_are_not_looked_up_again(self):
+        self.assertEqual(self.count_lookups(retry=False), [('Tu Vicio (Live)', 'Pedro Aznar')])
+
+    def test_retry_misses(self):
+        self.assertEqual(len(self.count_lookups(retry=True)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+
+import musicbrainzngs
+
+import fill_release_year
+from lookup_server import LookupService, start_server
+from metrics import metrics
+from offline_index import build_index
+from mb_stub_server import StubState, load_catalog, start_stub
+from retry_policy import CircuitBreaker
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'musicbrainz_dump_sample.jsonl')
+CATALOG = os.path.join(os.path.dirname(__file__), 'fixtures', 'stub_catalog.jsonl')
+
+
+class TestLookupServer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.tmpdir.name, 'index.sqlite')
+        build_index(FIXTURE, self.index_path)
+        fill_release_year.configure_offline_index(self.index_path)
+        self.service = LookupService(workers=2)
+        self.server = start_server(self.service)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.close()
+        fill_release_year.offline_index.close()
+        fill_release_year.offline_index = None
+        self.tmpdir.cleanup()
+
+    def post(self, payload):
+        request = urllib.request.Request(f'{self.url}/lookup', data=json.dumps(payload).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def test_batch_and_memo(self):
+        metrics.reset()
+        songs = [
+            {'title': 'LABIOS ROTOS', 'artist': 'ZOE'},
+            {'title': 'Cancion inexistente', 'artist': 'ZOE'},
+            {'title': 'Labios Rotos', 'artist': 'Zoé'},
+            {'title': '', 'artist': 'ZOE'},
+        ]
+        results = self.post({'songs': songs})['results']
+        self.assertEqual([result['year'] for result in results], [2006, None, 2006, None])
+        self.assertEqual([result['source'] for result in results], ['lookup', 'lookup', 'lookup', 'invalid'])
+        # Una por canción de la petición, aunque dos compartan búsqueda
+        self.assertEqual(metrics.counter_value('server_lookups_total', source='lookup'), 3)
+        self.assertEqual(metrics.counter_value('server_lookups_total', source='invalid'), 1)
+
+        again = self.post({'songs': songs[:1]})['results']
+        self.assertEqual(again[0]['year'], 2006)
+        self.assertEqual(again[0]['source'], 'memo')
+
+    def test_rejects_invalid_body(self):
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            self.post([['LABIOS ROTOS', 'ZOE']])
+        self.assertEqual(error.exception.code, 400)
+
+    def test_lookup_errors_return_json(self):
+        def failing_lookup(songs):
+            raise RuntimeError('disco lleno')
+        self.service.lookup = failing_lookup
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self.post({'songs': [{'title': 'LABIOS ROTOS', 'artist': 'ZOE'}]})
+        self.assertEqual(raised.exception.code, 500)
+        self.assertIn('error', json.loads(raised.exception.read()))
+
+    def test_musicbrainz_down_returns_503(self):
+        fill_release_year.offline_index.close()
+        fill_release_year.offline_index = None
+        stub = start_stub(StubState(load_catalog(CATALOG), error_rate=1.0))
+        client = fill_release_year.client
+        saved = (client.rate_limiter, client.retry_policy, client.breaker)
+        musicbrainzngs.set_hostname(f'127.0.0.1:{stub.server_address[1]}', use_https=False)
+        fill_release_year.configure_rate_limit(1000, 10)
+        fill_release_year.configure_retries(1, base_delay=0.0, max_delay=0.0)
+        client.breaker = CircuitBreaker()
+        try:
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                self.post({'songs': [{'title': 'LABIOS ROTOS', 'artist': 'ZOE'}]})
+        finally:
+            client.rate_limiter, client.retry_policy, client.breaker = saved
+            musicbrainzngs.set_hostname('musicbrainz.org', use_https=True)
+            stub.shutdown()
+            stub.server_close()
+            fill_release_year.configure_offline_index(self.index_path)
+        self.assertEqual(raised.exception.code, 503)
+        body = json.loads(raised.exception.read())
+        self.assertIn('error', body)
+        self.assertEqual(body['results'][0]['source'], 'error')
+        self.assertIsNone(body['results'][0]['year'])
+
+    def test_health(self):
+        with urllib.request.urlopen(f'{self.url}/health') as response:
+            self.assertEqual(json.loads(response.read())['status'], 'ok')
+
+
+if __name__ == '__main__':
+    unittest.main()
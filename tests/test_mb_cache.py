@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from mb_cache import ResponseCache, make_key
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'cache.sqlite')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_is_normalized(self):
+        self.assertEqual(make_key('release', 'A  AND  b', 5), make_key('release', 'a and B', 5))
+        self.assertNotEqual(make_key('release', 'a', 5), make_key('release', 'a', 3))
+
+    def test_roundtrip_and_persistence(self):
+        cache = ResponseCache(self.path)
+        self.assertIsNone(cache.get('release', 'q', 5))
+        cache.set('release', 'q', 5, {'release-list': [{'date': '1999'}]})
+        cache.close()
+
+        cache = ResponseCache(self.path)
+        self.assertEqual(cache.get('release', 'Q', 5), {'release-list': [{'date': '1999'}]})
+        self.assertEqual(cache.hits, 1)
+        cache.close()
+
+    def test_ttl_expiry(self):
+        cache = ResponseCache(self.path, ttl=-1)
+        cache.set('recording', 'q', 3, {'recording-list': []})
+        self.assertIsNone(cache.get('recording', 'q', 3))
+        cache.close()
+
+    def test_size_eviction(self):
+        cache = ResponseCache(self.path, max_entries=10)
+        for i in range(25):
+            cache.set('release', f'q{i}', 5, {'n': i})
+        cache.evict()
+        self.assertEqual(len(cache), 10)
+        self.assertIsNotNone(cache.get('release', 'q24', 5))
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
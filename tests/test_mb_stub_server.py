@@ -0,0 +1,101 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import musicbrainzngs
+
+from benchmark import run_benchmark
+from mb_client import user_agent
+from mb_stub_server import StubState, load_catalog, parse_query, start_stub
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+CATALOG = os.path.join(FIXTURES, 'stub_catalog.jsonl')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStubServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.state = StubState(load_catalog(CATALOG))
+        cls.server = start_stub(cls.state)
+        host, port = cls.server.server_address[:2]
+        musicbrainzngs.set_rate_limit(False)
+        musicbrainzngs.set_hostname(f'{host}:{port}', use_https=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        musicbrainzngs.set_hostname('musicbrainz.org', use_https=True)
+
+    def test_parse_query(self):
+        fields, terms = parse_query('artist:"ZOE" AND (recording:"a b" OR recording:"c")')
+        self.assertEqual(fields, {'artist': ['ZOE'], 'recording': ['a b', 'c']})
+        self.assertEqual(terms, [])
+        self.assertEqual(parse_query('LABIOS ROTOS AND ZOE')[1], ['labios', 'rotos', 'zoe'])
+
+    def test_search_releases_parses_with_musicbrainzngs(self):
+        result = musicbrainzngs.search_releases(query='release:"LABIOS ROTOS" AND artist:"ZOE"', limit=5)
+        releases = result['release-list']
+        self.assertEqual(len(releases), 1)
+        self.assertEqual(releases[0]['date'][:4], '1993')
+        self.assertEqual(releases[0]['artist-credit'][0]['artist']['name'], 'Zoe')
+
+    def test_search_recordings_embeds_releases(self):
+        result = musicbrainzngs.search_recordings(query='recording:"LABIOS ROTOS" AND artist:"ZOE"', limit=3)
+        recording = result['recording-list'][0]
+        self.assertEqual(recording['release-list'][0]['date'], '1993')
+
+    def test_unknown_song_returns_empty_list(self):
+        result = musicbrainzngs.search_releases(query='release:"NO EXISTE" AND artist:"NADIE"', limit=5)
+        self.assertEqual(result['release-list'], [])
+
+    def test_record_identifies_like_the_script(self):
+        seen = []
+
+        class Upstream(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                seen.append(self.headers.get('User-Agent'))
+                body = b'<metadata/>'
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        upstream = ThreadingHTTPServer(('127.0.0.1', 0), Upstream)
+        threading.Thread(target=upstream.serve_forever, daemon=True).start()
+        with tempfile.TemporaryDirectory() as fixtures_dir:
+            state = StubState([], fixtures_dir=fixtures_dir, record=True,
+                              upstream=f'http://127.0.0.1:{upstream.server_address[1]}')
+            recorder = start_stub(state)
+            try:
+                url = f'http://127.0.0.1:{recorder.server_address[1]}/ws/2/release/?query=x'
+                with urllib.request.urlopen(url) as response:
+                    self.assertEqual(response.read(), b'<metadata/>')
+            finally:
+                recorder.shutdown()
+                recorder.server_close()
+                upstream.shutdown()
+                upstream.server_close()
+        self.assertEqual(len(seen), 1)
+        self.assertEqual(seen[0], user_agent())
+        self.assertTrue(seen[0].startswith('VibraMusicYearFiller/'))
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_benchmark_reports_metrics(self):
+        metrics = run_benchmark(os.path.join(ROOT, 'prueba_15_canciones.csv'), CATALOG)
+        self.assertEqual(metrics['rows'], 15)
+        self.assertGreater(metrics['found'], 0)
+        self.assertGreater(metrics['requests'], 0)
+        self.assertAlmostEqual(metrics['requests_per_row'], metrics['requests'] / 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import json
+import os
+import tempfile
+import unittest
+
+from metrics import Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def test_counters_with_labels(self):
+        registry = Metrics()
+        registry.inc('mb_api_calls_total', kind='release')
+        registry.inc('mb_api_calls_total', 2, kind='release')
+        registry.inc('mb_api_calls_total', kind='recording')
+        self.assertEqual(registry.counter_value('mb_api_calls_total', kind='release'), 3)
+        self.assertEqual(registry.counter_value('mb_api_calls_total', kind='artist'), 0)
+
+    def test_histogram_and_prometheus_export(self):
+        registry = Metrics()
+        registry.observe('mb_request_seconds', 0.02, kind='release')
+        registry.observe('mb_request_seconds', 3.0, kind='release')
+        text = registry.to_prometheus()
+        self.assertIn('# TYPE mb_request_seconds histogram', text)
+        self.assertIn('mb_request_seconds_bucket{kind="release",le="0.025"} 1', text)
+        self.assertIn('mb_request_seconds_bucket{kind="release",le="+Inf"} 2', text)
+        self.assertIn('mb_request_seconds_count{kind="release"} 2', text)
+
+    def test_write_json(self):
+        registry = Metrics()
+        registry.inc('rows_processed_total', 5)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'metrics.json')
+            registry.write(path)
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        self.assertEqual(data['counters']['rows_processed_total'], [{'labels': {}, 'value': 5}])
+
+
+if __name__ == '__main__':
+    unittest.main()
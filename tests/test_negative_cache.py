@@ -0,0 +1,146 @@
+import os
+import tempfile
+import unittest
+
+import fill_release_year
+from retry_policy import RetriesExhausted
+from negative_cache import NegativeCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNegativeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        self.cache = NegativeCache(os.path.join(self.tmpdir.name, 'misses.sqlite'),
+                                   miss_backoff=100, error_backoff=10, clock=self.clock)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_miss_is_skipped_until_backoff_expires(self):
+        self.cache.record('Labios Rotos', 'Zoé', 'no_candidates')
+        self.assertTrue(self.cache.should_skip('LABIOS ROTOS', 'ZOE'))
+        self.clock.now += 101
+        self.assertFalse(self.cache.should_skip('LABIOS ROTOS', 'ZOE'))
+
+    def test_backoff_doubles_per_kind(self):
+        self.assertEqual(self.cache.record('Soñé', 'Zoé', 'low_similarity'), 1100)
+        self.assertEqual(self.cache.record('Soñé', 'Zoé', 'no_candidates'), 1200)
+        # Un error no hereda los intentos de los fallos reales
+        self.assertEqual(self.cache.record('Soñé', 'Zoé', 'error'), 1010)
+        self.assertEqual(self.cache.get('Soñé', 'Zoé')['attempts'], 1)
+        self.assertEqual(self.cache.counts(), {'error': 1})
+
+    def test_forget(self):
+        self.cache.record('Soñé', 'Zoé', 'error')
+        self.cache.forget('sone', 'zoe')
+        self.assertIsNone(self.cache.get('Soñé', 'Zoé'))
+        self.assertEqual(len(self.cache), 0)
+
+
+
+class FakeClient:
+    def __init__(self, response=None, error=None):
+        self.response = response or {}
+        self.error = error
+        self.calls = 0
+
+    def _search(self, query, limit=5):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.response
+
+    search_releases = search_recordings = _search
+
+
+class TestMissReasons(unittest.TestCase):
+    def run_lookup(self, client):
+        original = fill_release_year.client
+        fill_release_year.client = client
+        try:
+            return fill_release_year.search_release_year_with_reason('Cancion inexistente', 'Zoé')
+        finally:
+            fill_release_year.client = original
+
+    def test_reasons(self):
+        self.assertEqual(self.run_lookup(FakeClient()), (None, 'no_candidates'))
+        other = {'release-list': [{'title': 'Otra cosa', 'date': '1999', 'artist-credit': []}],
+                 'recording-list': [{'id': 'r', 'title': 'Otra cosa', 'artist-credit': []}]}
+        self.assertEqual(self.run_lookup(FakeClient(other)), (None, 'low_similarity'))
+        self.assertEqual(self.run_lookup(FakeClient(error=OSError('503'))), (None, 'error'))
+
+    def test_batch_results_count_as_candidates(self):
+        class BatchOnlyClient(FakeClient):
+            # Solo la consulta OR por lotes trae resultados, y ninguno coincide
+            def search_recordings(self, query, limit=5):
+                other = [{'id': 'r', 'title': 'Otra cosa', 'first-release-date': '1999',
+                          'artist-credit': [{'artist': {'name': 'Zoé'}}]}]
+                return {'recording-list': other if ' OR ' in query else []}
+
+        original = fill_release_year.client
+        fill_release_year.client = BatchOnlyClient()
+        try:
+            batch = fill_release_year.configure_batch_queries()
+            batch.plan([('Cancion inexistente', 'Zoé'), ('Otra cancion', 'Zoé')])
+            self.assertEqual(fill_release_year.search_release_year_with_reason('Cancion inexistente', 'Zoé'),
+                             (None, 'low_similarity'))
+        finally:
+            fill_release_year.client = original
+            fill_release_year.batch_search = None
+
+    def test_known_misses_are_skipped(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fill_release_year.configure_negative_cache(os.path.join(tmpdir, 'misses.sqlite'))
+            try:
+                client = FakeClient()
+                original = fill_release_year.client
+                fill_release_year.client = client
+                try:
+                    fill_release_year.lookup_row(1, 1, [0], 'Cancion inexistente', 'Zoé')
+                finally:
+                    fill_release_year.client = original
+                units = [([0, 3], 'CANCION INEXISTENTE', 'ZOE'), ([1], 'Labios rotos', 'Zoé')]
+                self.assertEqual(fill_release_year.skip_known_misses(units), (units[1:], 2))
+            finally:
+                fill_release_year.negative_cache.close()
+                fill_release_year.negative_cache = None
+
+    def test_exhausted_retries_are_not_cached(self):
+        # El resultado de búsqueda no trae fechas: hay que consultar los releases de la grabación
+        response = {'recording-list': [{'id': 'r1', 'title': 'Cancion inexistente',
+                                        'artist-credit': [{'artist': {'name': 'Zoé'}}]}]}
+        client = FakeClient(response)
+
+        def get_recording_by_id(recording_id, includes=()):
+            raise RetriesExhausted('throttle', 6, OSError('503'))
+        client.get_recording_by_id = get_recording_by_id
+
+        original = fill_release_year.client
+        fill_release_year.client = client
+        try:
+            with self.assertRaises(RetriesExhausted):
+                fill_release_year.strategy_recording('Cancion inexistente', [('original', 'Zoé')])
+            with tempfile.TemporaryDirectory() as tmpdir:
+                cache = fill_release_year.configure_negative_cache(os.path.join(tmpdir, 'misses.sqlite'))
+                try:
+                    self.assertEqual(fill_release_year.lookup_row(1, 1, [0], 'Cancion inexistente', 'Zoé'), ([0], None))
+                    self.assertEqual(len(cache), 0)
+                finally:
+                    cache.close()
+                    fill_release_year.negative_cache = None
+        finally:
+            fill_release_year.client = original
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from offline_index import OfflineIndex, build_index
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'musicbrainz_dump_sample.jsonl')
+
+
+class TestOfflineIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'index.sqlite')
+        self.assertEqual(build_index(FIXTURE, self.path), 6)
+        self.index = OfflineIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmpdir.cleanup()
+
+    def test_exact_match_ignores_case_and_accents(self):
+        self.assertEqual(self.index.lookup_year('LABIOS ROTOS', ['ZOE']), 2006)
+        self.assertEqual(self.index.lookup_year('SOÑE', ['ZOE']), 1999)
+
+    def test_fuzzy_title_and_collaborations(self):
+        self.assertEqual(self.index.lookup_year('YA NO QUIERO VOLVERME TAN LOCO', ['CHARLY GARCIA']), 1982)
+        self.assertEqual(self.index.lookup_year('Tu Vicio', ['Pedro Aznar']), 2000)
+        self.assertEqual(self.index.lookup_year('Tu Vicio', ['Charly García & Pedro Aznar']), 2000)
+
+    def test_not_found(self):
+        self.assertIsNone(self.index.lookup_year('Cancion inexistente', ['ZOE']))
+        self.assertIsNone(self.index.lookup_year('Mujer amante', ['Otro artista']))
+
+    def test_artist_rows_are_bounded(self):
+        index = OfflineIndex(self.path, max_artists=1)
+        try:
+            self.assertEqual(index.lookup_year('LABIOS ROTOS', ['ZOE']), 2006)
+            self.assertEqual(index.lookup_year('Tu Vicio', ['Pedro Aznar']), 2000)
+            self.assertEqual(len(index._artist_rows), 1)
+            self.assertEqual(index.lookup_year('LABIOS ROTOS', ['ZOE']), 2006)
+        finally:
+            index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
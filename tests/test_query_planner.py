@@ -0,0 +1,44 @@
+import unittest
+
+from query_planner import QueryPlanner, plan_artist_variants
+
+
+class TestQueryPlanner(unittest.TestCase):
+    def test_plan_artist_variants_kinds(self):
+        self.assertEqual(plan_artist_variants('Zoé & Café Tacvba'), [
+            ('original', 'Zoé & Café Tacvba'),
+            ('sin_acentos', 'Zoe & Cafe Tacvba'),
+            ('principal', 'Zoé'),
+            ('principal_sin_acentos', 'Zoe'),
+        ])
+
+    def test_default_order_without_stats(self):
+        planner = QueryPlanner()
+        self.assertEqual(planner.order_strategies(), ['release', 'recording', 'simple'])
+
+    def test_reorders_by_hits_per_call(self):
+        planner = QueryPlanner()
+        for _ in range(10):
+            planner.record_strategy('release', 3, False)
+            planner.record_strategy('recording', 1, True)
+        self.assertEqual(planner.order_strategies()[0], 'recording')
+
+    def test_skips_unproductive_strategy_but_probes(self):
+        planner = QueryPlanner(min_attempts=5, probe_every=4)
+        for _ in range(5):
+            planner.record_strategy('simple', 2, False)
+        orders = [planner.order_strategies() for _ in range(4)]
+        self.assertNotIn('simple', orders[0])
+        self.assertIn('simple', orders[3])
+
+    def test_orders_variants_by_kind_hit_rate(self):
+        planner = QueryPlanner()
+        for _ in range(5):
+            planner.record_variant('original', False)
+            planner.record_variant('principal', True)
+        variants = [('original', 'A y B'), ('principal', 'A')]
+        self.assertEqual(planner.order_variants(variants), [('principal', 'A'), ('original', 'A y B')])
+
+
+if __name__ == '__main__':
+    unittest.main()
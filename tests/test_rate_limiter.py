@@ -0,0 +1,43 @@
+import unittest
+
+from rate_limiter import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_steady_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=3, clock=clock, sleep=clock.sleep)
+        for _ in range(3):
+            self.assertEqual(bucket.acquire(), 0.0)
+        bucket.acquire()
+        self.assertAlmostEqual(clock.now, 1.0)
+        bucket.acquire()
+        self.assertAlmostEqual(clock.now, 2.0)
+
+    def test_never_exceeds_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, burst=1, clock=clock, sleep=clock.sleep)
+        for _ in range(11):
+            bucket.acquire()
+        self.assertAlmostEqual(clock.now, 5.0)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+        with self.assertRaises(ValueError):
+            TokenBucket(burst=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
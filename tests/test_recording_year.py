@@ -0,0 +1,39 @@
+import unittest
+
+import fill_release_year
+from fill_release_year import get_year_from_releases
+from text_keys import recording_year
+
+
+class FakeClient:
+    def __init__(self):
+        self.lookups = 0
+
+    def get_recording_by_id(self, recording_id, includes=()):
+        self.lookups += 1
+        return {'recording': {'release-list': [{'date': '2003'}, {'date': '1998-05-02'}, {'date': ''}]}}
+
+
+class TestRecordingYear(unittest.TestCase):
+    def test_year_from_search_payload(self):
+        recording = {
+            'first-release-date': '2001-02-03',
+            'release-list': [{'date': '1999-01-01'}, {'date': '1850'}, {'date': ''}],
+        }
+        self.assertEqual(recording_year(recording), 1999)
+        self.assertIsNone(recording_year({'release-list': []}))
+
+    def test_lookup_fallback_is_cached_per_recording(self):
+        original = fill_release_year.client
+        fill_release_year.client = FakeClient()
+        try:
+            self.assertEqual(get_year_from_releases('rec-1'), 1998)
+            self.assertEqual(get_year_from_releases('rec-1'), 1998)
+            self.assertEqual(fill_release_year.client.lookups, 1)
+        finally:
+            fill_release_year.client = original
+            fill_release_year._recording_years.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import random
+import unittest
+from email.message import Message
+from urllib.error import HTTPError
+
+import musicbrainzngs
+
+from mb_client import MusicBrainzClient
+from rate_limiter import TokenBucket
+from retry_policy import CircuitBreaker, RetriesExhausted, RetryPolicy, classify, retry_after
+
+
+def http_error(code, retry=None):
+    headers = Message()
+    if retry is not None:
+        headers['Retry-After'] = retry
+    return musicbrainzngs.NetworkError('retried 1 times', HTTPError('http://mb', code, 'error', headers, None))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestClassify(unittest.TestCase):
+    def test_kinds(self):
+        self.assertEqual(classify(http_error(503)), 'throttle')
+        self.assertEqual(classify(http_error(502)), 'server')
+        self.assertEqual(classify(musicbrainzngs.NetworkError('timeout')), 'network')
+        self.assertEqual(classify(musicbrainzngs.ResponseError(cause=HTTPError('http://mb', 404, 'nf', Message(), None))),
+                         'permanent')
+        self.assertEqual(classify(ValueError('xml')), 'permanent')
+
+    def test_retry_after(self):
+        self.assertEqual(retry_after(http_error(503, '3')), 3.0)
+        self.assertEqual(retry_after(http_error(503, 'Thu, 01 Jan 1970 00:00:10 GMT'), now=4), 6.0)
+        self.assertIsNone(retry_after(http_error(503)))
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_jittered_exponential_delay(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=8.0, rng=random.Random(0))
+        for attempt, ceiling in enumerate([1, 2, 4, 8, 8]):
+            delay = policy.delay(attempt)
+            self.assertGreaterEqual(delay, ceiling / 2)
+            self.assertLessEqual(delay, ceiling)
+
+    def test_honors_retry_after(self):
+        policy = RetryPolicy(base_delay=0.1, max_delay=60.0)
+        self.assertGreaterEqual(policy.delay(0, http_error(503, '5')), 5.0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_and_recovers(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(window=4, threshold=0.5, min_calls=4, cooldown=10, clock=clock, sleep=clock.sleep)
+        for success in (True, False, True, False):
+            breaker.before_call()
+            breaker.record(success)
+        self.assertEqual(breaker.state, 'open')
+
+        # El siguiente hilo espera el enfriamiento y pasa como prueba
+        self.assertEqual(breaker.before_call(), 10)
+        self.assertEqual(breaker.state, 'half_open')
+        breaker.record(False)
+        self.assertEqual(breaker.state, 'open')
+        self.assertEqual(breaker.before_call(), 20)
+        breaker.record(True)
+        self.assertEqual(breaker.state, 'closed')
+        self.assertEqual(breaker.trips, 2)
+
+
+class TestClientRetries(unittest.TestCase):
+    def make_client(self, clock, max_retries=3):
+        return MusicBrainzClient(rate_limiter=TokenBucket(rate=1000, burst=100),
+                                 retry_policy=RetryPolicy(max_retries=max_retries, base_delay=1.0),
+                                 breaker=CircuitBreaker(min_calls=100), sleep=clock.sleep)
+
+    def test_retries_throttling_then_succeeds(self):
+        clock = FakeClock()
+        client = self.make_client(clock)
+        errors = [http_error(503, '2'), http_error(503)]
+
+        def search(**params):
+            if errors:
+                raise errors.pop(0)
+            return {'release-list': []}
+
+        self.assertEqual(client._call('release', search, 'q', 5), {'release-list': []})
+        self.assertEqual(client.network_calls, 3)
+        self.assertGreaterEqual(clock.sleeps[0], 2.0)
+
+    def test_gives_up_and_does_not_retry_permanent_errors(self):
+        clock = FakeClock()
+        client = self.make_client(clock, max_retries=2)
+
+        def throttled(**params):
+            raise http_error(503)
+
+        with self.assertRaises(RetriesExhausted):
+            client._call('release', throttled, 'q', 5)
+        self.assertEqual(client.network_calls, 3)
+
+        def broken(**params):
+            raise ValueError('xml')
+
+        with self.assertRaises(ValueError):
+            client._call('release', broken, 'q', 5)
+        self.assertEqual(client.network_calls, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+import pandas as pd
+
+from fill_release_year import is_year_missing, normalize_column, normalize_text, select_rows, years_missing
+from fill_release_year_debug import normalize_column_basic, normalize_text_basic
+
+
+class TestRowSelection(unittest.TestCase):
+    def test_years_missing_matches_scalar_version(self):
+        values = pd.Series(['', ' ', 'nan', None, '1999', ' 2025 ', '2025.5', '1899', 'abc', '2026', '1900.0'], dtype='str')
+        self.assertEqual(list(years_missing(values)), [is_year_missing(value) for value in values])
+
+    def test_normalize_column_matches_scalar_version(self):
+        values = pd.Series(['  Labios   rotos ', None, 'NaN', 'x\tY\n z', '', '6:00 a.\xa0m.', 'Soñé\u2009 (en vivo)\xa0'], dtype='str')
+        self.assertEqual(list(normalize_column(values)), [normalize_text(value) for value in values])
+        self.assertEqual(list(normalize_column_basic(values)), [normalize_text_basic(value) for value in values])
+
+    def test_normalize_column_splits_every_unicode_space(self):
+        spaces = ''.join(char for char in map(chr, range(0x110000)) if char.isspace())
+        values = pd.Series([f'{spaces}Labios{spaces}Rotos{spaces}'] + [f'a{space}b' for space in spaces], dtype='str')
+        self.assertEqual(list(normalize_column(values)), [normalize_text(value) for value in values])
+
+    def test_select_rows(self):
+        df = pd.DataFrame({
+            'CANCIÓN': ['Labios Rotos', 'Soñé', '', 'Mujer Amante'],
+            'ARTISTAS': [' Zoé ', 'Zoé', 'Zoé', 'Rata Blanca'],
+            'AÑO': [None, '1999', None, 'nan'],
+        }, dtype='str')
+        rows, resumed = select_rows(df, 'CANCIÓN', 'ARTISTAS', 'AÑO')
+        self.assertEqual(rows, [(0, 'Labios Rotos', 'Zoé'), (3, 'Mujer Amante', 'Rata Blanca')])
+        self.assertEqual(resumed, 0)
+        self.assertEqual(select_rows(df, 'CANCIÓN', 'ARTISTAS', 'AÑO', limit=1)[0], rows[:1])
+
+    def test_select_rows_resumes_from_journal(self):
+        df = pd.DataFrame({'CANCIÓN': ['Labios Rotos', 'Mujer Amante'], 'ARTISTAS': ['Zoé', 'Rata Blanca'],
+                           'AÑO': [None, None]}, dtype='str')
+        journal = {0: {'title': 'LABIOS ROTOS', 'artist': 'ZOE', 'year': 2006}}
+        rows, resumed = select_rows(df, 'CANCIÓN', 'ARTISTAS', 'AÑO', journal)
+        self.assertEqual(rows, [(1, 'Mujer Amante', 'Rata Blanca')])
+        self.assertEqual(resumed, 1)
+        self.assertEqual(df.at[0, 'AÑO'], '2006')
+
+
+if __name__ == '__main__':
+    unittest.main()
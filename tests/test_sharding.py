@@ -0,0 +1,84 @@
+import logging
+import os
+import tempfile
+import unittest
+
+import fill_release_year
+from checkpoint import default_journal_path, load_journal
+from offline_index import build_index
+from sharding import parse_shard, shard_of, shard_output_path
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'musicbrainz_dump_sample.jsonl')
+
+CSV = """CANCIÓN,ARTISTA,AÑO DE LANZAMIENTO
+LABIOS ROTOS,ZOE,
+Yo no quiero volverme tan loco,Charly García,0
+Mujer amante,Rata Blanca,
+SOÑE,Zoé,
+Cancion inexistente,Rata Blanca,
+Tu Vicio,Pedro Aznar,1999
+"""
+
+
+class TestShardFunctions(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard('2/4'), (2, 4))
+        for text in ('0/4', '5/4', '1-4', 'x'):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+
+    def test_artist_variants_share_shard(self):
+        self.assertEqual(shard_of('Zoé', 7), shard_of('  ZOE ', 7))
+        self.assertTrue(all(1 <= shard_of(f'artista {n}', 3) <= 3 for n in range(50)))
+
+    def test_output_path(self):
+        self.assertEqual(shard_output_path('out/base_solucionado.csv', 1, 4), 'out/base_solucionado.shard1of4.csv')
+        self.assertEqual(shard_output_path('out/base.shard1of4.csv', 1, 4), 'out/base.shard1of4.csv')
+        self.assertEqual(shard_output_path('out/base.shard1of4.csv', 2, 4), 'out/base.shard1of4.shard2of4.csv')
+
+
+class TestShardedRun(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        index_path = os.path.join(self.tmpdir.name, 'index.sqlite')
+        build_index(FIXTURE, index_path)
+        fill_release_year.configure_offline_index(index_path)
+        self.input = self.path('input.csv')
+        with open(self.input, 'w', encoding='utf-8') as csv_file:
+            csv_file.write(CSV)
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        fill_release_year.offline_index.close()
+        fill_release_year.offline_index = None
+        fill_release_year.shard = None
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def read(self, path):
+        with open(path, encoding='utf-8') as output_file:
+            return output_file.read()
+
+    def test_merge_matches_single_run(self):
+        fill_release_year.process_file_fixed(self.input, self.path('full.csv'))
+
+        shard_paths = []
+        processed = 0
+        for index in (1, 2, 3):
+            fill_release_year.configure_shard(index, 3)
+            shard_paths.append(self.path(f'shard{index}.csv'))
+            processed += fill_release_year.process_file_fixed(self.input, shard_paths[-1])['processed']
+        fill_release_year.shard = None
+        self.assertEqual(processed, 5)
+
+        entries = fill_release_year.merge_shards(self.input, shard_paths, self.path('merged.csv'))
+        self.assertEqual(self.read(self.path('merged.csv')), self.read(self.path('full.csv')))
+        self.assertEqual(entries, 5)
+        self.assertEqual(sorted(load_journal(default_journal_path(self.path('merged.csv')))), [0, 1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
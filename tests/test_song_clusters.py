@@ -0,0 +1,50 @@
+import hashlib
+import unittest
+
+from song_clusters import MAX_BLOCK, SongClusterer, core_title
+
+UNITS = [
+    ([0, 4], 'LABIOS ROTOS', 'ZOE'),
+    ([1], 'Soñé', 'Zoé'),
+    ([2], 'Labios Rotos (En Vivo)', 'Zoé'),
+    ([3], 'Adicto Al Dolor', 'Don Tetto'),
+    ([5], 'ADICTO AL DOLOR', 'DON TETO'),
+    ([6], 'Labios Rotos', 'Caifanes'),
+]
+
+
+class TestSongClusters(unittest.TestCase):
+    def test_core_title(self):
+        self.assertEqual(core_title('Labios Rotos (En Vivo)'), 'labios rotos')
+        self.assertEqual(core_title('Culpable o no - Remaster 2013'), 'culpable o no')
+        self.assertEqual(core_title('(Intro)'), '(intro)')
+
+    def test_merges_near_duplicates(self):
+        units, clusters = SongClusterer().cluster(UNITS)
+        self.assertEqual(units, [
+            ([0, 2, 4], 'LABIOS ROTOS', 'ZOE'),
+            ([1], 'Soñé', 'Zoé'),
+            ([3, 5], 'Adicto Al Dolor', 'Don Tetto'),
+            ([6], 'Labios Rotos', 'Caifanes'),
+        ])
+        self.assertEqual([[title for _indices, title, _artist in cluster] for cluster in clusters],
+                         [['LABIOS ROTOS', 'Labios Rotos (En Vivo)'], ['Adicto Al Dolor', 'ADICTO AL DOLOR']])
+
+    def test_nothing_to_merge(self):
+        units, clusters = SongClusterer().cluster(UNITS[:2])
+        self.assertEqual(units, UNITS[:2])
+        self.assertEqual(clusters, [])
+
+    def test_large_artist_block_is_split_not_dropped(self):
+        # Un solo artista con más canciones que MAX_BLOCK; la errata del título solo la une el bloque del artista
+        titles = [f'Corrido {hashlib.md5(str(i).encode()).hexdigest()[:10]}' for i in range(MAX_BLOCK + 50)]
+        typo = titles[7][:-1] + ('x' if titles[7][-1] != 'x' else 'y')
+        units = [([i], title, 'Los Tigres del Norte') for i, title in enumerate(titles + [typo])]
+        merged, clusters = SongClusterer().cluster(units)
+        self.assertEqual(len(merged), MAX_BLOCK + 50)
+        self.assertEqual([[title for _indices, title, _artist in cluster] for cluster in clusters],
+                         [[titles[7], typo]])
+
+
+if __name__ == '__main__':
+    unittest.main()
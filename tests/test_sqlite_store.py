@@ -0,0 +1,22 @@
+import os
+import tempfile
+import unittest
+
+from artist_table import ArtistTable
+from mb_cache import ResponseCache
+from negative_cache import NegativeCache
+
+
+class TestSQLiteStore(unittest.TestCase):
+    def test_stores_share_the_same_setup(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for store_class in (ResponseCache, NegativeCache, ArtistTable):
+                store = store_class(os.path.join(tmp, "sub", f"{store_class.__name__}.sqlite"))
+                mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+                self.assertEqual(mode, "wal")
+                self.assertEqual(len(store), 0)
+                store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import fill_release_year
+from checkpoint import JournalIndex
+from offline_index import build_index
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'musicbrainz_dump_sample.jsonl')
+
+CSV = """CANCIÓN,ARTISTA,GÉNERO
+LABIOS ROTOS,ZOE,ROCK
+SOÑE,ZOE,ROCK
+Cancion inexistente,ZOE,POP
+Labios Rotos,Zoé,ROCK
+Tu Vicio,Pedro Aznar,ROCK
+,Sin titulo,POP
+SOÑE,ZOE,ROCK
+"""
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        index_path = os.path.join(self.tmpdir.name, 'index.sqlite')
+        build_index(FIXTURE, index_path)
+        fill_release_year.configure_offline_index(index_path)
+        self.input = os.path.join(self.tmpdir.name, 'input.csv')
+        with open(self.input, 'w', encoding='utf-8') as csv_file:
+            csv_file.write(CSV)
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        fill_release_year.offline_index.close()
+        fill_release_year.offline_index = None
+        self.tmpdir.cleanup()
+
+    def run_process(self, name, **kwargs):
+        output = os.path.join(self.tmpdir.name, name)
+        summary = fill_release_year.process_file_fixed(self.input, output, **kwargs)
+        with open(output, encoding='utf-8') as output_file:
+            return summary, output_file.read()
+
+    def test_chunks_match_full_file(self):
+        full_summary, full = self.run_process('full.csv')
+        chunk_summary, chunked = self.run_process('chunked.csv', chunksize=2)
+        self.assertEqual(chunked, full)
+        self.assertEqual(chunk_summary['processed'], full_summary['processed'])
+        self.assertEqual(chunk_summary['found'], full_summary['found'])
+        self.assertTrue(full.splitlines()[0].endswith('AÑO DE LANZAMIENTO'))
+        self.assertEqual(full.splitlines()[1], 'LABIOS ROTOS,ZOE,ROCK,2006')
+        # Un solo ProgressTracker para todos los bloques
+        self.assertEqual(fill_release_year.progress.done, chunk_summary['songs'])
+
+    def test_limit_spans_chunks(self):
+        summary, _output = self.run_process('limited.csv', chunksize=2, limit=3)
+        self.assertEqual(summary['rows'], 3)
+
+    def test_resume_indexes_journal_once(self):
+        full_summary, full = self.run_process('resumed.csv', chunksize=2)
+        with mock.patch.object(fill_release_year, 'JournalIndex', wraps=JournalIndex) as index:
+            summary, resumed = self.run_process('resumed.csv', chunksize=2, resume=True)
+        # El diario se lee una vez, no una por bloque
+        self.assertEqual(index.call_count, 1)
+        self.assertEqual(resumed, full)
+        self.assertEqual(summary['resumed'], full_summary['rows'])
+        self.assertEqual(summary['rows'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import importlib.util
+import logging
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+import fill_release_year
+from offline_index import build_index
+from table_io import file_format, read_column_names, read_table, write_table
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'musicbrainz_dump_sample.jsonl')
+
+ROWS = {
+    'CANCIÓN': ['LABIOS ROTOS', 'SOÑE', 'Cancion inexistente', 'Tu Vicio'],
+    'ARTISTA': ['ZOE', 'ZOE', 'ZOE', 'Pedro Aznar'],
+    'GÉNERO': ['ROCK', 'ROCK', 'POP', 'ROCK'],
+    'AÑO DE LANZAMIENTO': [None, None, None, None],
+}
+
+
+class TestFileFormat(unittest.TestCase):
+    def test_extension(self):
+        self.assertEqual(file_format('catalogo.csv'), 'csv')
+        self.assertEqual(file_format('catalogo.PARQUET'), 'parquet')
+        self.assertEqual(file_format('catalogo.feather'), 'arrow')
+
+
+@unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow no está instalado')
+class TestColumnarFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        index_path = os.path.join(self.tmpdir.name, 'index.sqlite')
+        build_index(FIXTURE, index_path)
+        fill_release_year.configure_offline_index(index_path)
+        self.input = os.path.join(self.tmpdir.name, 'input.parquet')
+        write_table(pd.DataFrame(ROWS), self.input, year_column='AÑO DE LANZAMIENTO')
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        fill_release_year.offline_index.close()
+        fill_release_year.offline_index = None
+        self.tmpdir.cleanup()
+
+    def test_reads_selected_columns(self):
+        self.assertEqual(read_column_names(self.input), list(ROWS))
+        df = read_table(self.input, columns=['CANCIÓN', 'ARTISTA'])
+        self.assertEqual(list(df.columns), ['CANCIÓN', 'ARTISTA'])
+        self.assertEqual(len(df), 4)
+
+    def test_fills_year_as_integer(self):
+        output = os.path.join(self.tmpdir.name, 'output.parquet')
+        summary = fill_release_year.process_file_fixed(self.input, output)
+        self.assertEqual(summary['found'], 3)
+
+        df = pd.read_parquet(output)
+        self.assertEqual(list(df.columns), list(ROWS))
+        self.assertEqual(str(df['AÑO DE LANZAMIENTO'].dtype), 'Int64')
+        self.assertEqual(df['AÑO DE LANZAMIENTO'].iloc[0], 2006)
+        self.assertEqual(df['GÉNERO'].tolist(), ROWS['GÉNERO'])
+
+    def test_chunks_match_full_file(self):
+        full = os.path.join(self.tmpdir.name, 'full.arrow')
+        chunked = os.path.join(self.tmpdir.name, 'chunked.arrow')
+        fill_release_year.process_file_fixed(self.input, full)
+        fill_release_year.process_file_fixed(self.input, chunked, chunksize=3)
+        pd.testing.assert_frame_equal(read_table(chunked), read_table(full))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+
+from text_keys import MAX_YEAR, MIN_YEAR, earliest_year, index_key, parse_year
+
+
+class TestTextKeys(unittest.TestCase):
+    def test_index_key_normalizes_accents_case_and_spaces(self):
+        self.assertEqual(index_key("  Charly  GARCÍA "), "charly garcia")
+        self.assertEqual(index_key(None), "")
+
+    def test_parse_year_applies_the_shared_range(self):
+        self.assertEqual(parse_year("1985-04-01"), 1985)
+        self.assertEqual(parse_year(str(MIN_YEAR)), MIN_YEAR)
+        self.assertEqual(parse_year(str(MAX_YEAR)), MAX_YEAR)
+        self.assertIsNone(parse_year(str(MIN_YEAR - 1)))
+        self.assertIsNone(parse_year(str(MAX_YEAR + 1)))
+        self.assertIsNone(parse_year("????"))
+        self.assertIsNone(parse_year(""))
+
+    def test_earliest_year_skips_invalid_dates(self):
+        self.assertEqual(earliest_year(["1999", None, "0000", "1987-05"]), 1987)
+        self.assertIsNone(earliest_year([None, ""]))
+
+
+if __name__ == "__main__":
+    unittest.main()
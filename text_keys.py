@@ -0,0 +1,50 @@
+"""Claves normalizadas y años válidos, compartidos por todos los módulos.
+
+``index_key`` es la normalización de títulos y artistas que usan el índice
+local, las cachés, la tabla de artistas, los shards y la agrupación de
+canciones; ``parse_year`` y ``earliest_year`` aplican en un solo sitio el
+rango de años aceptado (``MIN_YEAR``-``MAX_YEAR``). ``SPACES`` es la
+expresión regular de los espacios que separa ``str.split()``.
+"""
+import unidecode
+
+MIN_YEAR = 1900
+MAX_YEAR = 2025
+
+# Todos los caracteres que str.split() toma como espacio (NBSP, espacios finos...;
+# U+3000 es el último). Van escritos uno a uno porque en las columnas de texto
+# de pandas (pyarrow, motor RE2) \s solo reconoce los espacios ASCII.
+SPACES = "[" + "".join(char for char in map(chr, range(0x3001)) if char.isspace()) + "]+"
+
+
+def index_key(text):
+    """Normaliza un título o artista para usarlo como clave del índice."""
+    if text is None:
+        return ""
+    return ' '.join(unidecode.unidecode(str(text)).casefold().split())
+
+
+def parse_year(date):
+    """Extrae un año válido de una fecha ``YYYY[-MM[-DD]]``."""
+    if not date or len(date) < 4:
+        return None
+    try:
+        year = int(date[:4])
+    except (ValueError, TypeError):
+        return None
+    if MIN_YEAR <= year <= MAX_YEAR:
+        return year
+    return None
+
+
+def earliest_year(dates):
+    """Año más temprano y válido de una lista de fechas ``YYYY[-MM[-DD]]``."""
+    years = [year for year in map(parse_year, dates) if year]
+    return min(years) if years else None
+
+
+def recording_year(recording):
+    """Año de una grabación con solo los datos del resultado de búsqueda."""
+    dates = [recording.get("first-release-date")]
+    dates += [release.get("date") for release in recording.get("release-list", [])]
+    return earliest_year(dates)